@@ -4,9 +4,10 @@ Shows complete 22-step journey with all components
 """
 
 import streamlit as st
-import graphviz
 from airport_transfer_flow import AIRPORT_TRANSFER_FLOW
+from architecture_diagram import AIRPORT_PHASE_COLORS, create_airport_transfer_diagram
 from architecture_data import COMPONENTS
+from diagram_display import show_diagram
 
 def show_airport_transfer_use_case():
     """Display the Airport Transfer Booking use case page"""
@@ -77,50 +78,14 @@ def show_complete_flow():
     )
     
     # Create flow diagram
-    dot = graphviz.Digraph(comment='Airport Transfer Booking Flow')
-    dot.attr(rankdir='TB', size='12,16')
-    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10')
+    dot = create_airport_transfer_diagram(phase_filter)
     
-    # Get steps for selected phases
-    selected_steps = []
-    for phase in AIRPORT_TRANSFER_FLOW['phases']:
-        if phase['name'] in phase_filter:
-            selected_steps.extend(phase['steps'])
-    
-    # Phase colors
-    phase_colors = {
-        "Proactive Engagement": "#10B981",
-        "Airport Transfer Booking": "#3B82F6",
-        "Travel Card Update": "#F59E0B",
-        "Points Redemption Upsell": "#8B5CF6"
-    }
-    
-    # Add nodes for each step
-    for step in AIRPORT_TRANSFER_FLOW['steps']:
-        if step['id'] in selected_steps:
-            phase_name = step['phase']
-            color = phase_colors.get(phase_name, "#6B7280")
-            
-            label = f"{step['id']}. {step['title']}\\n"
-            label += f"User: {step['user_action'][:40]}...\\n" if len(step['user_action']) > 40 else f"User: {step['user_action']}\\n"
-            label += f"Latency: {step['latency']}"
-            
-            dot.node(f"step_{step['id']}", label, fillcolor=color, fontcolor='white')
-    
-    # Add edges
-    for i in range(len(AIRPORT_TRANSFER_FLOW['steps']) - 1):
-        step = AIRPORT_TRANSFER_FLOW['steps'][i]
-        next_step = AIRPORT_TRANSFER_FLOW['steps'][i + 1]
-        if step['id'] in selected_steps and next_step['id'] in selected_steps:
-            dot.edge(f"step_{step['id']}", f"step_{next_step['id']}", 
-                    label=step['protocol'], fontsize='8')
-    
-    st.graphviz_chart(dot)
+    show_diagram(dot)
     
     # Legend
     st.markdown("#### Legend")
     legend_cols = st.columns(4)
-    for i, (phase_name, color) in enumerate(phase_colors.items()):
+    for i, (phase_name, color) in enumerate(AIRPORT_PHASE_COLORS.items()):
         with legend_cols[i]:
             st.markdown(f"<div style='background-color:{color}; padding:10px; border-radius:5px; color:white; text-align:center'>{phase_name}</div>", unsafe_allow_html=True)
 
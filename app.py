@@ -4,26 +4,50 @@ Interactive Streamlit application for visualizing the architecture and request f
 """
 
 import streamlit as st
-import json
-import graphviz
 from auth import check_authentication, show_logout_button
-from architecture_data import COMPONENTS, LAYERS, FLOWS, SAMPLE_QUERIES, RAG_FLOW, MCP_FLOW
+from architecture_data import LAYERS
+from architecture_graph import get_architecture_graph
+from architecture_diagram import (
+    AUTO_COLLAPSE_COMPONENTS, architecture_restyle_css, create_architecture_diagram, create_flow_diagram,
+    default_expanded_layers, flow_split_point
+)
+from architecture_model import get_architecture_model
+from path_engine import get_parallel_branches, get_path_for_intent, get_request_response_paths
+from search_index import get_search_index
+from step_cards import animated_flow_status, render_step_cards
+from flow_dag import FlowDAG
+from load_simulation import SERVICE_DISTRIBUTIONS, RetryPolicy, sample_query_paths, simulate_load
+from capacity_planner import plan_replicas, replica_diff
+from latency_analysis import format_latency
+from latency_display import FLOW_SEQUENCES, show_latency_distribution
+from diagram_display import show_diagram, show_restyled_diagram
+from render_cache import dot_available, get_render_cache
+from prerender import PRERENDER_STATUS, start_background_prerender
+from model_watcher import (
+    check_for_changes, get_model_watcher, cached_derived, peek_derived, layer_dependencies, layer_key,
+    model_dependencies, sequence_dependencies
+)
 from drawio_exporter import export_to_drawio
+from drawio_pages import export_all_to_drawio
 from planner_functions import show_planner_details, show_decision_flow_tables
-from numbered_flow_diagram import create_numbered_flow_diagram, create_numbered_flow_diagram_vertical, get_flow_summary
-from openapi_flow_definitions import OPENAPI_MCP_FLOW, FLOW_COMPARISON, get_flow_comparison_summary
+from numbered_flow_diagram import (
+    available_flow_types, create_numbered_flow_diagram, create_numbered_flow_diagram_vertical, get_flow_summary,
+    get_model_flow_comparison
+)
+from openapi_flow_definitions import OPENAPI_MCP_FLOW, FLOW_COMPARISON
 from architecture_comparison import show_architecture_comparison
 from airport_transfer_page import show_airport_transfer_use_case
 from prompt_display import show_openapi_prompts
 from hld_page import show_high_level_architecture
 
-# Load enhanced component details
-try:
-    with open('enhanced_component_details.json', 'r') as f:
-        ENHANCED_DETAILS = json.load(f)
-except:
-    ENHANCED_DETAILS = {}
-import time
+# Pick up edits to the architecture data files since the last rerun
+MODEL_CHANGES = check_for_changes()
+
+# Warm the render cache for the most used diagrams (once per server process)
+start_background_prerender()
+
+# Enhanced component details are loaded once with the architecture model
+ENHANCED_DETAILS = get_architecture_model().enhanced_details
 
 # Page configuration
 st.set_page_config(
@@ -86,6 +110,47 @@ st.markdown("""
         border-radius: 5px;
         border-left: 4px solid #3B82F6;
     }
+    .flow-step.animated {
+        animation: flowStepIn 0.5s ease-out both;
+    }
+    @keyframes flowStepIn {
+        from { opacity: 0; transform: translateY(6px); }
+        to { opacity: 1; transform: none; }
+    }
+    .flow-progress {
+        height: 8px;
+        margin: 5px 0 10px 0;
+        border-radius: 4px;
+        background-color: #E5E7EB;
+        overflow: hidden;
+    }
+    .flow-progress > div {
+        width: 0;
+        height: 100%;
+        background-color: #3B82F6;
+        animation-name: flowProgress;
+        animation-timing-function: linear;
+        animation-fill-mode: forwards;
+    }
+    @keyframes flowProgress {
+        from { width: 0; }
+        to { width: 100%; }
+    }
+    .flow-status {
+        display: grid;
+    }
+    .flow-status > div {
+        grid-area: 1 / 1;
+        opacity: 0;
+        animation-name: flowStatus;
+        animation-timing-function: step-end;
+    }
+    .flow-status > div:last-child {
+        animation-fill-mode: forwards;
+    }
+    @keyframes flowStatus {
+        from, to { opacity: 1; }
+    }
     .layer-badge {
         display: inline-block;
         padding: 5px 10px;
@@ -101,6 +166,11 @@ st.markdown("""
 if not check_authentication():
     st.stop()
 
+if MODEL_CHANGES:
+    st.toast(f"🔄 Architecture data reloaded ({len(MODEL_CHANGES)} changed items)")
+if get_model_watcher().last_error:
+    st.warning(f"⚠️ Architecture data reload failed, showing the previous version: {get_model_watcher().last_error}")
+
 # Title
 st.markdown('<div class="main-header">🏗️ Enterprise Agent Platform - Architecture Visualizer</div>', unsafe_allow_html=True)
 
@@ -156,6 +226,30 @@ with st.sidebar:
         else:
             st.warning("⚠️ No API Key configured")
     
+    # Diagram render cache statistics
+    st.markdown("---")
+    with st.expander("⚡ Diagram Render Cache", expanded=False):
+        if dot_available():
+            render_stats = get_render_cache().stats()
+            st.markdown(f"""
+            - **Hits / Misses**: {render_stats['hits']} / {render_stats['misses']} ({render_stats['hit_rate']:.0%} hit rate)
+            - **Cached renders**: {render_stats['entries']} ({render_stats['bytes'] / 1024:.0f} KB)
+            - **Evictions**: {render_stats['evictions']}
+            """)
+            if PRERENDER_STATUS["state"] == "running" and PRERENDER_STATUS["total"]:
+                st.progress(
+                    PRERENDER_STATUS["done"] / PRERENDER_STATUS["total"],
+                    text=f"Pre-rendering {PRERENDER_STATUS['done']}/{PRERENDER_STATUS['total']}: {PRERENDER_STATUS['current']}"
+                )
+            elif PRERENDER_STATUS["state"] in ("done", "failed"):
+                summary = PRERENDER_STATUS["summary"]
+                if summary.get("total"):
+                    st.caption(f"Pre-rendered {summary['rendered']} diagrams ({summary['cached']} already cached) in {summary['seconds']:.1f}s")
+                for name, error in summary.get("errors", {}).items():
+                    st.caption(f"⚠️ {name}: {error}")
+        else:
+            st.info("Graphviz 'dot' is not installed; diagrams are rendered in the browser.")
+    
     # Show logout button
     show_logout_button()
 
@@ -266,16 +360,19 @@ def show_overview():
     # Quick stats
     st.markdown('<div class="sub-header">📊 Platform Statistics</div>', unsafe_allow_html=True)
     
+    graph = get_architecture_graph()
+    external_members = set(graph.layer_members('external'))
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Components", len(COMPONENTS))
+        st.metric("Total Components", len(graph.components))
     with col2:
-        st.metric("Integration Points", len([f for f in FLOWS if 'external' in [COMPONENTS[f['from']]['layer'], COMPONENTS[f['to']]['layer']]]))
+        st.metric("Integration Points", len([f for f in graph.flows if f.source.id in external_members or f.target.id in external_members]))
     with col3:
-        st.metric("Security Layers", len([c for c in COMPONENTS.values() if c['layer'] == 'security']))
+        st.metric("Security Layers", len(graph.layer_members('security')))
     with col4:
-        st.metric("Specialized Agents", len([c for c in COMPONENTS.values() if c['layer'] == 'agents']))
+        st.metric("Specialized Agents", len(graph.layer_members('agents')))
     
     st.markdown("---")
     st.markdown('<div class="sub-header">📦 Deployment Architecture</div>', unsafe_allow_html=True)
@@ -321,8 +418,12 @@ def show_component_explorer():
     See database operations, API calls, deployment architecture, and message protocols for each component.
     """)
     
+    graph = get_architecture_graph()
+    
     st.info("💡 **Tip:** Look for the 'Deployment Architecture' section in each component to see if it's a container (⭐ Microservice), managed service (☁️ Azure PaaS), or external API (🌐 Backend).")
     
+    show_blast_radius(graph)
+    
     # Layer filter
     col1, col2 = st.columns([1, 2])
     
@@ -337,25 +438,33 @@ def show_component_explorer():
     with col1:
         selected_layer = st.selectbox(
             "Filter by Layer:",
-            ["All Layers"] + [layer_info['name'] for layer_info in sorted(LAYERS.values(), key=lambda x: x['order'])]
+            ["All Layers"] + graph.layer_names
         )
     
     with col2:
-        search_term = st.text_input("🔎 Search components:", placeholder="Type component name...")
+        search_term = st.text_input("🔎 Search components:", placeholder="Name, description, functions, API calls, DB operations...")
+    
+    # Ranked full-text matches (all components when there is no search)
+    search_matches = {}
+    if search_term.strip():
+        search_matches = {match["id"]: match for match in get_search_index().search(search_term)}
+        candidate_ids = list(search_matches)
+    else:
+        candidate_ids = list(graph.components)
     
     # Filter components
     filtered_components = {}
-    for comp_id, comp_data in COMPONENTS.items():
+    for comp_id in candidate_ids:
+        comp = graph.component(comp_id)
         # Apply layer filter
         if selected_layer != "All Layers":
-            layer_name = LAYERS[comp_data['layer']]['name']
-            if layer_name != selected_layer:
+            if graph.layer_name(comp_id) != selected_layer:
                 continue
         
         # Apply deployment filter
         if deployment_filter != "All Types":
-            if comp_id in ENHANCED_DETAILS:
-                deployment_type = ENHANCED_DETAILS[comp_id].get('deployment_type', '')
+            if comp.details is not None:
+                deployment_type = comp.deployment_type
                 if deployment_filter == "⭐ Containers Only" and 'Container' not in deployment_type:
                     continue
                 elif deployment_filter == "☁️ Managed Services" and 'Managed' not in deployment_type:
@@ -366,33 +475,21 @@ def show_component_explorer():
                 # Skip if no deployment info and filter is active
                 continue
         
-        # Apply search filter
-        if search_term and search_term.lower() not in comp_data['name'].lower():
-            continue
-        
-        filtered_components[comp_id] = comp_data
+        filtered_components[comp_id] = comp
     
     # Display components
     st.markdown(f"**Showing {len(filtered_components)} component(s)**")
     
-    for comp_id, comp_data in filtered_components.items():
-        layer_info = LAYERS[comp_data['layer']]
-        
-        # Add deployment indicator
-        deployment_indicator = ""
-        if comp_id in ENHANCED_DETAILS:
-            deployment_type = ENHANCED_DETAILS[comp_id].get('deployment_type', '')
-            if 'Container' in deployment_type:
-                deployment_indicator = " ⭐"
-            elif 'Managed' in deployment_type:
-                deployment_indicator = " ☁️"
-            elif deployment_type.startswith('External'):
-                deployment_indicator = " 🌐"
+    for comp_id, comp in filtered_components.items():
+        layer_info = graph.layer_info(comp_id)
         
-        with st.expander(f"{comp_data['icon']} {comp_data['name']}{deployment_indicator} - {layer_info['name']}", expanded=False):
+        with st.expander(f"{comp.icon} {comp.name}{comp.deployment_badge} - {layer_info['name']}", expanded=False):
+            if comp_id in search_matches:
+                st.caption("🔎 Matched in: " + ", ".join(field.replace('_', ' ') for field in search_matches[comp_id]["fields"]))
+            
             st.markdown(f"""
             <div class="component-box">
-                <div class="component-title">{comp_data['icon']} {comp_data['name']}</div>
+                <div class="component-title">{comp.icon} {comp.name}</div>
                 
                 <div style="margin: 10px 0;">
                     <span class="layer-badge" style="background-color: {layer_info['color']}; color: #1E3A8A;">
@@ -403,22 +500,22 @@ def show_component_explorer():
                 <div style="margin-top: 15px;">
                     <strong>🔵 Technical Explanation:</strong>
                     <div class="technical-text">
-                        {comp_data['technical']}
+                        {comp.technical}
                     </div>
                 </div>
                 
                 <div style="margin-top: 15px;">
                     <strong>🟢 Layman Explanation:</strong>
                     <div class="layman-text">
-                        {comp_data['layman']}
+                        {comp.layman}
                     </div>
                 </div>
             </div>
             """, unsafe_allow_html=True)
             
             # Show enhanced details if available
-            if comp_id in ENHANCED_DETAILS:
-                details = ENHANCED_DETAILS[comp_id]
+            if comp.details is not None:
+                details = comp.details
                 
                 st.markdown("---")
                 st.markdown("### 💾 Database Operations")
@@ -489,8 +586,8 @@ def show_component_explorer():
                             st.code(endpoint, language="http")
             
             # Show connections with protocols
-            incoming = [f for f in FLOWS if f['to'] == comp_id]
-            outgoing = [f for f in FLOWS if f['from'] == comp_id]
+            incoming = graph.incoming(comp_id)
+            outgoing = graph.outgoing(comp_id)
             
             if incoming or outgoing:
                 st.markdown("**🔗 Connections & Data Flow:**")
@@ -501,15 +598,61 @@ def show_component_explorer():
                     if incoming:
                         st.markdown("**⬅️ Incoming:**")
                         for flow in incoming:
-                            from_comp = COMPONENTS[flow['from']]
-                            st.markdown(f"- {from_comp['icon']} {from_comp['name']} → *{flow['label']}*")
+                            from_comp = flow.source
+                            st.markdown(f"- {from_comp.icon} {from_comp.name} → *{flow.label}*")
                 
                 with col2:
                     if outgoing:
                         st.markdown("**➡️ Outgoing:**")
                         for flow in outgoing:
-                            to_comp = COMPONENTS[flow['to']]
-                            st.markdown(f"- *{flow['label']}* → {to_comp['icon']} {to_comp['name']}")
+                            to_comp = flow.target
+                            st.markdown(f"- *{flow.label}* → {to_comp.icon} {to_comp.name}")
+
+
+def show_blast_radius(graph):
+    """Display everything upstream and downstream of a selected component"""
+    with st.expander("🧭 Blast Radius Analysis", expanded=False):
+        st.markdown("Select a component to see everything that depends on it (upstream) and everything it depends on (downstream) through the architecture flows. Response flows back to callers are not counted as dependencies.")
+        
+        names = {comp.name: comp_id for comp_id, comp in graph.components.items()}
+        selected = st.selectbox("Analyze component:", ["None"] + list(names), key="blast_radius_component")
+        if selected == "None":
+            return
+        
+        comp_id = names[selected]
+        radius = graph.blast_radius(comp_id)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("⬆️ Upstream (depends on it)", len(radius["upstream"]))
+        with col2:
+            st.metric("⬇️ Downstream (it depends on)", len(radius["downstream"]))
+        with col3:
+            st.metric("🛣️ Request Paths Through It", len(radius["queries"]) + len(radius["sequences"]))
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**🟧 Upstream**")
+            for dep_id in radius["upstream"]:
+                dep = graph.component(dep_id)
+                st.markdown(f"- {dep.icon} {dep.name}")
+        with col2:
+            st.markdown("**🟦 Downstream**")
+            for dep_id in radius["downstream"]:
+                dep = graph.component(dep_id)
+                st.markdown(f"- {dep.icon} {dep.name}")
+        
+        if radius["queries"] or radius["sequences"]:
+            st.markdown("**🛣️ Paths visiting this component:** " + ", ".join(
+                list(radius["queries"]) + [f"{name.upper()} numbered flow" for name in radius["sequences"]]
+            ))
+        
+        impact_diagram = cached_derived(
+            ("blast_radius", comp_id),
+            model_dependencies(graph),
+            lambda: create_architecture_diagram(graph.layer_names, "None", "Left to Right", comp_id)
+        )
+        show_diagram(impact_diagram, use_container_width=True)
 
 
 def show_request_simulator():
@@ -521,13 +664,15 @@ def show_request_simulator():
     to visualize the complete journey from input to output.
     """)
     
+    model = get_architecture_model()
+    
     # Query input
     col1, col2 = st.columns([2, 1])
     
     with col1:
         query_type = st.selectbox(
             "Select a sample query:",
-            ["Custom Query"] + list(SAMPLE_QUERIES.keys())
+            ["Custom Query"] + list(model.sample_queries.keys())
         )
     
     with col2:
@@ -545,22 +690,26 @@ def show_request_simulator():
             intent = classify_intent(user_query)
             st.info(f"🎯 Detected Intent: **{intent}**")
             
-            # Get path based on intent
-            if intent in ["card", "loan", "wealth"]:
-                path = get_path_for_intent(intent)
-            else:
-                path = SAMPLE_QUERIES["General Question"]["path"]
+            # Get path derived from the architecture graph for this intent
+            path = model.path_components(get_path_for_intent(intent))
+            if not path:
+                st.warning(f"The loaded model has no path for the **{intent}** intent.")
+                return
+            derived_paths = get_request_response_paths(intent)
+            parallel = get_parallel_branches(intent)
             
             explanation = f"Based on your query, the system will route this through the {intent} processing pipeline."
         else:
             st.warning("Please enter a query to simulate the flow.")
             return
     else:
-        query_data = SAMPLE_QUERIES[query_type]
-        user_query = query_data["query"]
-        intent = query_data["intent"]
-        path = query_data["path"]
-        explanation = query_data["explanation"]
+        query_data = model.sample_queries[query_type]
+        user_query = query_data.query
+        intent = query_data.intent
+        path = model.path_components(query_data.path)
+        explanation = query_data.explanation
+        derived_paths = None
+        parallel = query_data.parallel
         
         st.text_area("Query:", value=user_query, height=100, disabled=True)
         st.info(f"🎯 Intent: **{intent.title()}**")
@@ -574,15 +723,12 @@ def show_request_simulator():
     """, unsafe_allow_html=True)
     
     # Determine request/response split point
-    # Find where the flow reaches the furthest point (usually an external API or database)
-    # Then everything after is the response path
-    split_point = len(path) // 2  # Simple heuristic: halfway point
-    
-    # Better heuristic: find the last external/data component
-    for i in range(len(path) - 1, -1, -1):
-        if path[i] in ['accounts_api', 'cards_api', 'loans_api', 'crm', 'cosmos_db', 'vector_db']:
-            split_point = i + 1
-            break
+    # Derived paths know exactly where the response starts; otherwise everything after
+    # the furthest point (usually an external API or database) is the response path
+    if derived_paths:
+        split_point = len(derived_paths[0])
+    else:
+        split_point = flow_split_point(path, parallel)
     
     request_path = path[:split_point]
     response_path = path[split_point:]
@@ -598,178 +744,223 @@ def show_request_simulator():
         st.markdown("#### ⬅️ Response Path (Backward)")
         st.caption(f"{len(response_path)} steps")
     
-    if show_animation:
-        # Animated flow
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        flow_container = st.container()
+    # All step cards are built in one pass and sent as a single element; the
+    # animated variant is revealed by CSS animation delays in the browser
+    path_ids = tuple(comp.id for comp in path)
+    step_cards = cached_derived(
+        ("step_cards", path_ids, split_point, show_animation),
+        frozenset(path_ids).union(layer_key(comp.layer) for comp in path),
+        lambda: (animated_flow_status(path, split_point) if show_animation else "") +
+                render_step_cards(path, split_point, animate=show_animation, headings=not show_animation)
+    )
+    st.markdown(step_cards, unsafe_allow_html=True)
+    
+    # Generate flow diagram
+    st.markdown("### 📊 Flow Diagram")
+    flow_dag = FlowDAG(path, parallel)
+    flow_graph = cached_derived(
+        ("flow_diagram", path_ids, split_point, tuple(flow_dag.edges)),
+        path_ids,
+        lambda: create_flow_diagram(path, split_point, parallel)
+    )
+    show_diagram(flow_graph)
+    
+    # Parallel fan-out: the request takes as long as its critical path, not the sum of its hops
+    if flow_dag.forks:
+        critical = flow_dag.critical_path()
+        st.info(
+            f"⚡ {len(flow_dag.forks)} parallel fan-out{'s' if len(flow_dag.forks) > 1 else ''}: critical path "
+            f"**{format_latency(critical['total_ms'])}** vs {format_latency(critical['sequential_ms'])} run "
+            f"sequentially (saves {format_latency(critical['parallel_savings_ms'])})"
+        )
+    
+    show_load_simulation(query_type, flow_dag)
+    show_capacity_planner()
+
+
+def show_load_simulation(query_name: str, flow_dag: FlowDAG):
+    """Display the discrete-event load simulation of the selected path or the sample query mix"""
+    with st.expander("📈 Load Simulation", expanded=False):
+        st.caption(
+            "Simulates a stream of requests: every containerized component is a queue served by its replicas, "
+            "with service times around its latency; managed services and external APIs are modeled as pure delays."
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            rps = st.number_input("Requests per second", min_value=1.0, max_value=2000.0, value=50.0, step=10.0)
+            traffic = st.radio("Traffic", ["This query only", "Even mix of all sample queries"])
+        with col2:
+            duration_s = st.slider("Simulated seconds", min_value=10, max_value=300, value=60, step=10)
+            distribution = st.selectbox("Service time distribution", SERVICE_DISTRIBUTIONS)
+        with col3:
+            replica_scale = st.slider("Replica multiplier", min_value=1, max_value=10, value=1,
+                                      help="Scale every containerized component's replicas")
         
-        # Request path
-        status_text.markdown("🚀 **Request Phase: Forwarding to backend...**")
-        for i, comp_id in enumerate(request_path):
-            comp_data = COMPONENTS[comp_id]
-            layer_info = LAYERS[comp_data['layer']]
-            
-            # Get deployment indicator
-            deployment_badge = ""
-            protocol_info = ""
-            if comp_id in ENHANCED_DETAILS:
-                details = ENHANCED_DETAILS[comp_id]
-                deployment_type = details.get('deployment_type', '')
-                if 'Container' in deployment_type:
-                    deployment_badge = " ⭐"
-                elif 'Managed' in deployment_type:
-                    deployment_badge = " ☁️"
-                elif deployment_type.startswith('External'):
-                    deployment_badge = " 🌐"
-                
-                # Get protocol for next step
-                if i < len(request_path) - 1:
-                    outbound = details.get('outbound_protocol', '')
-                    if outbound:
-                        protocol_info = f"<br/><small style='color: #8B5CF6;'>📡 {outbound}</small>"
-            
-            progress = (i + 1) / len(path)
-            progress_bar.progress(progress)
-            status_text.markdown(f"**Step {i+1}/{len(path)}:** ➡️ Processing at {comp_data['name']}...")
-            
-            with flow_container:
-                st.markdown(f"""
-                <div class="flow-step" style="animation: fadeIn 0.5s; border-left: 4px solid #3B82F6;">
-                    <strong>{i+1}. {comp_data['icon']} {comp_data['name']}{deployment_badge}</strong>
-                    <br/>
-                    <small style="color: #6B7280;">{layer_info['name']}</small>
-                    <br/>
-                    <span style="color: #059669; font-size: 0.9rem;">{comp_data['layman']}</span>
-                    {protocol_info}
-                </div>
-                """, unsafe_allow_html=True)
-            
-            time.sleep(0.3)  # Animation delay
+        graph = get_architecture_graph()
+        paths = sample_query_paths() if traffic != "This query only" else {query_name: flow_dag}
         
-        # Response path
-        status_text.markdown("🔙 **Response Phase: Returning to customer...**")
-        for i, comp_id in enumerate(response_path):
-            comp_data = COMPONENTS[comp_id]
-            layer_info = LAYERS[comp_data['layer']]
-            
-            # Get deployment indicator
-            deployment_badge = ""
-            protocol_info = ""
-            if comp_id in ENHANCED_DETAILS:
-                details = ENHANCED_DETAILS[comp_id]
-                deployment_type = details.get('deployment_type', '')
-                if 'Container' in deployment_type:
-                    deployment_badge = " ⭐"
-                elif 'Managed' in deployment_type:
-                    deployment_badge = " ☁️"
-                elif deployment_type.startswith('External'):
-                    deployment_badge = " 🌐"
-                
-                # Get protocol for next step
-                if i < len(response_path) - 1:
-                    inbound = details.get('inbound_protocol', '')
-                    if inbound:
-                        protocol_info = f"<br/><small style='color: #8B5CF6;'>📡 {inbound}</small>"
-            
-            actual_step = len(request_path) + i + 1
-            progress = actual_step / len(path)
-            progress_bar.progress(progress)
-            status_text.markdown(f"**Step {actual_step}/{len(path)}:** ⬅️ Returning through {comp_data['name']}...")
-            
-            with flow_container:
-                st.markdown(f"""
-                <div class="flow-step" style="animation: fadeIn 0.5s; border-left: 4px solid #10B981;">
-                    <strong>{actual_step}. {comp_data['icon']} {comp_data['name']}{deployment_badge}</strong>
-                    <br/>
-                    <small style="color: #6B7280;">{layer_info['name']}</small>
-                    <br/>
-                    <span style="color: #059669; font-size: 0.9rem;">{comp_data['layman']}</span>
-                    {protocol_info}
-                </div>
-                """, unsafe_allow_html=True)
-            
-            time.sleep(0.3)  # Animation delay
+        # Failure injection on one component, with a retry policy applied to every call
+        st.markdown("**Failures & Retries**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            path_components = list(dict.fromkeys(comp_id for comp_ids in paths.values() for comp_id in comp_ids))
+            failing = st.selectbox(
+                "Failing component", ["None"] + path_components,
+                index=1 + path_components.index("azure_openai") if "azure_openai" in path_components else 0,
+                format_func=lambda comp_id: comp_id if comp_id == "None" else
+                f"{graph.component(comp_id).icon} {graph.component(comp_id).name}"
+            )
+            failure_pct = st.slider("Failure rate (%)", min_value=0, max_value=50, value=0, disabled=failing == "None")
+        with col2:
+            timeout_ms = st.number_input("Caller timeout (ms, 0 = none)", min_value=0, max_value=60000, value=0,
+                                         step=100, disabled=failing == "None")
+        with col3:
+            max_attempts = st.slider("Attempts per call", min_value=1, max_value=6, value=3,
+                                     help="Including the first try; 1 disables retries")
+            backoff_ms = st.number_input("Initial backoff (ms)", min_value=0, max_value=10000, value=100, step=50,
+                                         help="Doubles on every retry, with full jitter")
         
-        status_text.markdown("✅ **Request completed successfully! Response delivered to customer.**")
-    else:
-        # Static flow with bidirectional display
-        st.markdown("#### ➡️ Request Path")
-        for i, comp_id in enumerate(request_path):
-            comp_data = COMPONENTS[comp_id]
-            layer_info = LAYERS[comp_data['layer']]
-            
-            # Get deployment indicator and protocol
-            deployment_badge = ""
-            protocol_info = ""
-            if comp_id in ENHANCED_DETAILS:
-                details = ENHANCED_DETAILS[comp_id]
-                deployment_type = details.get('deployment_type', '')
-                if 'Container' in deployment_type:
-                    deployment_badge = " ⭐"
-                elif 'Managed' in deployment_type:
-                    deployment_badge = " ☁️"
-                elif deployment_type.startswith('External'):
-                    deployment_badge = " 🌐"
-                
-                if i < len(request_path) - 1:
-                    outbound = details.get('outbound_protocol', '')
-                    if outbound:
-                        protocol_info = f"<br/><small style='color: #8B5CF6;'>📡 {outbound}</small>"
-            
-            st.markdown(f"""
-            <div class="flow-step" style="border-left: 4px solid #3B82F6;">
-                <strong>{i+1}. {comp_data['icon']} {comp_data['name']}{deployment_badge}</strong>
-                <br/>
-                <small style="color: #6B7280;">{layer_info['name']}</small>
-                <br/>
-                <span style="color: #059669; font-size: 0.9rem;">{comp_data['layman']}</span>
-                {protocol_info}
-            </div>
-            """, unsafe_allow_html=True)
+        if not st.button("▶️ Run Simulation"):
+            return
         
-        st.markdown("---")
-        st.markdown("#### ⬅️ Response Path")
-        for i, comp_id in enumerate(response_path):
-            comp_data = COMPONENTS[comp_id]
-            layer_info = LAYERS[comp_data['layer']]
-            
-            # Get deployment indicator and protocol
-            deployment_badge = ""
-            protocol_info = ""
-            if comp_id in ENHANCED_DETAILS:
-                details = ENHANCED_DETAILS[comp_id]
-                deployment_type = details.get('deployment_type', '')
-                if 'Container' in deployment_type:
-                    deployment_badge = " ⭐"
-                elif 'Managed' in deployment_type:
-                    deployment_badge = " ☁️"
-                elif deployment_type.startswith('External'):
-                    deployment_badge = " 🌐"
-                
-                if i < len(response_path) - 1:
-                    inbound = details.get('inbound_protocol', '')
-                    if inbound:
-                        protocol_info = f"<br/><small style='color: #8B5CF6;'>📡 {inbound}</small>"
-            
-            actual_step = len(request_path) + i + 1
-            st.markdown(f"""
-            <div class="flow-step" style="border-left: 4px solid #10B981;">
-                <strong>{actual_step}. {comp_data['icon']} {comp_data['name']}{deployment_badge}</strong>
-                <br/>
-                <small style="color: #6B7280;">{layer_info['name']}</small>
-                <br/>
-                <span style="color: #059669; font-size: 0.9rem;">{comp_data['layman']}</span>
-                {protocol_info}
-            </div>
-            """, unsafe_allow_html=True)
-    
-    # Generate flow diagram
-    st.markdown("### 📊 Flow Diagram")
-    flow_graph = create_flow_diagram(path)
-    st.graphviz_chart(flow_graph)
+        failure_rate = {failing: failure_pct / 100} if failing != "None" and failure_pct else {}
+        timeouts = {failing: float(timeout_ms)} if failing != "None" and timeout_ms else {}
+        retries = {("*", "*"): RetryPolicy(max_attempts, backoff_ms)} if max_attempts > 1 else {}
+        replicas = {
+            comp_id: graph.component(comp_id).replicas * replica_scale
+            for comp_ids in paths.values() for comp_id in comp_ids
+            if graph.component(comp_id).replicas
+        }
+        with st.spinner("Simulating..."):
+            result = cached_derived(
+                ("load_simulation", tuple((name, tuple(dag), tuple(dag.edges)) for name, dag in paths.items()), rps,
+                 duration_s, distribution, replica_scale, tuple(failure_rate.items()), tuple(timeouts.items()), max_attempts,
+                 backoff_ms),
+                model_dependencies(graph),
+                lambda: simulate_load(paths, rps, duration_s, replicas=replicas, distribution=distribution,
+                                      failure_rate=failure_rate, timeout_ms=timeouts, retries=retries)
+            )
+        
+        latency = result['latency_ms']
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Throughput", f"{result['throughput_rps']:.1f} req/s")
+        col2.metric("p50 Latency", format_latency(latency['p50']))
+        col3.metric("p95 Latency", format_latency(latency['p95']))
+        col4.metric("p99 Latency", format_latency(latency['p99']))
+        if result['failed'] or failure_rate or timeouts:
+            st.caption(f"Success rate {result['success_rate'] * 100:.2f}% ({result['failed']:,} requests failed "
+                       f"after exhausting their retries); latencies are of successful requests")
+        
+        amplified = [
+            f"{graph.component(comp_id).name} ×{stats['amplification']:.2f}"
+            for comp_id, stats in result['components'].items() if stats['amplification'] > 1.005
+        ]
+        if amplified:
+            st.info(f"Retries amplify load: {', '.join(amplified)} attempts per call")
+        
+        saturated = [
+            graph.component(comp_id).name for comp_id, stats in result['components'].items()
+            if stats['offered_load'] is not None and stats['offered_load'] >= 1
+        ]
+        if saturated:
+            st.warning(f"Over capacity at this rate (latency keeps growing): {', '.join(saturated)}")
+        
+        if result['skipped']:
+            st.caption("Modeled as pure delays for lack of deployment data (no deployment type or replica count): " +
+                       ", ".join(graph.component(comp_id).name for comp_id in result['skipped']))
+        
+        rows = []
+        for comp_id, stats in sorted(result['components'].items(),
+                                     key=lambda item: item[1]['utilisation'] or 0, reverse=True):
+            comp = graph.component(comp_id)
+            rows.append({
+                "Component": f"{comp.icon} {comp.name}",
+                "Servers": stats['servers'] or "∞",
+                "Visits / Request": round(stats['visits'], 2),
+                "Utilisation": f"{stats['utilisation'] * 100:.0f}%" if stats['utilisation'] is not None else "-",
+                "Mean Wait (ms)": round(stats['mean_wait_ms'], 1),
+                "Max Queue": stats['max_queue'],
+                "Attempts / Call": round(stats['amplification'], 2),
+                "Failed": stats['failures'],
+                "Timed Out": stats['timeouts']
+            })
+        st.table(rows)
+        
+        if len(result['queries']) > 1:
+            st.table([
+                {"Query": name, "Requests": stats['count'], "p50 (ms)": round(stats['p50']),
+                 "p95 (ms)": round(stats['p95']), "p99 (ms)": round(stats['p99'])}
+                for name, stats in result['queries'].items()
+            ])
+        st.caption(f"{result['requests']:,} requests simulated, measured over {result['window_s']:.0f}s "
+                   f"after warm-up, in {result['wall_seconds']:.2f}s")
 
 
+def show_capacity_planner():
+    """Display the replica capacity planner for a target request rate, traffic mix and latency SLO"""
+    with st.expander("🧮 Replica Capacity Planner", expanded=False):
+        st.caption(
+            "Finds the fewest replicas per containerized component that meet the latency SLO at the target rate, "
+            "using M/M/c (Erlang C) queueing over the visits each sample query makes."
+        )
+        model = get_architecture_model()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            target_rps = st.number_input("Target requests per second", min_value=1.0, max_value=100000.0,
+                                         value=200.0, step=50.0)
+        with col2:
+            slo_ms = st.number_input("Latency SLO (ms)", min_value=100.0, max_value=60000.0, value=2000.0, step=100.0)
+        with col3:
+            slo_percentile = st.selectbox("SLO percentile", [95, 99, 50], format_func=lambda q: f"p{q}")
+        
+        st.markdown("**Traffic mix** (relative weight per query)")
+        mix_columns = st.columns(3)
+        mix = {}
+        for i, name in enumerate(model.sample_queries):
+            with mix_columns[i % 3]:
+                mix[name] = st.number_input(name, min_value=0.0, value=1.0, step=1.0, key=f"capacity_mix_{name}")
+        if not any(mix.values()):
+            st.warning("Give at least one query a weight above zero.")
+            return
+        
+        plan = plan_replicas(target_rps, slo_ms, mix, slo_percentile)
+        graph = get_architecture_graph()
+        rows = []
+        for comp_id, sizing in sorted(plan['components'].items(),
+                                      key=lambda item: item[1]['required'] - (item[1]['current'] or 0), reverse=True):
+            comp = graph.component(comp_id)
+            change = sizing['required'] - (sizing['current'] or 0)
+            rows.append({
+                "Component": f"{comp.icon} {comp.name}",
+                "Current": sizing['current'] if sizing['current'] is not None else "-",
+                "Required": sizing['required'],
+                "Change": f"{change:+d}" if change else "",
+                "Visits / s": round(sizing['arrival_rps'], 1),
+                "Utilisation": f"{sizing['utilisation'] * 100:.0f}%",
+                "Mean Wait (ms)": round(sizing['wait_ms'], 1)
+            })
+        st.table(rows)
+        
+        st.table([
+            {"Query": name, f"p{slo_percentile} (ms)": round(path['latency_ms']),
+             "Without Queueing (ms)": round(path['base_ms']), "Meets SLO": "✅" if path['meets_slo'] else "❌"}
+            for name, path in plan['paths'].items()
+        ])
+        if plan['infeasible']:
+            st.warning(f"No replica count meets the SLO for: {', '.join(plan['infeasible'])} "
+                       "(service time alone is too slow)")
+        if plan['skipped']:
+            st.caption("Not sized, planned as pure delays (no deployment type in the model): " +
+                       ", ".join(graph.component(comp_id).name for comp_id in plan['skipped']))
+        
+        diff = replica_diff(plan)
+        if diff:
+            st.markdown("**Replica changes** for `enhanced_component_details.json`")
+            st.code(diff, language="diff")
+            st.download_button("💾 Download Patch", data=diff, file_name="replicas.patch", mime="text/x-diff")
+        else:
+            st.success("Current replicas already match the plan.")
+
 def show_numbered_flows():
     """Display numbered flow diagrams with color coding"""
     st.markdown('<div class="sub-header">🎯 Numbered Flow Sequences</div>', unsafe_allow_html=True)
@@ -798,11 +989,15 @@ def show_numbered_flows():
         - **Color**: Purple (#7C3AED)
         """)
     else:
-        st.info("""
-        🔄 **Comparison Mode**: View both architectures side-by-side to understand trade-offs.
-        - Blue: Code-Based (21 steps, 512ms)
-        - Purple: OpenAPI-Based (27 steps, 612ms)
-        """)
+        comparison = get_model_flow_comparison()
+        if comparison is not None:
+            code_based = comparison["code_based"]
+            openapi_based = comparison["openapi_based"]
+            st.info(f"""
+            🔄 **Comparison Mode**: View both architectures side-by-side to understand trade-offs.
+            - Blue: Code-Based ({code_based['steps']} steps, {code_based['latency_ms']}ms)
+            - Purple: OpenAPI-Based ({openapi_based['steps']} steps, {openapi_based['latency_ms']}ms)
+            """)
     
     st.markdown("---")
     
@@ -846,10 +1041,16 @@ def show_numbered_flows():
     
     col1, col2 = st.columns(2)
     
+    # External model files may leave out the numbered-flow sequences; their sections are skipped
+    model = get_architecture_model()
+    
     with col1:
         st.markdown("#### 🟢 RAG Knowledge Retrieval")
-        rag_summary = get_flow_summary("rag")
-        st.markdown(f"""
+        rag_summary = cached_flow_summary("rag")
+        if not rag_summary:
+            st.info("The loaded model defines no \"rag\" sequence.")
+        else:
+            st.markdown(f"""
         - **Steps**: {rag_summary['steps']}
         - **Latency**: {rag_summary['latency']}
         - **Data Source**: {rag_summary['data_source']}
@@ -863,8 +1064,12 @@ def show_numbered_flows():
     
     with col2:
         st.markdown("#### 🔵 MCP Tool Call to Accounts API")
-        mcp_summary = get_flow_summary("mcp")
-        st.markdown(f"""
+        mcp_sequence = "mcp_openapi" if is_openapi else "mcp"
+        mcp_summary = cached_flow_summary(mcp_sequence)
+        if not mcp_summary:
+            st.info(f"The loaded model defines no \"{mcp_sequence}\" sequence.")
+        else:
+            st.markdown(f"""
         - **Steps**: {mcp_summary['steps']}
         - **Latency**: {mcp_summary['latency']}
         - **Data Source**: {mcp_summary['data_source']}
@@ -876,17 +1081,41 @@ def show_numbered_flows():
         **Use Cases**: {', '.join(mcp_summary['use_cases'])}
         """)
     
+    # Critical path breakdown computed from the flow definitions
+    with st.expander("⏱️ Latency Breakdown (Critical Path)", expanded=False):
+        st.caption("Computed from per-hop latencies in the model. Fan-out steps count their slowest hop; async steps are off the critical path.")
+        col1, col2 = st.columns(2)
+        for column, summary in [(col1, rag_summary), (col2, mcp_summary)]:
+            if summary:
+                with column:
+                    show_latency_breakdown(summary)
+    
+    # Full latency distributions; the sliders re-run the vectorized estimate
+    distribution_flows = [name for name, sequence in FLOW_SEQUENCES.items() if sequence in model.sequences]
+    if distribution_flows:
+        with st.expander("🎲 Latency Distribution (Monte Carlo)", expanded=False):
+            st.caption("Simulates every hop's latency as a random draw around its model latency and plots the end-to-end distribution.")
+            show_latency_distribution(distribution_flows, key="numbered_flows_latency")
+    
     st.markdown("---")
     
     # Display diagram
     st.markdown("### 🎨 Numbered Flow Diagram")
     
     if diagram_orientation == "Horizontal (Left to Right)":
-        flow_diagram = create_numbered_flow_diagram(flow_param)
+        create_diagram = create_numbered_flow_diagram
     else:
-        flow_diagram = create_numbered_flow_diagram_vertical(flow_param)
-    
-    st.graphviz_chart(flow_diagram)
+        create_diagram = create_numbered_flow_diagram_vertical
+    if not available_flow_types([flow_param]):
+        st.info("The loaded model does not define the sequences of this flow.")
+    else:
+        flow_diagram = cached_derived(
+            ("numbered_flow", flow_param, diagram_orientation),
+            sequence_dependencies(get_architecture_graph(), ["rag", "mcp", "mcp_openapi"]),
+            lambda: create_diagram(flow_param)
+        )
+        
+        show_diagram(flow_diagram)
     
     # Display detailed step-by-step breakdown
     st.markdown("---")
@@ -894,33 +1123,58 @@ def show_numbered_flows():
     
     tab1, tab2 = st.tabs(["🟢 RAG Flow Steps", "🔵 MCP Flow Steps"])
     
-    with tab1:
-        st.markdown("#### RAG Knowledge Retrieval Flow (11 Steps)")
-        st.markdown("**Use Case**: 'What are your business hours?'")
-        
-        for i, step in enumerate(RAG_FLOW, 1):
-            comp_from = COMPONENTS.get(step['from'], {})
-            comp_to = COMPONENTS.get(step['to'], {})
-            st.markdown(f"""
-            **Step {i}**: {comp_from.get('icon', '')} {comp_from.get('name', step['from'])} → 
-            {comp_to.get('icon', '')} {comp_to.get('name', step['to'])}
-            - Protocol: {step['label']}
-            - Action: {comp_from.get('technical', 'Processing')}
-            """)
-    
-    with tab2:
-        st.markdown("#### MCP Tool Call to Accounts API Flow (21 Steps)")
-        st.markdown("**Use Case**: 'Check my account balance'")
-        
-        for i, step in enumerate(MCP_FLOW, 1):
-            comp_from = COMPONENTS.get(step['from'], {})
-            comp_to = COMPONENTS.get(step['to'], {})
-            st.markdown(f"""
-            **Step {i}**: {comp_from.get('icon', '')} {comp_from.get('name', step['from'])} → 
-            {comp_to.get('icon', '')} {comp_to.get('name', step['to'])}
-            - Protocol: {step['label']}
-            - Action: {comp_from.get('technical', 'Processing')}
-            """)
+    # External model files may leave out the numbered-flow sequences
+    for tab, sequence, title, use_case in [
+        (tab1, "rag", "RAG Knowledge Retrieval Flow", "What are your business hours?"),
+        (tab2, "mcp", "MCP Tool Call to Accounts API Flow", "Check my account balance")
+    ]:
+        with tab:
+            steps = model.sequences.get(sequence)
+            if not steps:
+                st.info(f"The loaded model defines no \"{sequence}\" sequence.")
+                continue
+            
+            st.markdown(f"#### {title} ({len(steps)} Steps)")
+            st.markdown(f"**Use Case**: '{use_case}'")
+            
+            for i, step in enumerate(steps, 1):
+                comp_from = step.source
+                comp_to = step.target
+                st.markdown(f"""
+                **Step {i}**: {comp_from.icon} {comp_from.name} → 
+                {comp_to.icon} {comp_to.name}
+                - Protocol: {step.label}
+                - Action: {comp_from.technical or 'Processing'}
+                """)
+
+
+def cached_flow_summary(flow_type: str) -> dict:
+    """Flow summary with latency analysis, recomputed only when its sequence changes"""
+    return cached_derived(
+        ("flow_summary", flow_type),
+        sequence_dependencies(get_architecture_graph(), [flow_type]),
+        lambda: get_flow_summary(flow_type)
+    )
+
+
+def show_latency_breakdown(summary: dict):
+    """Display the critical path and per-component latency share for a flow summary"""
+    graph = get_architecture_graph()
+    analysis = summary['analysis']
+    
+    st.markdown(f"**{summary['name']}**: {summary['latency']} end-to-end")
+    if analysis['fanout_savings_ms']:
+        st.caption(f"Parallel fan-out saves {round(analysis['fanout_savings_ms'])}ms")
+    
+    share_rows = []
+    for comp_id, share in analysis['component_share'].items():
+        comp = graph.components.get(comp_id)
+        share_rows.append({
+            "Component": f"{comp.icon} {comp.name}" if comp else comp_id,
+            "Latency (ms)": round(share['latency_ms']),
+            "Share": f"{share['share'] * 100:.1f}%"
+        })
+    st.table(share_rows)
 
 
 def show_full_architecture():
@@ -932,20 +1186,22 @@ def show_full_architecture():
     Use the filters below to focus on specific aspects.
     """)
     
+    graph = get_architecture_graph()
+    
     # Filters
     col1, col2, col3 = st.columns(3)
     
     with col1:
         show_layers = st.multiselect(
             "Show Layers:",
-            [layer_info['name'] for layer_info in sorted(LAYERS.values(), key=lambda x: x['order'])],
-            default=[layer_info['name'] for layer_info in sorted(LAYERS.values(), key=lambda x: x['order'])]
+            graph.layer_names,
+            default=graph.layer_names
         )
     
     with col2:
         highlight_component = st.selectbox(
             "Highlight Component:",
-            ["None"] + [comp['name'] for comp in COMPONENTS.values()]
+            ["None"] + [comp.name for comp in graph.components.values()]
         )
     
     with col3:
@@ -955,35 +1211,111 @@ def show_full_architecture():
             index=0
         )
     
-    # Export button
+    # Collapse mode: large diagrams default to one node per layer
+    col_collapse1, col_collapse2 = st.columns([1, 2])
+    with col_collapse1:
+        collapse_layers = st.checkbox(
+            "🗜️ Collapse layers into summary nodes",
+            value=default_expanded_layers(show_layers) is not None,
+            help=f"Enabled by default above {AUTO_COLLAPSE_COMPONENTS} visible components"
+        )
+    expanded_layers = None
+    if collapse_layers:
+        with col_collapse2:
+            expanded_layers = st.multiselect("Expand layers:", show_layers, default=[])
+    
+    color_by_layer = st.checkbox("🎨 Color components by layer")
+    
+    impact_component = None
+    if highlight_component != "None":
+        if st.checkbox("🧭 Show blast radius of highlighted component (🟧 depends on it, 🟦 it depends on)"):
+            impact_component = next(comp.id for comp in graph.components.values() if comp.name == highlight_component)
+    
+    # Diagrams and exports of this view only depend on the visible layers
+    view_dependencies = layer_dependencies(graph, show_layers)
+    
+    # Export buttons: exports are memoized in the shared derived cache, so a built
+    # export is handed straight to the download button on every rerun
     col_export1, col_export2, col_export3 = st.columns([2, 1, 2])
     with col_export2:
-        if st.button("📥 Export to Draw.io", use_container_width=True):
-            direction_code = "TB" if diagram_direction == "Top to Bottom" else "LR"
-            drawio_content = export_to_drawio(show_layers, direction_code)
+        compress_export = st.checkbox(
+            "🗜️ Compressed file",
+            help="draw.io's compressed format: a much smaller file that downloads and opens faster"
+        )
+        direction_code = "TB" if diagram_direction == "Top to Bottom" else "LR"
+        export_key = ("drawio", tuple(show_layers), direction_code, compress_export)
+        drawio_content = peek_derived(export_key)
+        # An uncollapsed view shares its Graphviz layout with the export, leaving only serialization,
+        # so the export is built up front; collapsed (large) views build it on request
+        if drawio_content is None and (
+            expanded_layers is None or st.button("📥 Prepare Draw.io Export", use_container_width=True)
+        ):
+            drawio_content = cached_derived(
+                export_key,
+                view_dependencies,
+                lambda: export_to_drawio(show_layers, direction_code, compressed=compress_export)
+            )
+        if drawio_content is not None:
             st.download_button(
-                label="💾 Download .drawio File",
+                label="📥 Export to Draw.io",
                 data=drawio_content,
                 file_name="enterprise_architecture.drawio",
                 mime="application/xml",
+                use_container_width=True,
+                help="Open with draw.io or diagrams.net"
+            )
+        
+        all_views_key = ("drawio_all", compress_export)
+        all_views_content = peek_derived(all_views_key)
+        if all_views_content is None and st.button(
+            "📚 Prepare All Views", use_container_width=True,
+            help="One .drawio file with a page per view: architecture, numbered flows, sample queries and the airport journey"
+        ):
+            with st.spinner("Building pages..."):
+                all_views_content = cached_derived(
+                    all_views_key,
+                    model_dependencies(graph),
+                    lambda: export_all_to_drawio(compressed=compress_export)
+                )
+        if all_views_content is not None:
+            st.download_button(
+                label="📚 Export All Views",
+                data=all_views_content,
+                file_name="enterprise_architecture_all_views.drawio",
+                mime="application/xml",
                 use_container_width=True
             )
-            st.success("✅ Click above to download! Open with draw.io or diagrams.net")
     
     st.markdown("---")
     
-    # Generate diagram
-    graph = create_architecture_diagram(show_layers, highlight_component, diagram_direction)
-    st.graphviz_chart(graph, use_container_width=True)
+    # Lay out the unhighlighted diagram once; highlight, blast radius and layer colouring restyle its SVG
+    expanded_key = tuple(expanded_layers) if expanded_layers is not None else None
+    base_diagram = cached_derived(
+        ("architecture", tuple(show_layers), "None", diagram_direction, None, expanded_key),
+        view_dependencies,
+        lambda: create_architecture_diagram(show_layers, "None", diagram_direction, None, expanded_layers)
+    )
+    show_restyled_diagram(
+        base_diagram,
+        lambda scope: architecture_restyle_css(
+            scope, show_layers, highlight_component, impact_component, expanded_layers, color_by_layer
+        ),
+        # Without server-side rendering the styling has to be part of the DOT source
+        lambda: cached_derived(
+            ("architecture", tuple(show_layers), highlight_component, diagram_direction, impact_component,
+             expanded_key, color_by_layer),
+            # Reachability spans the whole graph, so impact views depend on every component
+            view_dependencies | frozenset(graph.components) if impact_component else view_dependencies,
+            lambda: create_architecture_diagram(show_layers, highlight_component, diagram_direction,
+                                                impact_component, expanded_layers, color_by_layer)
+        ),
+        use_container_width=True
+    )
     
     # Component count by layer
     st.markdown("### 📈 Components by Layer")
     
-    layer_counts = {}
-    for comp_data in COMPONENTS.values():
-        layer_name = LAYERS[comp_data['layer']]['name']
-        if layer_name in show_layers:
-            layer_counts[layer_name] = layer_counts.get(layer_name, 0) + 1
+    layer_counts = graph.layer_counts(show_layers)
     
     cols = st.columns(len(layer_counts))
     for i, (layer_name, count) in enumerate(sorted(layer_counts.items())):
@@ -1003,144 +1335,12 @@ def classify_intent(query: str) -> str:
         return 'wealth'
     elif any(word in query_lower for word in ['and', 'also', 'plus']) and len(query_lower.split()) > 10:
         return 'multi'
-    else:
-        return 'general'
-
-
-def get_path_for_intent(intent: str) -> list:
-    """Get the processing path for a given intent"""
-    base_path = ["customer", "authentication", "api_gateway", "waf", "rate_limiter",
-                 "content_filter", "planner", "memory_manager", "tool_selector", "executor"]
-    
-    if intent == "card":
-        agent_path = ["card_agent", "azure_openai", "mcp_tools", "crm"]
-    elif intent == "loan":
-        agent_path = ["loan_agent", "azure_openai", "rag_engine"]
-    elif intent == "wealth":
-        agent_path = ["wealth_agent", "azure_openai", "rag_engine"]
-    else:
-        agent_path = ["azure_openai"]
-    
-    end_path = ["critic", "governance", "api_gateway", "customer"]
-    
-    return base_path + agent_path + end_path
-
-
-def create_flow_diagram(path: list) -> graphviz.Digraph:
-    """Create a flow diagram for a specific path with numbered arrows and protocols"""
-    dot = graphviz.Digraph(comment='Request Flow')
-    dot.attr(rankdir='LR', splines='ortho', nodesep='0.8', ranksep='1.0')
-    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
-    dot.attr('edge', fontsize='9', fontname='Arial')
-    
-    # Find split point for request/response
-    split_point = len(path) // 2
-    for i in range(len(path) - 1, -1, -1):
-        if path[i] in ['accounts_api', 'cards_api', 'loans_api', 'crm', 'cosmos_db', 'vector_db']:
-            split_point = i + 1
-            break
-    
-    # Add nodes with deployment badges
-    for i, comp_id in enumerate(path):
-        comp_data = COMPONENTS[comp_id]
-        
-        # Get deployment badge
-        deployment_badge = ""
-        if comp_id in ENHANCED_DETAILS:
-            deployment_type = ENHANCED_DETAILS[comp_id].get('deployment_type', '')
-            if 'Container' in deployment_type:
-                deployment_badge = " ⭐"
-            elif 'Managed' in deployment_type:
-                deployment_badge = " ☁️"
-            elif deployment_type.startswith('External'):
-                deployment_badge = " 🌐"
-        
-        label = f"{comp_data['icon']}\\n{comp_data['name']}{deployment_badge}"
-        
-        # Different color for request vs response path
-        if i < split_point:
-            # Request path - blue border
-            dot.node(comp_id + f"_step{i}", label, fillcolor=comp_data['color'], fontcolor='white', penwidth='2', color='#3B82F6')
-        else:
-            # Response path - green border
-            dot.node(comp_id + f"_step{i}", label, fillcolor=comp_data['color'], fontcolor='white', penwidth='2', color='#10B981')
-        
-        # Add numbered edge to next node
-        if i < len(path) - 1:
-            # Get protocol for this connection
-            protocol_label = ""
-            if comp_id in ENHANCED_DETAILS:
-                if i < split_point:
-                    # Request path - use outbound protocol
-                    protocol = ENHANCED_DETAILS[comp_id].get('outbound_protocol', '')
-                else:
-                    # Response path - use inbound protocol
-                    protocol = ENHANCED_DETAILS[comp_id].get('inbound_protocol', '')
-                
-                if protocol:
-                    protocol_label = f"\\n{protocol}"
-            
-            # Edge label with step number and protocol
-            edge_label = f"{i+1}{protocol_label}"
-            
-            # Different color for request vs response arrows
-            if i < split_point - 1:
-                # Request arrows - blue
-                dot.edge(comp_id + f"_step{i}", path[i + 1] + f"_step{i+1}", label=edge_label, color='#3B82F6', fontcolor='#3B82F6', penwidth='2')
-            else:
-                # Response arrows - green
-                dot.edge(comp_id + f"_step{i}", path[i + 1] + f"_step{i+1}", label=edge_label, color='#10B981', fontcolor='#10B981', penwidth='2')
-    
-    # Add legend
-    with dot.subgraph(name='cluster_legend') as legend:
-        legend.attr(label='Legend', style='filled', color='lightgrey')
-        legend.node('legend_request', '➡️ Request Path', shape='plaintext', fillcolor='white')
-        legend.node('legend_response', '⬅️ Response Path', shape='plaintext', fillcolor='white')
-        legend.node('legend_container', '⭐ = Container (K8s)', shape='plaintext', fillcolor='white')
-        legend.node('legend_managed', '☁️ = Managed Service', shape='plaintext', fillcolor='white')
-        legend.node('legend_external', '🌐 = External API', shape='plaintext', fillcolor='white')
-    
-    return dot
-
-
-def create_architecture_diagram(show_layers: list, highlight_component: str, direction: str) -> graphviz.Digraph:
-    """Create the full architecture diagram"""
-    dot = graphviz.Digraph(comment='Enterprise Agent Platform Architecture')
-    dot.attr(rankdir='TB' if direction == "Top to Bottom" else 'LR', splines='ortho')
-    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10')
-    dot.attr('edge', fontsize='8', fontcolor='#6B7280')
-    
-    # Create subgraphs for each layer
-    for layer_id, layer_info in sorted(LAYERS.items(), key=lambda x: x[1]['order']):
-        if layer_info['name'] not in show_layers:
-            continue
-        
-        with dot.subgraph(name=f'cluster_{layer_id}') as sub:
-            sub.attr(label=layer_info['name'], style='filled', color=layer_info['color'])
-            
-            # Add components in this layer
-            for comp_id, comp_data in COMPONENTS.items():
-                if comp_data['layer'] == layer_id:
-                    label = f"{comp_data['icon']}\\n{comp_data['name']}"
-                    
-                    # Highlight if selected
-                    if highlight_component != "None" and comp_data['name'] == highlight_component:
-                        sub.node(comp_id, label, fillcolor='#FCD34D', fontcolor='#1E3A8A', penwidth='3')
-                    else:
-                        sub.node(comp_id, label, fillcolor=comp_data['color'], fontcolor='white')
-    
-    # Add edges
-    for flow in FLOWS:
-        from_layer = LAYERS[COMPONENTS[flow['from']]['layer']]['name']
-        to_layer = LAYERS[COMPONENTS[flow['to']]['layer']]['name']
-        
-        # Only show edges if both components' layers are visible
-        if from_layer in show_layers and to_layer in show_layers:
-            # Skip conditional flows for simplicity
-            if 'condition' not in flow:
-                dot.edge(flow['from'], flow['to'], label=flow['label'])
     
-    return dot
+    # Any other agent routed by a conditional flow is detected by its condition name
+    for condition in sorted(get_architecture_graph().conditions):
+        if condition in query_lower:
+            return condition
+    return 'general'
 
 
 # Main content area - execute after all functions are defined
@@ -4,7 +4,9 @@ Displays side-by-side comparison of Code-Based vs OpenAPI-Based architectures
 """
 
 import streamlit as st
-from openapi_flow_definitions import FLOW_COMPARISON, get_flow_comparison_summary
+from latency_display import show_latency_distribution
+from numbered_flow_diagram import get_model_flow_comparison
+from openapi_flow_definitions import FLOW_COMPARISON
 
 def show_architecture_comparison():
     """Display comprehensive comparison between code-based and OpenAPI-based architectures"""
@@ -12,7 +14,10 @@ def show_architecture_comparison():
     st.markdown("## 🔄 Architecture Comparison: Code-Based vs OpenAPI-Based")
     
     # Get comparison summary
-    comparison = get_flow_comparison_summary()
+    comparison = get_model_flow_comparison()
+    if comparison is None:
+        st.info("The loaded model does not define both the \"mcp\" and \"mcp_openapi\" sequences.")
+        return
     code_based = comparison["code_based"]
     openapi_based = comparison["openapi_based"]
     diff = comparison["difference"]
@@ -46,6 +51,25 @@ def show_architecture_comparison():
             delta_color="inverse"
         )
     
+    # Where the latency goes, computed from the critical path of each flow
+    with st.expander("⏱️ Where the Time Goes (Critical Path Share)", expanded=False):
+        col1, col2 = st.columns(2)
+        for column, flow in [(col1, code_based), (col2, openapi_based)]:
+            with column:
+                st.markdown(f"**{flow['name']}** - {flow['latency_ms']}ms")
+                st.table([
+                    {
+                        "Component": comp_id,
+                        "Latency (ms)": round(share['latency_ms']),
+                        "Share": f"{share['share'] * 100:.1f}%"
+                    }
+                    for comp_id, share in flow['analysis']['component_share'].items()
+                ])
+    
+    # Tail latency, which the fixed per-hop latencies above cannot show
+    with st.expander("🎲 Tail Latency (Monte Carlo)", expanded=False):
+        show_latency_distribution(["MCP_FLOW", "OPENAPI_MCP_FLOW"], key="comparison_latency")
+    
     st.markdown("---")
     
     # Side-by-side comparison table
@@ -99,7 +123,7 @@ def show_architecture_comparison():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("#### 🔵 Code-Based Flow (21 Steps)")
+        st.markdown(f"#### 🔵 Code-Based Flow ({code_based['steps']} Steps)")
         st.markdown("""
         **Tool Selection (Steps 6-7):**
         1. Tool Selector → **Hardcoded Tool Registry**
@@ -117,7 +141,7 @@ def show_architecture_comparison():
         """)
     
     with col2:
-        st.markdown("#### 🟪 OpenAPI-Based Flow (27 Steps)")
+        st.markdown(f"#### 🟪 OpenAPI-Based Flow ({openapi_based['steps']} Steps)")
         st.markdown("""
         **Tool Selection (Steps 7-10):**
         1. Tool Selector → **OpenAPI Registry**
@@ -210,10 +234,10 @@ def show_architecture_comparison():
     # Decision matrix
     st.markdown("### 🎯 Decision Matrix")
     
-    st.markdown("""
+    st.markdown(f"""
     | Criteria | Code-Based | OpenAPI-Based | Winner |
     |----------|------------|---------------|--------|
-    | **Performance** | ⚡ 512ms | 🐢 612ms | 🔵 Code-Based |
+    | **Performance** | ⚡ {code_based['latency_ms']}ms | 🐢 {openapi_based['latency_ms']}ms | 🔵 Code-Based |
     | **Flexibility** | 🔒 Rigid | 🔓 Dynamic | 🟪 OpenAPI-Based |
     | **Maintainability** | 🔧 Manual | 🤖 Automatic | 🟪 OpenAPI-Based |
     | **Type Safety** | ✅ Compile-time | ⚠️ Runtime | 🔵 Code-Based |
@@ -228,15 +252,15 @@ def show_architecture_comparison():
     # Visual flow comparison
     st.markdown("### 🎨 Visual Flow Comparison")
     
-    st.info("""
+    st.info(f"""
     **How to visualize:**
     
-    1. Select "Code-Based (Current Implementation)" to see the blue flow (21 steps)
-    2. Select "OpenAPI-Based (Alternative Architecture)" to see the purple flow (27 steps)
+    1. Select "Code-Based (Current Implementation)" to see the blue flow ({code_based['steps']} steps)
+    2. Select "OpenAPI-Based (Alternative Architecture)" to see the purple flow ({openapi_based['steps']} steps)
     3. Compare the numbered arrows to see where the flows differ
     
     **Key Differences:**
     - Steps 7-10: OpenAPI adds Registry + Vector DB lookup
     - Steps 15-17: OpenAPI adds Client generation + Schema validation
-    - Total: +6 steps, +100ms latency
+    - Total: +{diff['steps']} steps, +{diff['latency_ms']}ms latency
     """)
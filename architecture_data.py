@@ -301,13 +301,14 @@ FLOWS = [
     {"from": "executor", "to": "loan_agent", "label": "Loan Query", "condition": "loan"},
     {"from": "executor", "to": "wealth_agent", "label": "Wealth Query", "condition": "wealth"},
     
-    # Support services (used by multiple components)
-    {"from": "planner", "to": "memory_manager", "label": "Retrieve Context"},
+    # Support services (used by multiple components); "inline" calls are made
+    # by every request passing the caller, not only by some code paths
+    {"from": "planner", "to": "memory_manager", "label": "Retrieve Context", "inline": True},
     {"from": "executor", "to": "memory_manager", "label": "Store Interaction"},
     {"from": "tool_selector", "to": "rag_engine", "label": "Search Knowledge"},
     {"from": "executor", "to": "mcp_tools", "label": "Invoke Tools"},
     {"from": "api_gateway", "to": "governance", "label": "Audit & Track"},
-    {"from": "critic", "to": "governance", "label": "Validate Compliance"},
+    {"from": "critic", "to": "governance", "label": "Validate Compliance", "inline": True},
     
     # Data layer
     {"from": "memory_manager", "to": "cosmos_db", "label": "Store/Retrieve"},
@@ -327,10 +328,11 @@ FLOWS = [
     {"from": "mcp_tools", "to": "cards_api", "label": "Card API"},
     {"from": "mcp_tools", "to": "loans_api", "label": "Loan API"},
     
-    # Agent to MCP Tools (specific calls)
-    {"from": "card_agent", "to": "mcp_tools", "label": "Get Card Data"},
-    {"from": "loan_agent", "to": "mcp_tools", "label": "Get Loan Data"},
-    {"from": "wealth_agent", "to": "mcp_tools", "label": "Get Account Data"},
+    # Agent to MCP Tools (specific calls); "apis" are the domain APIs the tools
+    # call on the agent's behalf
+    {"from": "card_agent", "to": "mcp_tools", "label": "Get Card Data", "apis": ["cards_api", "crm"]},
+    {"from": "loan_agent", "to": "mcp_tools", "label": "Get Loan Data", "apis": ["loans_api"]},
+    {"from": "wealth_agent", "to": "mcp_tools", "label": "Get Account Data", "apis": ["accounts_api"]},
     
     # Response flow - Forward path
     {"from": "card_agent", "to": "executor", "label": "Agent Response"},
@@ -375,6 +377,46 @@ LAYERS = {
     "monitoring": {"name": "Monitoring", "color": "#FFF9C4", "order": 10}
 }
 
+# Per-visit latency (ms) for each component: network hop into the component plus its
+# processing time. Used by latency_analysis to compute end-to-end flow latency.
+# Steps may override this with an explicit "latency_ms" value.
+COMPONENT_LATENCY_MS = {
+    "customer": 0,
+    "authentication": 20,
+    "api_gateway": 5,
+    "waf": 3,
+    "rate_limiter": 2,
+    "content_filter": 25,
+    "planner": 10,
+    "tool_selector": 8,
+    "executor": 5,
+    "critic": 20,
+    "card_agent": 12,
+    "loan_agent": 12,
+    "wealth_agent": 12,
+    "memory_manager": 15,
+    "rag_engine": 40,
+    "mcp_tools": 10,
+    "governance": 10,
+    "cosmos_db": 8,
+    "redis": 1,
+    "vector_db": 50,
+    "azure_openai": 250,
+    "crm": 80,
+    "accounts_api": 60,
+    "cards_api": 60,
+    "loans_api": 70,
+    "observability": 2,
+    "kafka": 5,
+    "zookeeper": 2,
+    "kafka_connect": 10,
+    "analytics_service": 3,
+    "audit_service": 3,
+    "openapi_registry": 15,
+    "openapi_client": 10,
+    "schema_validator": 5,
+}
+
 # Numbered flow sequences for visualization
 RAG_FLOW = [
     {"from": "customer", "to": "authentication", "step": 1, "label": "HTTPS/REST", "color": "#006400"},
@@ -473,6 +515,14 @@ SAMPLE_QUERIES = {
                  "mcp_tools", "cards_api", "card_agent", "loan_agent", "mcp_tools", "loans_api",
                  "loan_agent", "executor", "azure_openai", "critic", "governance", "planner",
                  "api_gateway", "customer"],
+        "parallel": [
+            {
+                "fork": "executor",
+                "branches": [["card_agent", "mcp_tools", "cards_api", "card_agent"],
+                             ["loan_agent", "mcp_tools", "loans_api", "loan_agent"]],
+                "join": "executor"
+            }
+        ],
         "explanation": "Planner detects two intents → executor runs card and loan agents in parallel → card agent calls Cards API via MCP Tools for balance → loan agent calls Loans API via MCP Tools for eligibility → Azure OpenAI synthesizes combined response → critic validates → governance audits → unified response returned to customer."
     }
 }
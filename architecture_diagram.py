@@ -0,0 +1,496 @@
+"""
+Architecture Diagram Generator
+Builds the full architecture diagram and per-request flow diagrams
+"""
+
+import graphviz
+from airport_transfer_flow import AIRPORT_TRANSFER_FLOW
+from architecture_graph import get_architecture_graph, layer_node_id
+from architecture_model import get_architecture_model
+from flow_dag import FlowDAG
+
+# Full Architecture collapses layers by default above this many visible components
+AUTO_COLLAPSE_COMPONENTS = 150
+
+# Components where a request path turns around (external APIs and data stores)
+TURNAROUND_COMPONENTS = ('accounts_api', 'cards_api', 'loans_api', 'crm', 'cosmos_db', 'vector_db')
+
+
+def flow_split_point(path: list, parallel: tuple = ()) -> int:
+    """
+    Index where the response half of a path starts
+
+    Everything after the last external API or data store visited is the
+    response path; paths without one are split halfway. A split inside
+    parallel branches moves to their join, so every branch is drawn alike.
+
+    Args:
+        path: Component records or ids
+        parallel: ForkRecords of the path (e.g. QueryRecord.parallel)
+
+    Returns:
+        Number of components on the request half
+    """
+    path = get_architecture_model().path_components(path)
+    split_point = len(path) // 2
+    for i in range(len(path) - 1, -1, -1):
+        if path[i].id in TURNAROUND_COMPONENTS:
+            split_point = i + 1
+            break
+    return _split_outside_forks(split_point, parallel)
+
+
+def _split_outside_forks(split_point: int, parallel: tuple) -> int:
+    for fork in parallel:
+        if fork.fork < split_point < fork.join:
+            return fork.join
+    return split_point
+
+
+def flow_edges(path: list, split_point: int, parallel: tuple = ()) -> list:
+    """
+    Numbered edges of a flow diagram along its execution DAG
+
+    Every edge is numbered by the position it leads to. Request edges carry
+    the caller's outbound protocol and response edges the inbound protocol
+    it was called with; edges joining parallel branches carry the protocol
+    the fork called the branches with.
+
+    Args:
+        path: Component records of the flat path
+        split_point: Number of components on the request half
+        parallel: ForkRecords of the path
+
+    Returns:
+        List of (source position, target position, protocol, is_request) tuples
+    """
+    joins = {fork.join: fork.fork for fork in parallel}
+    edges = []
+    for i, j in FlowDAG(path, parallel).edges:
+        if j in joins:
+            protocol = path[joins[j]].outbound_protocol
+        elif i < split_point:
+            protocol = path[i].outbound_protocol
+        else:
+            protocol = path[i].inbound_protocol
+        edges.append((i, j, protocol, j < split_point))
+    return edges
+
+
+def default_expanded_layers(show_layers: list):
+    """Expanded layers the Full Architecture page starts with (None when not collapsed)"""
+    visible_count = sum(get_architecture_graph().layer_counts(show_layers).values())
+    return [] if visible_count > AUTO_COLLAPSE_COMPONENTS else None
+
+
+def create_flow_diagram(path: list, split_point: int = None, parallel: tuple = ()) -> graphviz.Digraph:
+    """
+    Create a flow diagram for a specific path (component records or ids) with numbered arrows and protocols
+    
+    Parallel branches (ForkRecords, e.g. QueryRecord.parallel) are boxed
+    between their fork and join components, with the critical path drawn
+    heavier and each fork labelled with the latency it saves.
+    """
+    path = get_architecture_model().path_components(path)
+    dot = graphviz.Digraph(comment='Request Flow')
+    dot.attr(rankdir='LR', splines='ortho', nodesep='0.8', ranksep='1.0')
+    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
+    dot.attr('edge', fontsize='9', fontname='Arial')
+    
+    # Find split point for request/response unless the caller already knows it
+    if split_point is None:
+        split_point = flow_split_point(path, parallel)
+    else:
+        split_point = _split_outside_forks(split_point, parallel)
+    
+    dag = FlowDAG(path, parallel)
+    critical = set(dag.critical_path()['critical_path']) if dag.forks else set()
+    
+    # Add nodes with deployment badges
+    for i, comp in enumerate(path):
+        comp_id = comp.id
+        label = f"{comp.icon}\\n{comp.name}{comp.deployment_badge}"
+        
+        # Different color for request vs response path
+        if i < split_point:
+            # Request path - blue border
+            dot.node(comp_id + f"_step{i}", label, fillcolor=comp.color, fontcolor='white', penwidth='2', color='#3B82F6')
+        else:
+            # Response path - green border
+            dot.node(comp_id + f"_step{i}", label, fillcolor=comp.color, fontcolor='white', penwidth='2', color='#10B981')
+    
+    # Box every parallel branch; the fork's label carries the latency it saves
+    for k, fork in enumerate(dag.forks):
+        branch_dag = FlowDAG(path[:fork.join + 1], (fork,))
+        savings = branch_dag.critical_path()['parallel_savings_ms']
+        with dot.subgraph(name=f'cluster_parallel_{k}') as fork_box:
+            fork_box.attr(label=f"⚡ Parallel fan-out (saves {savings:.0f}ms)", style='dashed', color='#8B5CF6', fontcolor='#8B5CF6')
+            for b, (start, end) in enumerate(fork.branches):
+                with fork_box.subgraph(name=f'cluster_parallel_{k}_{b}') as branch:
+                    branch.attr(label=f"Branch {b + 1}", style='dotted')
+                    for i in range(start, end):
+                        branch.node(path[i].id + f"_step{i}")
+    
+    # Add numbered edges along the execution DAG (fork edges fan out, join edges fan in)
+    for i, j, protocol, is_request in flow_edges(path, split_point, parallel):
+        protocol_label = f"\\n{protocol}" if protocol else ""
+        
+        # Edge label with step number and protocol
+        edge_label = f"{j}{protocol_label}"
+        
+        # The critical path through parallel branches is drawn heavier
+        penwidth = '3.5' if i in critical and j in critical else '2'
+        
+        # Different color for request vs response arrows
+        if is_request:
+            # Request arrows - blue
+            dot.edge(path[i].id + f"_step{i}", path[j].id + f"_step{j}", label=edge_label, color='#3B82F6', fontcolor='#3B82F6', penwidth=penwidth)
+        else:
+            # Response arrows - green
+            dot.edge(path[i].id + f"_step{i}", path[j].id + f"_step{j}", label=edge_label, color='#10B981', fontcolor='#10B981', penwidth=penwidth)
+    
+    # Add legend
+    with dot.subgraph(name='cluster_legend') as legend:
+        legend.attr(label='Legend', style='filled', color='lightgrey')
+        legend.node('legend_request', '➡️ Request Path', shape='plaintext', fillcolor='white')
+        legend.node('legend_response', '⬅️ Response Path', shape='plaintext', fillcolor='white')
+        legend.node('legend_container', '⭐ = Container (K8s)', shape='plaintext', fillcolor='white')
+        legend.node('legend_managed', '☁️ = Managed Service', shape='plaintext', fillcolor='white')
+        legend.node('legend_external', '🌐 = External API', shape='plaintext', fillcolor='white')
+    
+    return dot
+
+
+# Node colour of each phase of the airport transfer journey
+AIRPORT_PHASE_COLORS = {
+    "Proactive Engagement": "#10B981",
+    "Airport Transfer Booking": "#3B82F6",
+    "Travel Card Update": "#F59E0B",
+    "Points Redemption Upsell": "#8B5CF6"
+}
+
+
+def airport_step_label(step: dict) -> str:
+    """Multi-line label of an airport transfer journey step (lines separated by \\n)"""
+    label = f"{step['id']}. {step['title']}\\n"
+    label += f"User: {step['user_action'][:40]}...\\n" if len(step['user_action']) > 40 else f"User: {step['user_action']}\\n"
+    label += f"Latency: {step['latency']}"
+    return label
+
+
+def create_airport_transfer_diagram(phases: list = None) -> graphviz.Digraph:
+    """
+    Create the airport transfer journey diagram
+    
+    Args:
+        phases: Phase names to include (all phases when None)
+    
+    Returns:
+        Graphviz Digraph object
+    """
+    dot = graphviz.Digraph(comment='Airport Transfer Booking Flow')
+    dot.attr(rankdir='TB', size='12,16')
+    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10')
+    
+    # Get steps for selected phases
+    selected_steps = []
+    for phase in AIRPORT_TRANSFER_FLOW['phases']:
+        if phases is None or phase['name'] in phases:
+            selected_steps.extend(phase['steps'])
+    
+    # Add nodes for each step
+    for step in AIRPORT_TRANSFER_FLOW['steps']:
+        if step['id'] in selected_steps:
+            color = AIRPORT_PHASE_COLORS.get(step['phase'], "#6B7280")
+            dot.node(f"step_{step['id']}", airport_step_label(step), fillcolor=color, fontcolor='white')
+    
+    # Add edges
+    for i in range(len(AIRPORT_TRANSFER_FLOW['steps']) - 1):
+        step = AIRPORT_TRANSFER_FLOW['steps'][i]
+        next_step = AIRPORT_TRANSFER_FLOW['steps'][i + 1]
+        if step['id'] in selected_steps and next_step['id'] in selected_steps:
+            dot.edge(f"step_{step['id']}", f"step_{next_step['id']}", 
+                    label=step['protocol'], fontsize='8')
+    
+    return dot
+
+
+# Colours of the highlight and blast radius views (DOT attributes and restyle CSS alike)
+HIGHLIGHT_FILL = '#FCD34D'
+HIGHLIGHT_TEXT = '#1E3A8A'
+UPSTREAM_FILL = '#F97316'
+DOWNSTREAM_FILL = '#3B82F6'
+DIMMED_FILL = '#E5E7EB'
+DIMMED_TEXT = '#6B7280'
+DIMMED_EDGE = '#D1D5DB'
+DEPENDENCY_EDGE = '#DC2626'
+
+
+def node_element_id(node_id: str) -> str:
+    """SVG element id of a diagram node (component id or collapsed layer node id)"""
+    return f"node_{node_id}"
+
+
+def cluster_element_id(layer_id: str) -> str:
+    """SVG element id of a layer cluster"""
+    return f"cluster_{layer_id}"
+
+
+def flow_element_id(flow) -> str:
+    """SVG element id of the edge drawn for a flow"""
+    return f"edge_{flow.index}"
+
+
+def rollup_element_id(source: str, target: str) -> str:
+    """SVG element id of an aggregated edge between two diagram nodes"""
+    return f"edge_{source}__{target}"
+
+
+def _impact_sets(graph, impact_component: str) -> tuple:
+    """(upstream, downstream) component ids of a blast radius view, empty without one"""
+    if not impact_component:
+        return frozenset(), frozenset()
+    return frozenset(graph.upstream(impact_component)), frozenset(graph.downstream(impact_component))
+
+
+def _is_dependency_flow(graph, flow, impact_component: str, upstream: frozenset, downstream: frozenset) -> bool:
+    """Whether a flow lies on a dependency path through the impact component"""
+    if graph.is_response_flow(flow):
+        return False
+    source, target = flow.source.id, flow.target.id
+    return (
+        (source in upstream and (target in upstream or target == impact_component)) or
+        ((source in downstream or source == impact_component) and target in downstream)
+    )
+
+
+def _collapsed_layer_colors(layer_info: dict, members: tuple, impact_component: str,
+                            upstream: frozenset, downstream: frozenset) -> tuple:
+    """(fill, font) colours of a collapsed layer node"""
+    if not impact_component:
+        return layer_info['color'], HIGHLIGHT_TEXT
+    if impact_component in members:
+        return HIGHLIGHT_FILL, HIGHLIGHT_TEXT
+    if upstream.intersection(members):
+        return UPSTREAM_FILL, 'white'
+    if downstream.intersection(members):
+        return DOWNSTREAM_FILL, 'white'
+    return DIMMED_FILL, DIMMED_TEXT
+
+
+def create_architecture_diagram(show_layers: list, highlight_component: str, direction: str,
+                                impact_component: str = None, expanded_layers: list = None,
+                                color_by_layer: bool = False) -> graphviz.Digraph:
+    """
+    Create the full architecture diagram
+    
+    Every node, cluster and edge gets a stable SVG id (see node_element_id()),
+    so a render without highlight can be restyled with
+    architecture_restyle_css() instead of being laid out again.
+    
+    Args:
+        show_layers: Layer names to draw
+        highlight_component: Name of the component to highlight ("None" for no highlight)
+        direction: "Top to Bottom" or "Left to Right"
+        impact_component: Optional component id whose upstream/downstream dependencies are colored
+        expanded_layers: Layer names drawn with their components; when given, every other
+            shown layer is collapsed into a single node with counted edges
+        color_by_layer: Fill components with their layer's color instead of their own
+    
+    Returns:
+        Graphviz Digraph object
+    """
+    graph = get_architecture_graph()
+    
+    # Blast radius: upstream (depends on it) in orange, downstream (it depends on) in blue
+    upstream, downstream = _impact_sets(graph, impact_component)
+    dot = graphviz.Digraph(comment='Enterprise Agent Platform Architecture')
+    dot.attr(rankdir='TB' if direction == "Top to Bottom" else 'LR', splines='ortho')
+    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10')
+    dot.attr('edge', fontsize='8', fontcolor='#6B7280')
+    
+    # Create subgraphs for each layer
+    for layer_id, layer_info in graph.layers_in_order:
+        if layer_info['name'] not in show_layers:
+            continue
+        
+        # Collapsed layer: one node standing for all of its components
+        if expanded_layers is not None and layer_info['name'] not in expanded_layers:
+            members = graph.layer_members(layer_id)
+            fillcolor, fontcolor = _collapsed_layer_colors(layer_info, members, impact_component, upstream, downstream)
+            highlighted = any(graph.component(comp_id).name == highlight_component for comp_id in members)
+            node_id = layer_node_id(layer_id)
+            dot.node(
+                node_id,
+                f"{layer_info['name']}\\n{len(members)} components",
+                id=node_element_id(node_id),
+                shape='box3d', style='filled', fillcolor=fillcolor, fontcolor=fontcolor,
+                penwidth='3' if highlighted else '1'
+            )
+            continue
+        
+        with dot.subgraph(name=f'cluster_{layer_id}') as sub:
+            if color_by_layer:
+                sub.attr(label=layer_info['name'], id=cluster_element_id(layer_id), style='filled',
+                         fillcolor='white', color=layer_info['color'], penwidth='2')
+            else:
+                sub.attr(label=layer_info['name'], id=cluster_element_id(layer_id), style='filled',
+                         color=layer_info['color'])
+            
+            # Add components in this layer
+            for comp_id in graph.layer_members(layer_id):
+                comp = graph.component(comp_id)
+                label = f"{comp.icon}\\n{comp.name}"
+                element_id = node_element_id(comp_id)
+                
+                # Highlight if selected
+                if (highlight_component != "None" and comp.name == highlight_component) or comp_id == impact_component:
+                    sub.node(comp_id, label, id=element_id, fillcolor=HIGHLIGHT_FILL, fontcolor=HIGHLIGHT_TEXT, penwidth='3')
+                elif comp_id in upstream:
+                    sub.node(comp_id, label, id=element_id, fillcolor=UPSTREAM_FILL, fontcolor='white', penwidth='2')
+                elif comp_id in downstream:
+                    sub.node(comp_id, label, id=element_id, fillcolor=DOWNSTREAM_FILL, fontcolor='white', penwidth='2')
+                elif impact_component:
+                    sub.node(comp_id, label, id=element_id, fillcolor=DIMMED_FILL, fontcolor=DIMMED_TEXT)
+                elif color_by_layer:
+                    sub.node(comp_id, label, id=element_id, fillcolor=layer_info['color'], fontcolor=HIGHLIGHT_TEXT)
+                else:
+                    sub.node(comp_id, label, id=element_id, fillcolor=comp.color, fontcolor='white')
+    
+    # Rolled-up diagram: aggregated edges were precomputed by the graph
+    if expanded_layers is not None:
+        for source, target, count, label in graph.rollup_edges(show_layers, expanded_layers):
+            element_id = rollup_element_id(source, target)
+            if count == 1:
+                dot.edge(source, target, label=label, id=element_id)
+            else:
+                dot.edge(source, target, label=f"{count} flows", id=element_id,
+                         penwidth=str(min(1 + count * 0.5, 5)))
+        return dot
+    
+    # Add edges (both endpoints visible, conditional flows skipped for simplicity)
+    for flow in graph.visible_flows(show_layers):
+        element_id = flow_element_id(flow)
+        if not impact_component:
+            dot.edge(flow.source.id, flow.target.id, label=flow.label, id=element_id)
+        elif _is_dependency_flow(graph, flow, impact_component, upstream, downstream):
+            dot.edge(flow.source.id, flow.target.id, label=flow.label, id=element_id,
+                     color=DEPENDENCY_EDGE, penwidth='2')
+        else:
+            dot.edge(flow.source.id, flow.target.id, label=flow.label, id=element_id,
+                     color=DIMMED_EDGE, fontcolor=DIMMED_EDGE)
+    
+    return dot
+
+
+def _css_rule(selectors: list, declarations: str) -> str:
+    return f"{', '.join(selectors)} {{ {declarations} }}"
+
+
+def architecture_restyle_css(scope: str, show_layers: list, highlight_component: str = "None",
+                             impact_component: str = None, expanded_layers: list = None,
+                             color_by_layer: bool = False) -> str:
+    """
+    CSS that restyles a render of the unhighlighted architecture diagram
+    
+    Produces the same colours create_architecture_diagram() would draw for
+    the given highlight, blast radius and layer colouring, plus hover
+    emphasis, as rules targeting the diagram's stable SVG ids. Restyling
+    costs a string build instead of a Graphviz layout.
+    
+    Args:
+        scope: CSS class of the element wrapping the SVG (rules only apply inside it)
+        show_layers: Layer names drawn in the base diagram
+        highlight_component: Name of the component to highlight ("None" for no highlight)
+        impact_component: Optional component id whose upstream/downstream dependencies are colored
+        expanded_layers: Expanded layers of the base diagram (None when not collapsed)
+        color_by_layer: Fill components with their layer's color instead of their own
+    
+    Returns:
+        CSS text
+    """
+    graph = get_architecture_graph()
+    upstream, downstream = _impact_sets(graph, impact_component)
+    prefix = f".{scope}"
+    
+    def shapes(element_ids):
+        return [f"{prefix} #{element_id} > {shape}" for element_id in element_ids for shape in ('path', 'polygon')]
+    
+    def texts(element_ids):
+        return [f"{prefix} #{element_id} > text" for element_id in element_ids]
+    
+    rules = [
+        _css_rule([f"{prefix} g.node", f"{prefix} g.edge"], "cursor: pointer;"),
+        _css_rule([f"{prefix} g.node:hover > path", f"{prefix} g.node:hover > polygon"],
+                  f"stroke: {HIGHLIGHT_TEXT}; stroke-width: 3px;"),
+        _css_rule([f"{prefix} g.edge:hover > path"], "stroke-width: 3px;"),
+    ]
+    
+    component_groups = {}
+    highlighted = []
+    for layer_id, layer_info in graph.layers_in_order:
+        if layer_info['name'] not in show_layers:
+            continue
+        members = graph.layer_members(layer_id)
+        if expanded_layers is not None and layer_info['name'] not in expanded_layers:
+            node_id = node_element_id(layer_node_id(layer_id))
+            if impact_component:
+                fill, font = _collapsed_layer_colors(layer_info, members, impact_component, upstream, downstream)
+                rules.append(_css_rule(shapes([node_id]), f"fill: {fill};"))
+                rules.append(_css_rule(texts([node_id]), f"fill: {font};"))
+            if any(graph.component(comp_id).name == highlight_component for comp_id in members):
+                highlighted.append(node_id)
+            continue
+        
+        if color_by_layer:
+            rules.append(_css_rule([f"{prefix} #{cluster_element_id(layer_id)} > polygon"],
+                                   f"fill: white; stroke: {layer_info['color']}; stroke-width: 2px;"))
+        for comp_id in members:
+            if (highlight_component != "None" and graph.component(comp_id).name == highlight_component) or comp_id == impact_component:
+                group = 'highlight'
+            elif comp_id in upstream:
+                group = 'upstream'
+            elif comp_id in downstream:
+                group = 'downstream'
+            elif impact_component:
+                group = 'dimmed'
+            elif color_by_layer:
+                group = layer_info['color']
+            else:
+                continue
+            component_groups.setdefault(group, []).append(node_element_id(comp_id))
+    
+    group_colors = {
+        'highlight': (HIGHLIGHT_FILL, HIGHLIGHT_TEXT, '3px'),
+        'upstream': (UPSTREAM_FILL, 'white', '2px'),
+        'downstream': (DOWNSTREAM_FILL, 'white', '2px'),
+        'dimmed': (DIMMED_FILL, DIMMED_TEXT, None),
+    }
+    for group, element_ids in component_groups.items():
+        fill, font, stroke_width = group_colors.get(group, (group, HIGHLIGHT_TEXT, None))
+        stroke = f" stroke-width: {stroke_width};" if stroke_width else ""
+        rules.append(_css_rule(shapes(element_ids), f"fill: {fill};{stroke}"))
+        rules.append(_css_rule(texts(element_ids), f"fill: {font};"))
+    if highlighted:
+        rules.append(_css_rule(shapes(highlighted), "stroke-width: 3px;"))
+    
+    if impact_component and expanded_layers is None:
+        dependency_edges, dimmed_edges = [], []
+        for flow in graph.visible_flows(show_layers):
+            if _is_dependency_flow(graph, flow, impact_component, upstream, downstream):
+                dependency_edges.append(flow_element_id(flow))
+            else:
+                dimmed_edges.append(flow_element_id(flow))
+        if dependency_edges:
+            rules.append(_css_rule([f"{prefix} #{element_id} > path" for element_id in dependency_edges],
+                                   f"stroke: {DEPENDENCY_EDGE}; stroke-width: 2px;"))
+            rules.append(_css_rule([f"{prefix} #{element_id} > polygon" for element_id in dependency_edges],
+                                   f"fill: {DEPENDENCY_EDGE}; stroke: {DEPENDENCY_EDGE};"))
+        if dimmed_edges:
+            rules.append(_css_rule([f"{prefix} #{element_id} > {shape}" for element_id in dimmed_edges
+                                    for shape in ('path', 'polygon')], f"stroke: {DIMMED_EDGE};"))
+            rules.append(_css_rule([f"{prefix} #{element_id} > polygon" for element_id in dimmed_edges],
+                                   f"fill: {DIMMED_EDGE};"))
+            rules.append(_css_rule(texts(dimmed_edges), f"fill: {DIMMED_EDGE};"))
+    
+    return "\n".join(rules)
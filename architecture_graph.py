@@ -0,0 +1,618 @@
+"""
+Architecture Graph Index
+Compiled, read-only index over the architecture model with precomputed adjacency
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+from architecture_model import ArchitectureModel, get_architecture_model
+
+# Layer selections whose visible and rollup edges are memoized per graph (least recently used dropped first)
+MAX_CACHED_SELECTIONS = 64
+
+
+class ArchitectureGraph:
+    """
+    Immutable graph compiled once from the architecture model
+
+    All lookups that the pages and exporters used to do by rescanning FLOWS
+    (incoming/outgoing connections, layer names, layer membership, visible
+    edges) are resolved here at build time so each query is a dict lookup.
+    Adjacency is also kept in CSR form (offset + edge index arrays) for
+    traversal code that works on integer component ids, and the transitive
+    closure of the request-time dependency graph is precomputed as one int
+    bitset per component (bit i = component index i).
+    """
+
+    __slots__ = (
+        '_model', '_components', '_layers_in_order', '_layer_name_of',
+        '_layer_members', '_incoming', '_outgoing',
+        '_out_offsets', '_out_edges', '_in_offsets', '_in_edges',
+        '_unconditional_flows', '_conditional_flows', '_flows_by_condition',
+        '_sequence_components', '_visible_flow_cache',
+        '_entry_component', '_response_edges', '_downstream_bits', '_upstream_bits', '_query_bits', '_sequence_bits',
+        '_layer_edges', '_out_layer_edges', '_in_layer_edges', '_rollup_cache', '_memo_lock'
+    )
+
+    def __init__(self, model: ArchitectureModel):
+        """
+        Compile the graph
+
+        Args:
+            model: Architecture model with component/flow records
+        """
+        layers = model.layers
+        layers_in_order = tuple(sorted(layers.items(), key=lambda x: x[1]['order']))
+
+        layer_name_of = {}
+        layer_members = {layer_id: [] for layer_id in layers}
+        for comp in model.components:
+            layer_name_of[comp.id] = layers[comp.layer]['name']
+            layer_members[comp.layer].append(comp.id)
+
+        incoming = {comp.id: [] for comp in model.components}
+        outgoing = {comp.id: [] for comp in model.components}
+        unconditional = []
+        conditional = []
+        by_condition = {}
+        for flow in model.flows:
+            outgoing[flow.source.id].append(flow)
+            incoming[flow.target.id].append(flow)
+            if flow.condition:
+                conditional.append(flow)
+                by_condition.setdefault(flow.condition, []).append(flow)
+            else:
+                unconditional.append(flow)
+
+        out_offsets, out_edges = _compressed_adjacency(len(model.components), model.edge_src)
+        in_offsets, in_edges = _compressed_adjacency(len(model.components), model.edge_dst)
+
+        sequence_components = {
+            name: frozenset(comp.id for step in steps for comp in (step.source, step.target))
+            for name, steps in model.sequences.items()
+        }
+
+        # Unconditional flows aggregated to layer level for collapsed diagrams:
+        # layer -> layer, and component -> other layer in both directions
+        layer_edges = {}
+        out_layer_edges = {comp.id: {} for comp in model.components}
+        in_layer_edges = {comp.id: {} for comp in model.components}
+        for flow in unconditional:
+            source, target = flow.source, flow.target
+            if source.layer != target.layer:
+                _count_edge(layer_edges, (source.layer, target.layer), flow.label)
+                _count_edge(out_layer_edges[source.id], target.layer, flow.label)
+                _count_edge(in_layer_edges[target.id], source.layer, flow.label)
+
+        index_of = model.index_of
+        entry_component = _entry_component(
+            layers_in_order, layer_members, incoming, outgoing, index_of, out_offsets, out_edges, model.edge_dst
+        )
+        response_edges, downstream_bits, upstream_bits = _dependency_closure(
+            len(model.components), out_offsets, out_edges, model.edge_dst,
+            _response_edges(index_of.get(entry_component), len(model.components), out_offsets, out_edges, model.edge_dst)
+        )
+        query_bits = {
+            name: _bits_of(query.path) for name, query in model.sample_queries.items()
+        }
+        sequence_bits = {
+            name: _bits_of(index_of[comp_id] for comp_id in comp_ids)
+            for name, comp_ids in sequence_components.items()
+        }
+
+        set_attr = object.__setattr__
+        set_attr(self, '_model', model)
+        set_attr(self, '_components', MappingProxyType({comp.id: comp for comp in model.components}))
+        set_attr(self, '_layers_in_order', layers_in_order)
+        set_attr(self, '_layer_name_of', MappingProxyType(layer_name_of))
+        set_attr(self, '_layer_members', MappingProxyType({k: tuple(v) for k, v in layer_members.items()}))
+        set_attr(self, '_incoming', MappingProxyType({k: tuple(v) for k, v in incoming.items()}))
+        set_attr(self, '_outgoing', MappingProxyType({k: tuple(v) for k, v in outgoing.items()}))
+        set_attr(self, '_out_offsets', out_offsets)
+        set_attr(self, '_out_edges', out_edges)
+        set_attr(self, '_in_offsets', in_offsets)
+        set_attr(self, '_in_edges', in_edges)
+        set_attr(self, '_unconditional_flows', tuple(unconditional))
+        set_attr(self, '_conditional_flows', tuple(conditional))
+        set_attr(self, '_flows_by_condition', MappingProxyType({k: tuple(v) for k, v in by_condition.items()}))
+        set_attr(self, '_sequence_components', MappingProxyType(sequence_components))
+        set_attr(self, '_entry_component', entry_component)
+        set_attr(self, '_response_edges', response_edges)
+        set_attr(self, '_downstream_bits', downstream_bits)
+        set_attr(self, '_upstream_bits', upstream_bits)
+        set_attr(self, '_query_bits', MappingProxyType(query_bits))
+        set_attr(self, '_sequence_bits', MappingProxyType(sequence_bits))
+        set_attr(self, '_layer_edges', MappingProxyType({k: tuple(v) for k, v in layer_edges.items()}))
+        set_attr(self, '_out_layer_edges', MappingProxyType({k: {l: tuple(c) for l, c in v.items()} for k, v in out_layer_edges.items()}))
+        set_attr(self, '_in_layer_edges', MappingProxyType({k: {l: tuple(c) for l, c in v.items()} for k, v in in_layer_edges.items()}))
+        # Memo of visible edges per layer selection (derived data only)
+        set_attr(self, '_visible_flow_cache', OrderedDict())
+        set_attr(self, '_rollup_cache', OrderedDict())
+        set_attr(self, '_memo_lock', threading.Lock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ArchitectureGraph is immutable")
+
+    @property
+    def model(self) -> ArchitectureModel:
+        """The architecture model this graph was compiled from"""
+        return self._model
+
+    # ------------------------------------------------------------------
+    # Components and layers
+    # ------------------------------------------------------------------
+
+    @property
+    def components(self):
+        """Read-only mapping of component id to ComponentRecord"""
+        return self._components
+
+    @property
+    def layers(self):
+        """Read-only mapping of layer id to layer definition"""
+        return self._model.layers
+
+    @property
+    def layers_in_order(self) -> tuple:
+        """(layer_id, layer_info) pairs sorted by display order"""
+        return self._layers_in_order
+
+    @property
+    def layer_names(self) -> list:
+        """Layer display names in display order"""
+        return [layer_info['name'] for _, layer_info in self._layers_in_order]
+
+    def component(self, comp_id: str):
+        """Get a ComponentRecord by id"""
+        return self._components[comp_id]
+
+    def has_component(self, comp_id: str) -> bool:
+        """Check whether a component id is part of the model"""
+        return comp_id in self._components
+
+    def layer_name(self, comp_id: str) -> str:
+        """Get the display name of a component's layer"""
+        return self._layer_name_of[comp_id]
+
+    def layer_info(self, comp_id: str) -> dict:
+        """Get the layer definition of a component"""
+        return self._model.layers[self._components[comp_id].layer]
+
+    def layer_members(self, layer_id: str) -> tuple:
+        """Component ids belonging to a layer, in model order"""
+        return self._layer_members.get(layer_id, ())
+
+    def layer_counts(self, show_layers: list = None) -> dict:
+        """
+        Count components per layer name
+
+        Args:
+            show_layers: Optional list of layer names to restrict the count to
+
+        Returns:
+            Dictionary of layer name to component count (non-empty layers only)
+        """
+        counts = {}
+        for layer_id, layer_info in self._layers_in_order:
+            if show_layers is not None and layer_info['name'] not in show_layers:
+                continue
+            members = self._layer_members[layer_id]
+            if members:
+                counts[layer_info['name']] = len(members)
+        return counts
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    @property
+    def flows(self) -> tuple:
+        """All FlowRecords in model order"""
+        return self._model.flows
+
+    @property
+    def unconditional_flows(self) -> tuple:
+        """Flows without a routing condition"""
+        return self._unconditional_flows
+
+    @property
+    def conditional_flows(self) -> tuple:
+        """Flows that are only taken for a specific request condition"""
+        return self._conditional_flows
+
+    @property
+    def conditions(self) -> frozenset:
+        """Set of routing conditions used by conditional flows"""
+        return frozenset(self._flows_by_condition)
+
+    def flows_for_condition(self, condition: str) -> tuple:
+        """Conditional flows taken for a given condition (e.g. "card")"""
+        return self._flows_by_condition.get(condition, ())
+
+    def incoming(self, comp_id: str) -> tuple:
+        """Flows ending at a component"""
+        return self._incoming.get(comp_id, ())
+
+    def outgoing(self, comp_id: str) -> tuple:
+        """Flows starting at a component"""
+        return self._outgoing.get(comp_id, ())
+
+    def successor_edges(self, index: int) -> array:
+        """Flow indices leaving the component with the given integer id"""
+        return self._out_edges[self._out_offsets[index]:self._out_offsets[index + 1]]
+
+    def predecessor_edges(self, index: int) -> array:
+        """Flow indices entering the component with the given integer id"""
+        return self._in_edges[self._in_offsets[index]:self._in_offsets[index + 1]]
+
+    def visible_flows(self, show_layers: list) -> tuple:
+        """
+        Unconditional flows whose endpoints are both in visible layers
+
+        Args:
+            show_layers: List of layer names currently shown
+
+        Returns:
+            Tuple of FlowRecords, memoized per layer selection
+        """
+        key = frozenset(show_layers)
+        cached = self._memo_get(self._visible_flow_cache, key)
+        if cached is None:
+            layer_name_of = self._layer_name_of
+            cached = tuple(
+                flow for flow in self._unconditional_flows
+                if layer_name_of[flow.source.id] in key and layer_name_of[flow.target.id] in key
+            )
+            self._memo_put(self._visible_flow_cache, key, cached)
+        return cached
+
+    def rollup_edges(self, show_layers: list, expanded_layers: list) -> tuple:
+        """
+        Edges of a diagram where only expanded layers show their components
+
+        Collapsed layers are single nodes (see layer_node_id). Edges between
+        collapsed layers, and between an expanded component and a collapsed
+        layer, come from counts aggregated at build time; only flows between
+        expanded components are listed individually.
+
+        Args:
+            show_layers: Layer names shown in the diagram
+            expanded_layers: Layer names drawn with their components
+
+        Returns:
+            Tuple of (source node id, target node id, flow count, label of the
+            first flow), memoized per layer selection
+        """
+        key = (frozenset(show_layers), frozenset(expanded_layers))
+        cached = self._memo_get(self._rollup_cache, key)
+        if cached is not None:
+            return cached
+
+        shown = {layer_id for layer_id, layer_info in self._layers_in_order if layer_info['name'] in key[0]}
+        expanded = {layer_id for layer_id in shown if self._model.layers[layer_id]['name'] in key[1]}
+        collapsed = shown - expanded
+
+        edges = []
+        for (source_layer, target_layer), (count, label) in self._layer_edges.items():
+            if source_layer in collapsed and target_layer in collapsed:
+                edges.append((layer_node_id(source_layer), layer_node_id(target_layer), count, label))
+        for layer_id in expanded:
+            for comp_id in self._layer_members[layer_id]:
+                for target_layer, (count, label) in self._out_layer_edges[comp_id].items():
+                    if target_layer in collapsed:
+                        edges.append((comp_id, layer_node_id(target_layer), count, label))
+                for source_layer, (count, label) in self._in_layer_edges[comp_id].items():
+                    if source_layer in collapsed:
+                        edges.append((layer_node_id(source_layer), comp_id, count, label))
+        expanded_names = [self._model.layers[layer_id]['name'] for layer_id in expanded]
+        for flow in self.visible_flows(expanded_names):
+            edges.append((flow.source.id, flow.target.id, 1, flow.label))
+
+        cached = tuple(edges)
+        self._memo_put(self._rollup_cache, key, cached)
+        return cached
+
+    def _memo_get(self, memo: OrderedDict, key):
+        """Memoized result for a layer selection, or None"""
+        with self._memo_lock:
+            cached = memo.get(key)
+            if cached is not None:
+                memo.move_to_end(key)
+            return cached
+
+    def _memo_put(self, memo: OrderedDict, key, value):
+        """Memoize a result, dropping the least recently used selections beyond MAX_CACHED_SELECTIONS"""
+        with self._memo_lock:
+            memo[key] = value
+            while len(memo) > MAX_CACHED_SELECTIONS:
+                memo.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Numbered flow sequences
+    # ------------------------------------------------------------------
+
+    def sequence_components(self, name: str) -> frozenset:
+        """Components touched by a named numbered-flow sequence"""
+        return self._sequence_components.get(name, frozenset())
+
+    # ------------------------------------------------------------------
+    # Reachability
+    # ------------------------------------------------------------------
+
+    @property
+    def entry_component(self) -> str:
+        """
+        Component where requests enter and responses end
+
+        The first component, in layer order, that starts flows and is only
+        reached from components it reaches itself, i.e. by the responses to
+        its own requests (e.g. the customer), or None for a model without
+        flows.
+        """
+        return self._entry_component
+
+    def is_response_flow(self, flow) -> bool:
+        """
+        Whether a flow returns to a component already on the request path
+
+        A flow is a response when its target lies on a shortest forward path
+        from the entry component to its source (e.g. Critic -> Planner, API
+        Gateway -> Customer), which does not depend on the order of the
+        flows. Response flows close cycles and are left out of the dependency
+        closure, otherwise every core component would depend on every other.
+        """
+        return flow.index in self._response_edges
+
+    def downstream_bits(self, comp_id: str) -> int:
+        """Bitset of components reachable from a component"""
+        return self._downstream_bits[self._model.index_of[comp_id]]
+
+    def upstream_bits(self, comp_id: str) -> int:
+        """Bitset of components that reach a component"""
+        return self._upstream_bits[self._model.index_of[comp_id]]
+
+    def downstream(self, comp_id: str) -> tuple:
+        """Component ids a component depends on, directly or transitively"""
+        return self.ids_of(self.downstream_bits(comp_id))
+
+    def upstream(self, comp_id: str) -> tuple:
+        """Component ids that depend on a component, directly or transitively"""
+        return self.ids_of(self.upstream_bits(comp_id))
+
+    def depends_on(self, comp_id: str, other_id: str) -> bool:
+        """Whether a component reaches another through request-time flows"""
+        return bool(self.downstream_bits(comp_id) >> self._model.index_of[other_id] & 1)
+
+    def ids_of(self, bits: int) -> tuple:
+        """Component ids of the set bits, in model order"""
+        components = self._model.components
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(components[low.bit_length() - 1].id)
+            bits ^= low
+        return tuple(ids)
+
+    def blast_radius(self, comp_id: str) -> dict:
+        """
+        Everything that depends on, or is used by, a component
+
+        Args:
+            comp_id: Component id
+
+        Returns:
+            Dictionary with upstream and downstream component ids, and the
+            sample queries and numbered sequences whose path visits the component
+        """
+        index = self._model.index_of[comp_id]
+        bit = 1 << index
+        return {
+            "upstream": self.ids_of(self._upstream_bits[index]),
+            "downstream": self.ids_of(self._downstream_bits[index]),
+            "queries": tuple(name for name, bits in self._query_bits.items() if bits & bit),
+            "sequences": tuple(name for name, bits in self._sequence_bits.items() if bits & bit),
+        }
+
+
+def _compressed_adjacency(node_count: int, endpoints: array) -> tuple:
+    """
+    Build CSR adjacency from an edge endpoint array
+
+    Args:
+        node_count: Number of components
+        endpoints: Per-flow component index to group by (edge_src or edge_dst)
+
+    Returns:
+        (offsets, edges) arrays; edges of node i are edges[offsets[i]:offsets[i+1]]
+    """
+    counts = [0] * (node_count + 1)
+    for node in endpoints:
+        counts[node + 1] += 1
+    for i in range(node_count):
+        counts[i + 1] += counts[i]
+    offsets = array('i', counts)
+
+    fill = list(counts[:-1])
+    edges = array('i', [0]) * len(endpoints)
+    for edge_index, node in enumerate(endpoints):
+        edges[fill[node]] = edge_index
+        fill[node] += 1
+    return offsets, edges
+
+
+def layer_node_id(layer_id: str) -> str:
+    """Node id of a collapsed layer in rolled-up diagrams"""
+    return f"layer__{layer_id}"
+
+
+def _count_edge(counts: dict, key, label: str):
+    """Add one flow to an aggregated edge ([count, label of the first flow])"""
+    entry = counts.get(key)
+    if entry is None:
+        counts[key] = [1, label]
+    else:
+        entry[0] += 1
+
+
+def _bits_of(indices) -> int:
+    """Bitset with the given component indices set"""
+    bits = 0
+    for index in indices:
+        bits |= 1 << index
+    return bits
+
+
+def _reachable_bits(start: int, out_offsets: array, out_edges: array, edge_dst: array) -> int:
+    """Bitset of the components reachable from a component through any flows"""
+    bits = 1 << start
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for cursor in range(out_offsets[node], out_offsets[node + 1]):
+            target = edge_dst[out_edges[cursor]]
+            if not bits >> target & 1:
+                bits |= 1 << target
+                stack.append(target)
+    return bits
+
+
+def _entry_component(layers_in_order: tuple, layer_members: dict, incoming: dict, outgoing: dict, index_of: dict,
+                     out_offsets: array, out_edges: array, edge_dst: array) -> str:
+    """First component in layer order with outgoing flows whose incoming flows all come from components it reaches"""
+    for layer_id, _ in layers_in_order:
+        for comp_id in layer_members[layer_id]:
+            if not outgoing[comp_id]:
+                continue
+            reached = _reachable_bits(index_of[comp_id], out_offsets, out_edges, edge_dst)
+            if all(reached >> flow.source.index & 1 for flow in incoming[comp_id]):
+                return comp_id
+    return None
+
+
+def _response_edges(entry: int, node_count: int, out_offsets: array, out_edges: array, edge_dst: array) -> set:
+    """
+    Flows into a component on a shortest forward path from the entry component to their source
+
+    A BFS from the entry component gives every reachable component its hop
+    count; flows one hop deeper are forward flows. Each component's
+    ancestors (components on a shortest forward path to it) are collected
+    in BFS order, and a flow into an ancestor of its source is a response.
+
+    Args:
+        entry: Index of the entry component (None for none)
+        node_count: Number of components
+        out_offsets: CSR offsets of outgoing edges
+        out_edges: CSR outgoing edge indices
+        edge_dst: Target component index per edge
+
+    Returns:
+        Set of response edge indices
+    """
+    if entry is None:
+        return set()
+    depth = [-1] * node_count
+    depth[entry] = 0
+    ancestors = [0] * node_count
+    order = [entry]
+    # Every component one hop deeper is appended after the whole current level, so its ancestors are complete
+    for node in order:
+        for cursor in range(out_offsets[node], out_offsets[node + 1]):
+            target = edge_dst[out_edges[cursor]]
+            if depth[target] < 0:
+                depth[target] = depth[node] + 1
+                order.append(target)
+            if depth[target] == depth[node] + 1:
+                ancestors[target] |= ancestors[node] | (1 << node)
+
+    response_edges = set()
+    for node in order:
+        for cursor in range(out_offsets[node], out_offsets[node + 1]):
+            edge = out_edges[cursor]
+            target = edge_dst[edge]
+            if target == node or ancestors[node] >> target & 1:
+                response_edges.add(edge)
+    return response_edges
+
+
+def _dependency_closure(node_count: int, out_offsets: array, out_edges: array, edge_dst: array,
+                        response_edges: set) -> tuple:
+    """
+    Transitive closure of the flow graph without its response (back) edges
+
+    Cycles the structural response edges leave (e.g. among components the
+    entry component does not reach) are broken by an iterative DFS from each
+    component in model order, which marks edges pointing back to a component
+    still on the stack as response edges too. The rest is a DAG, so one pass
+    in DFS post-order gives each component's downstream set and one pass in
+    reverse gives upstream.
+
+    Args:
+        node_count: Number of components
+        out_offsets: CSR offsets of outgoing edges
+        out_edges: CSR outgoing edge indices
+        edge_dst: Target component index per edge
+        response_edges: Response edge indices from _response_edges()
+
+    Returns:
+        (response edge indices frozenset, downstream bitsets, upstream bitsets)
+    """
+    NEW, ACTIVE, DONE = 0, 1, 2
+    state = bytearray(node_count)
+    response_edges = set(response_edges)
+    post_order = []
+
+    for root in range(node_count):
+        if state[root] != NEW:
+            continue
+        state[root] = ACTIVE
+        stack = [(root, out_offsets[root])]
+        while stack:
+            node, cursor = stack[-1]
+            if cursor == out_offsets[node + 1]:
+                stack.pop()
+                state[node] = DONE
+                post_order.append(node)
+                continue
+            stack[-1] = (node, cursor + 1)
+            edge = out_edges[cursor]
+            if edge in response_edges:
+                continue
+            target = edge_dst[edge]
+            if state[target] == ACTIVE:
+                response_edges.add(edge)
+            elif state[target] == NEW:
+                state[target] = ACTIVE
+                stack.append((target, out_offsets[target]))
+    downstream = [0] * node_count
+    for node in post_order:
+        bits = 0
+        for cursor in range(out_offsets[node], out_offsets[node + 1]):
+            edge = out_edges[cursor]
+            if edge not in response_edges:
+                target = edge_dst[edge]
+                bits |= downstream[target] | (1 << target)
+        downstream[node] = bits
+
+    upstream = [0] * node_count
+    for node in reversed(post_order):
+        source_bits = upstream[node] | (1 << node)
+        for cursor in range(out_offsets[node], out_offsets[node + 1]):
+            edge = out_edges[cursor]
+            if edge not in response_edges:
+                upstream[edge_dst[edge]] |= source_bits
+
+    return frozenset(response_edges), tuple(downstream), tuple(upstream)
+
+
+_GRAPH = None
+
+
+def get_architecture_graph() -> ArchitectureGraph:
+    """Get the shared architecture graph, compiling it on first use or when the model changes"""
+    global _GRAPH
+    model = get_architecture_model()
+    if _GRAPH is None or _GRAPH.model is not model:
+        _GRAPH = ArchitectureGraph(model)
+    return _GRAPH
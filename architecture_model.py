@@ -0,0 +1,350 @@
+"""
+Architecture Model Layer
+Compact slotted records with interned integer IDs and array-backed edge lists
+"""
+
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+from architecture_data import COMPONENTS, FLOWS, LAYERS, RAG_FLOW, MCP_FLOW, SAMPLE_QUERIES
+from openapi_flow_definitions import OPENAPI_MCP_FLOW
+from model_loader import MODEL_FILE_ENV, file_digest, load_details_file, load_model_sections
+
+ENHANCED_DETAILS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_component_details.json')
+
+# Compiled models loaded from external files kept in memory (keyed by file hash)
+MAX_CACHED_MODELS = 4
+
+
+def deployment_badge(deployment_type: str) -> str:
+    """Badge shown next to a component name for its deployment type"""
+    if 'Container' in deployment_type:
+        return " ⭐"
+    elif 'Managed' in deployment_type:
+        return " ☁️"
+    elif deployment_type.startswith('External'):
+        return " 🌐"
+    return ""
+
+
+class ComponentRecord:
+    """A single architecture component, with enhanced details resolved once at load time"""
+
+    __slots__ = (
+        'index', 'id', 'name', 'layer', 'technical', 'layman', 'color', 'icon',
+        'details', 'deployment_type', 'deployment_badge',
+        'inbound_protocol', 'outbound_protocol', 'replicas'
+    )
+
+    def __init__(self, index: int, comp_id: str, data: dict, details: dict = None):
+        self.index = index
+        self.id = sys.intern(comp_id)
+        self.name = data['name']
+        self.layer = sys.intern(data['layer'])
+        self.technical = data.get('technical', '')
+        self.layman = data.get('layman', '')
+        self.color = data.get('color', '#6B7280')
+        self.icon = data.get('icon', '')
+        self.details = details
+        details = details or {}
+        self.deployment_type = details.get('deployment_type') or ''
+        self.deployment_badge = deployment_badge(self.deployment_type)
+        self.inbound_protocol = details.get('inbound_protocol') or ''
+        self.outbound_protocol = details.get('outbound_protocol') or ''
+        replicas = details.get('replicas')
+        self.replicas = replicas if isinstance(replicas, int) else None
+
+    def __repr__(self):
+        return f"ComponentRecord({self.id!r})"
+
+
+class FlowRecord:
+    """A directed connection between two components"""
+
+    __slots__ = ('index', 'source', 'target', 'label', 'condition', 'inline', 'apis')
+
+    def __init__(self, index: int, source: ComponentRecord, target: ComponentRecord, label: str, condition: str = None,
+                 inline: bool = False, apis: tuple = ()):
+        self.index = index
+        self.source = source
+        self.target = target
+        self.label = label
+        self.condition = sys.intern(condition) if condition else None
+        # Called by every request passing the source (e.g. context retrieval before planning)
+        self.inline = inline
+        # Domain APIs the target calls on the source's behalf (e.g. agent -> MCP Tools)
+        self.apis = apis
+
+    def __repr__(self):
+        return f"FlowRecord({self.source.id!r} -> {self.target.id!r})"
+
+
+# Optional latency fields of a numbered step (see latency_analysis.hop_latency_ms)
+STEP_TIMING_FIELDS = ('latency_ms', 'latency', 'async')
+
+
+class StepRecord:
+    """One numbered step of a flow sequence (RAG_FLOW, MCP_FLOW, ...)"""
+
+    __slots__ = ('step', 'source', 'target', 'label', 'color', 'timing')
+
+    def __init__(self, step, source: ComponentRecord, target: ComponentRecord, label: str, color: str,
+                 timing: dict = None):
+        self.step = step
+        self.source = source
+        self.target = target
+        self.label = label
+        self.color = color
+        self.timing = timing or {}
+
+    def as_dict(self) -> dict:
+        """The step in its plain definition form (from/to/step/label/color plus timing fields)"""
+        return dict(
+            {"from": self.source.id, "to": self.target.id, "step": self.step, "label": self.label, "color": self.color},
+            **self.timing
+        )
+
+
+class ForkRecord:
+    """Parallel branches of a path: positions between fork and join run concurrently, one range per branch"""
+
+    __slots__ = ('fork', 'join', 'branches')
+
+    def __init__(self, fork: int, join: int, branches: tuple):
+        self.fork = fork
+        self.join = join
+        self.branches = branches
+
+    def __repr__(self):
+        return f"ForkRecord({self.fork} -> {self.branches} -> {self.join})"
+
+
+class QueryRecord:
+    """A sample query with its processing path stored as component indices"""
+
+    __slots__ = ('name', 'query', 'intent', 'path', 'explanation', 'parallel')
+
+    def __init__(self, name: str, query: str, intent: str, path: array, explanation: str, parallel: tuple = ()):
+        self.name = name
+        self.query = query
+        self.intent = sys.intern(intent)
+        self.path = path
+        self.explanation = explanation
+        self.parallel = parallel
+
+
+def resolve_parallel(path: list, specs: list) -> tuple:
+    """
+    Locate fork/join specs on a flat path
+
+    A spec names a fork component, its branches (component id lists) and a
+    join component. The flat path must list the fork, then every branch in
+    order, then the join.
+
+    Args:
+        path: Component ids of the flat path
+        specs: Dicts with "fork", "branches" and "join"
+
+    Returns:
+        Tuple of ForkRecord, in path order
+
+    Raises:
+        ValueError: When a spec does not match the path
+    """
+    forks = []
+    position = 0
+    for spec in specs or ():
+        branches = [list(branch) for branch in spec['branches']]
+        body = [comp_id for branch in branches for comp_id in branch]
+        for fork in range(position, len(path) - len(body) - 1):
+            join = fork + 1 + len(body)
+            if path[fork] == spec['fork'] and path[join] == spec['join'] and path[fork + 1:join] == body:
+                break
+        else:
+            raise ValueError(f"Parallel branches from {spec['fork']!r} to {spec['join']!r} do not match the path")
+        ranges = []
+        start = fork + 1
+        for branch in branches:
+            ranges.append((start, start + len(branch)))
+            start += len(branch)
+        forks.append(ForkRecord(fork, join, tuple(ranges)))
+        position = join
+    return tuple(forks)
+
+
+class ArchitectureModel:
+    """
+    Typed, compact view of the architecture data
+
+    Components are numbered 0..n-1 in model order. Flows are stored both as
+    FlowRecord objects and as parallel int arrays (edge_src/edge_dst) so graph
+    algorithms can traverse them without touching Python dicts.
+    """
+
+    __slots__ = (
+        'components', 'index_of', 'flows', 'edge_src', 'edge_dst',
+        'layers', 'sequences', 'sample_queries', 'enhanced_details'
+    )
+
+    def __init__(self, components: tuple, flows: tuple, layers: dict, sequences: dict,
+                 sample_queries: dict, enhanced_details: dict):
+        self.components = components
+        self.index_of = {comp.id: comp.index for comp in components}
+        self.flows = flows
+        self.edge_src = array('i', (flow.source.index for flow in flows))
+        self.edge_dst = array('i', (flow.target.index for flow in flows))
+        self.layers = MappingProxyType(dict(layers))
+        self.sequences = MappingProxyType(sequences)
+        self.sample_queries = MappingProxyType(sample_queries)
+        self.enhanced_details = enhanced_details
+
+    @classmethod
+    def from_data(cls, components: dict, flows: list, layers: dict, sequences: dict = None,
+                  sample_queries: dict = None, enhanced_details: dict = None) -> 'ArchitectureModel':
+        """
+        Build the model from the plain dict/list structures
+
+        Args:
+            components: Component definitions keyed by component id
+            flows: Flow definitions (from/to/label plus optional condition/inline/apis)
+            layers: Layer definitions keyed by layer id
+            sequences: Named numbered-flow sequences (e.g. {"rag": RAG_FLOW})
+            sample_queries: Sample query definitions keyed by display name (an
+                optional "parallel" list marks fork/join branches of the path)
+            enhanced_details: Enhanced component details keyed by component id
+
+        Returns:
+            ArchitectureModel instance
+        """
+        enhanced_details = enhanced_details or {}
+        records = tuple(
+            ComponentRecord(index, comp_id, data, enhanced_details.get(comp_id))
+            for index, (comp_id, data) in enumerate(components.items())
+        )
+        by_id = {comp.id: comp for comp in records}
+
+        flow_records = tuple(
+            FlowRecord(index, by_id[flow['from']], by_id[flow['to']], flow['label'], flow.get('condition'),
+                       bool(flow.get('inline')), tuple(flow.get('apis', ())))
+            for index, flow in enumerate(flows)
+        )
+
+        sequence_records = {}
+        for name, steps in (sequences or {}).items():
+            sequence_records[name] = tuple(
+                StepRecord(step.get('step'), by_id[step['from']], by_id[step['to']], step.get('label', ''), step.get('color', ''),
+                           {field: step[field] for field in STEP_TIMING_FIELDS if field in step})
+                for step in steps
+                if step['from'] in by_id and step['to'] in by_id
+            )
+
+        query_records = {}
+        for name, query in (sample_queries or {}).items():
+            query_records[name] = QueryRecord(
+                name,
+                query['query'],
+                query['intent'],
+                array('i', (by_id[comp_id].index for comp_id in query['path'])),
+                query.get('explanation', ''),
+                resolve_parallel(query['path'], query.get('parallel'))
+            )
+
+        return cls(records, flow_records, layers, sequence_records, query_records, enhanced_details)
+
+    def component(self, comp_id: str) -> ComponentRecord:
+        """Get a component record by string id"""
+        return self.components[self.index_of[comp_id]]
+
+    def path_components(self, path) -> list:
+        """Resolve a path of component indices, string ids or records to records"""
+        components = self.components
+        index_of = self.index_of
+        return [
+            step if isinstance(step, ComponentRecord) else
+            components[step] if isinstance(step, int) else components[index_of[step]]
+            for step in path
+        ]
+
+    def path_ids(self, path) -> list:
+        """Resolve a path of component indices to string ids"""
+        return [comp.id for comp in self.path_components(path)]
+
+    def sequence_steps(self, name: str) -> list:
+        """Steps of a numbered-flow sequence as plain dicts (empty when the model does not define it)"""
+        return [step.as_dict() for step in self.sequences.get(name, ())]
+
+
+def load_enhanced_details(path: str = ENHANCED_DETAILS_PATH) -> dict:
+    """Load enhanced component details (heavy fields decoded lazily), returning an empty dict when unavailable"""
+    try:
+        return load_details_file(path)
+    except (OSError, ValueError):
+        return {}
+
+
+_COMPILED_MODELS = OrderedDict()
+
+
+def load_architecture_model(path: str) -> ArchitectureModel:
+    """
+    Load and compile an architecture model from an external file
+
+    The compiled model is cached by the file's content hash, so reruns and
+    identical copies of an estate reuse it instead of parsing again.
+
+    Args:
+        path: Path to a JSON, JSONL or YAML model file
+
+    Returns:
+        ArchitectureModel instance
+    """
+    digest = file_digest(path)
+    model = _COMPILED_MODELS.get(digest)
+    if model is not None:
+        _COMPILED_MODELS.move_to_end(digest)
+        return model
+
+    sections = load_model_sections(path)
+    model = ArchitectureModel.from_data(
+        sections['components'], sections['flows'], sections['layers'],
+        sequences=sections['sequences'],
+        sample_queries=sections['sample_queries'],
+        enhanced_details=sections['enhanced_details']
+    )
+    _COMPILED_MODELS[digest] = model
+    while len(_COMPILED_MODELS) > MAX_CACHED_MODELS:
+        _COMPILED_MODELS.popitem(last=False)
+    return model
+
+
+_MODEL = None
+
+
+def get_architecture_model() -> ArchitectureModel:
+    """
+    Get the shared architecture model, building it on first use
+
+    When ARCHITECTURE_MODEL_FILE is set, the model is loaded from that file
+    instead of architecture_data.py.
+    """
+    global _MODEL
+    model_file = os.environ.get(MODEL_FILE_ENV)
+    if model_file:
+        return load_architecture_model(model_file)
+    if _MODEL is None:
+        _MODEL = ArchitectureModel.from_data(
+            COMPONENTS, FLOWS, LAYERS,
+            sequences={"rag": RAG_FLOW, "mcp": MCP_FLOW, "mcp_openapi": OPENAPI_MCP_FLOW},
+            sample_queries=SAMPLE_QUERIES,
+            enhanced_details=load_enhanced_details()
+        )
+    return _MODEL
+
+
+def reload_architecture_model() -> ArchitectureModel:
+    """Rebuild the shared architecture model from the current data modules and details file"""
+    global _MODEL
+    _MODEL = None
+    return get_architecture_model()
@@ -0,0 +1,253 @@
+"""
+Batch Diagram Export
+Renders every diagram the app can show to SVG, PNG, DOT and draw.io files without Streamlit, in a process pool
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from airport_transfer_flow import AIRPORT_TRANSFER_FLOW
+from architecture_diagram import create_airport_transfer_diagram, create_architecture_diagram, create_flow_diagram
+from architecture_graph import get_architecture_graph
+from architecture_model import get_architecture_model
+from diagram_layout import LAYOUT_FORMATS
+from drawio_exporter import create_drawio_xml
+from drawio_pages import SEQUENCE_PAGE_NAMES, create_multipage_drawio_xml
+from model_loader import MODEL_FILE_ENV
+from numbered_flow_diagram import (
+    FLOW_TYPE_SEQUENCES, available_flow_types, create_numbered_flow_diagram, create_numbered_flow_diagram_vertical
+)
+from prerender import NUMBERED_FLOW_TYPES
+from render_cache import dot_available, get_render_cache
+
+# Default number of worker processes (one Graphviz layout each)
+BATCH_WORKERS = max(1, os.cpu_count() or 1)
+
+# Default output directory
+DEFAULT_OUTPUT_DIR = "diagrams"
+
+# Image formats rendered by Graphviz (DOT and draw.io files are always written)
+IMAGE_FORMATS = ("svg", "png")
+
+# Diagram directions of the Full Architecture page and their draw.io codes
+DIRECTIONS = {"TB": "Top to Bottom", "LR": "Left to Right"}
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def export_jobs(directions: tuple = ("TB", "LR")) -> list:
+    """
+    Every diagram to export
+
+    Covers the full architecture and each single layer in every direction,
+    every numbered flow type whose sequences the model defines (horizontal
+    and vertical), every sample query path and the airport transfer journey.
+
+    Args:
+        directions: Architecture diagram directions ("TB" and/or "LR")
+
+    Returns:
+        List of (file stem relative to the output directory, kind, key, variant) tuples
+    """
+    graph = get_architecture_graph()
+    jobs = []
+    layer_filters = [("all", None)] + [(layer_id, layer_id) for layer_id in graph.layers]
+    for direction in directions:
+        for name, layer_id in layer_filters:
+            jobs.append((f"architecture/{name}_{direction}", "architecture", layer_id, direction))
+    for flow_type in available_flow_types(NUMBERED_FLOW_TYPES):
+        for orientation in ("horizontal", "vertical"):
+            jobs.append((f"numbered_flows/{flow_type}_{orientation}", "numbered_flow", flow_type, orientation))
+    for name in graph.model.sample_queries:
+        jobs.append((f"queries/{_slug(name)}", "query", name, None))
+    jobs.append(("airport/transfer_journey", "airport", None, None))
+    return jobs
+
+
+def _show_layers(key: str) -> list:
+    graph = get_architecture_graph()
+    return graph.layer_names if key is None else [graph.layers[key]['name']]
+
+
+def _dot_source(kind: str, key: str, variant: str) -> str:
+    """DOT source of one diagram, built exactly as its page builds it"""
+    if kind == "architecture":
+        # Every layer expanded: the DOT source the draw.io export lays out, so both share one layout pass
+        return create_architecture_diagram(_show_layers(key), "None", DIRECTIONS[variant]).source
+    if kind == "numbered_flow":
+        create = create_numbered_flow_diagram if variant == "horizontal" else create_numbered_flow_diagram_vertical
+        return create(key).source
+    if kind == "query":
+        query = get_architecture_model().sample_queries[key]
+        return create_flow_diagram(query.path, parallel=query.parallel).source
+    if kind == "airport":
+        return create_airport_transfer_diagram().source
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def _drawio_xml(kind: str, key: str, variant: str) -> str:
+    """draw.io XML of one diagram (pages built in the calling process)"""
+    if kind == "architecture":
+        return create_drawio_xml(_show_layers(key), variant)
+    if kind == "numbered_flow":
+        pages = [("sequence", name, SEQUENCE_PAGE_NAMES[name]) for name in FLOW_TYPE_SEQUENCES[key]]
+    elif kind == "query":
+        pages = [("query", key, f"Query: {key}")]
+    elif kind == "airport":
+        pages = [("airport", None, AIRPORT_TRANSFER_FLOW['name'])]
+    else:
+        raise ValueError(f"Unknown export kind: {kind}")
+    return create_multipage_drawio_xml(pages, max_workers=1)
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    """Write a file unless it already holds the same bytes (keeps mtimes stable for downstream tools)"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return True
+
+
+def export_artifacts(output_dir: str, stem: str, kind: str, key: str, variant: str,
+                     image_formats: tuple = IMAGE_FORMATS) -> dict:
+    """
+    Write the DOT, draw.io and image files of one diagram (runs in the worker processes)
+
+    Images come from the shared render cache together with the layout JSON,
+    so an unchanged diagram costs no Graphviz run and the draw.io export
+    reuses the same layout pass.
+
+    Args:
+        output_dir: Output directory
+        stem: File path without extension, relative to output_dir
+        kind: "architecture", "numbered_flow", "query" or "airport"
+        key: Layer id, numbered flow type or sample query name
+        variant: Direction ("TB"/"LR") or orientation ("horizontal"/"vertical")
+        image_formats: Graphviz output formats to write (skipped without Graphviz)
+
+    Returns:
+        Dictionary of written file extension to whether its content changed
+    """
+    base = os.path.join(output_dir, stem)
+    source = _dot_source(kind, key, variant)
+    changed = {"dot": _write_if_changed(f"{base}.dot", source.encode('utf-8'))}
+    if image_formats and dot_available():
+        # Rendered before the draw.io export so it finds the layout in the cache
+        formats = tuple(dict.fromkeys(LAYOUT_FORMATS + tuple(image_formats)))
+        rendered = get_render_cache().render_formats(source, formats)
+        for fmt in image_formats:
+            changed[fmt] = _write_if_changed(f"{base}.{fmt}", rendered[fmt])
+    changed["drawio"] = _write_if_changed(f"{base}.drawio", _drawio_xml(kind, key, variant).encode('utf-8'))
+    return changed
+
+
+def batch_export(output_dir: str = DEFAULT_OUTPUT_DIR, jobs: list = None, image_formats: tuple = IMAGE_FORMATS,
+                 max_workers: int = BATCH_WORKERS, progress=None) -> dict:
+    """
+    Export diagrams in parallel
+
+    Args:
+        output_dir: Output directory
+        jobs: (file stem, kind, key, variant) tuples (defaults to export_jobs())
+        image_formats: Graphviz output formats to write besides DOT and draw.io
+        max_workers: Maximum number of worker processes (1, or Graphviz not
+            being installed, exports in this process)
+        progress: Optional callback(done, total, stem, status) after each
+            diagram, status being "written", "unchanged" or "failed"
+
+    Returns:
+        Dictionary with total, written, unchanged, failed, errors and seconds
+    """
+    jobs = export_jobs() if jobs is None else jobs
+    started = time.perf_counter()
+    summary = {"total": len(jobs), "written": 0, "unchanged": 0, "failed": 0, "errors": {}, "seconds": 0.0}
+    done = 0
+
+    def record(stem, outcome, error=None):
+        nonlocal done
+        if error is not None:
+            summary["errors"][stem] = f"{type(error).__name__}: {error}"
+            status = "failed"
+        else:
+            status = "written" if any(outcome.values()) else "unchanged"
+        summary[status] += 1
+        done += 1
+        if progress:
+            progress(done, summary["total"], stem, status)
+
+    # Without Graphviz an export is pure serialization, cheaper than starting workers
+    if max_workers <= 1 or len(jobs) <= 1 or not dot_available():
+        for job in jobs:
+            try:
+                record(job[0], export_artifacts(output_dir, *job, image_formats=image_formats))
+            except Exception as e:
+                record(job[0], None, e)
+    else:
+        # Spawned workers do not inherit the parent's threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=context) as pool:
+            futures = {
+                pool.submit(export_artifacts, output_dir, *job, image_formats=image_formats): job[0]
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    record(futures[future], future.result())
+                except Exception as e:
+                    record(futures[future], None, e)
+
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every architecture diagram to SVG, PNG, DOT and draw.io files")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="output directory")
+    parser.add_argument("--model", help="model file to export instead of the bundled architecture")
+    parser.add_argument("--formats", default=",".join(IMAGE_FORMATS),
+                        help="comma-separated Graphviz image formats (empty for DOT and draw.io only)")
+    parser.add_argument("--directions", default="TB,LR", help="comma-separated architecture directions (TB, LR)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="maximum number of worker processes")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args()
+
+    directions = tuple(d.strip().upper() for d in args.directions.split(",") if d.strip())
+    unknown = [d for d in directions if d not in DIRECTIONS]
+    if unknown:
+        parser.error(f"unknown direction(s): {', '.join(unknown)}")
+    image_formats = tuple(fmt.strip() for fmt in args.formats.split(",") if fmt.strip())
+    if image_formats and not dot_available():
+        print("Graphviz 'dot' executable not found: writing DOT and draw.io files only")
+
+    if args.model:
+        # Set before the model is first loaded, and inherited by the spawned workers
+        os.environ[MODEL_FILE_ENV] = os.path.abspath(args.model)
+
+    def report(done, total, stem, status):
+        if not args.quiet:
+            print(f"[{done}/{total}] {status:9} {stem}")
+
+    summary = batch_export(args.output, export_jobs(directions), image_formats, args.workers, report)
+    print(f"{summary['written']} written, {summary['unchanged']} unchanged, "
+          f"{summary['failed']} failed in {summary['seconds']:.1f}s -> {os.path.abspath(args.output)}")
+    for stem, error in summary["errors"].items():
+        print(f"  {stem}: {error}")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
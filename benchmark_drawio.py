@@ -0,0 +1,95 @@
+"""
+Draw.io Export Benchmark
+Compares file size and export time of plain and compressed draw.io output
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from architecture_data import COMPONENTS, FLOWS, LAYERS
+from drawio_exporter import create_drawio_xml
+from model_loader import MODEL_FILE_ENV
+
+# Export variants compared: (name, keyword arguments of create_drawio_xml)
+VARIANTS = (
+    ("plain (indented)", {}),
+    ("plain (compact)", {"indent": None}),
+    ("compressed", {"compressed": True}),
+)
+
+
+def write_synthetic_model(path: str, copies: int):
+    """
+    Write a model file holding several copies of the bundled architecture
+
+    Each copy gets suffixed component ids in the same layers and a copy of
+    every flow, so the export grows linearly with the number of copies.
+
+    Args:
+        path: Output .json path
+        copies: Number of copies of the bundled components and flows
+    """
+    components = {}
+    flows = []
+    for copy in range(copies):
+        suffix = f"_{copy}" if copy else ""
+        for comp_id, comp in COMPONENTS.items():
+            components[comp_id + suffix] = dict(comp, name=comp['name'] + suffix)
+        for flow in FLOWS:
+            flows.append(dict(flow, **{"from": flow["from"] + suffix, "to": flow["to"] + suffix}))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"layers": LAYERS, "components": components, "flows": flows}, f)
+
+
+def benchmark(repeat: int) -> list:
+    """
+    Time every export variant on the current model
+
+    Args:
+        repeat: Number of timed exports per variant (the median is reported)
+
+    Returns:
+        List of dicts with variant, bytes and milliseconds
+    """
+    layer_names = [layer['name'] for layer in LAYERS.values()]
+    results = []
+    for name, options in VARIANTS:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = create_drawio_xml(layer_names, "TB", **options).encode('utf-8')
+            timings.append(time.perf_counter() - started)
+        results.append({
+            "variant": name,
+            "bytes": len(content),
+            "ms": statistics.median(timings) * 1000,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plain and compressed draw.io export size and time")
+    parser.add_argument("--repeat", type=int, default=20, help="timed exports per variant")
+    parser.add_argument("--copies", type=int, default=1,
+                        help="export a synthetic model with this many copies of the bundled architecture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.copies > 1:
+            path = os.path.join(directory, "synthetic_model.json")
+            write_synthetic_model(path, args.copies)
+            os.environ[MODEL_FILE_ENV] = path
+        results = benchmark(max(1, args.repeat))
+
+    baseline = results[0]
+    print(f"{'variant':<18} {'size':>12} {'ratio':>7} {'time':>10}")
+    for result in results:
+        print(f"{result['variant']:<18} {result['bytes']:>10,} B {result['bytes'] / baseline['bytes']:>6.1%} "
+              f"{result['ms']:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Replica Capacity Planner
+Sizes containerized components for a target request rate and latency SLO with M/M/c (Erlang C) queueing
+"""
+
+import argparse
+import difflib
+import json
+import math
+import os
+from statistics import NormalDist
+from architecture_data import COMPONENT_LATENCY_MS
+from architecture_model import ENHANCED_DETAILS_PATH, get_architecture_model
+from latency_analysis import DEFAULT_HOP_LATENCY_MS
+from load_simulation import SLOTS_PER_REPLICA, sample_query_paths
+
+# Highest utilisation a component is planned for, leaving headroom for bursts
+DEFAULT_MAX_UTILISATION = 0.85
+
+# Latency percentile the SLO applies to by default
+DEFAULT_SLO_PERCENTILE = 95
+
+# Upper bound on replicas per component (guards against unreachable SLOs)
+MAX_REPLICAS = 500
+
+
+def is_containerized(comp) -> bool:
+    """Whether the platform scales the component itself (a Kubernetes deployment)"""
+    return comp.deployment_type.startswith("Container")
+
+
+def erlang_c(servers: int, offered_load: float) -> float:
+    """
+    Probability that an arriving request has to wait in an M/M/c queue
+
+    Uses the Erlang B recursion, which stays numerically stable for
+    hundreds of servers.
+
+    Args:
+        servers: Number of servers (c)
+        offered_load: Arrival rate x mean service time (a, in Erlangs)
+
+    Returns:
+        Waiting probability (1.0 when the queue is unstable, a >= c)
+    """
+    if offered_load >= servers:
+        return 1.0
+    blocking = 1.0
+    for k in range(1, servers + 1):
+        blocking = offered_load * blocking / (k + offered_load * blocking)
+    utilisation = offered_load / servers
+    return blocking / (1 - utilisation * (1 - blocking))
+
+
+def response_moments(servers: int, arrival_rps: float, service_ms: float) -> tuple:
+    """
+    Mean and variance of the response time (queue wait plus service) of one visit
+
+    Args:
+        servers: Number of servers of an M/M/c station, or None for a pure
+            delay (exponential service, no queue)
+        arrival_rps: Visits per second
+        service_ms: Mean service time in ms
+
+    Returns:
+        (mean, variance) in ms and ms squared (infinite when the station is unstable)
+    """
+    mean, variance = service_ms, service_ms ** 2
+    if servers is None:
+        return mean, variance
+    offered_load = arrival_rps * service_ms / 1000
+    if offered_load >= servers:
+        return math.inf, math.inf
+    waiting = erlang_c(servers, offered_load)
+    # The wait is 0 with probability 1 - C and exponential at rate c*mu - lambda otherwise
+    drain_ms = service_ms / (servers - offered_load)
+    wait_mean = waiting * drain_ms
+    wait_variance = 2 * waiting * drain_ms ** 2 - wait_mean ** 2
+    return mean + wait_mean, variance + wait_variance
+
+
+def latency_percentile(mean: float, variance: float, percentile: float = None) -> float:
+    """
+    Percentile of a latency from its mean and variance (lognormal moment match)
+
+    Args:
+        mean: Mean latency
+        variance: Latency variance
+        percentile: Percentile (0-100), or None for the mean
+
+    Returns:
+        The latency percentile
+    """
+    if percentile is None or not math.isfinite(mean) or mean <= 0:
+        return mean
+    sigma_squared = math.log(1 + variance / mean ** 2)
+    z = NormalDist().inv_cdf(percentile / 100)
+    return math.exp(math.log(mean) - sigma_squared / 2 + z * math.sqrt(sigma_squared))
+
+
+def plan_replicas(target_rps: float, slo_ms: float, mix: dict = None, slo_percentile: float = DEFAULT_SLO_PERCENTILE,
+                  max_utilisation: float = DEFAULT_MAX_UTILISATION, slots_per_replica: int = SLOTS_PER_REPLICA,
+                  service_ms: dict = None) -> dict:
+    """
+    Minimum replicas per containerized component meeting a latency SLO
+
+    Each component's arrival rate is the target rate times its visit count
+    per request, averaged over the traffic mix. Every component starts at
+    the fewest replicas keeping it under max_utilisation; while a path
+    misses the SLO, the replica cutting that path's latency the most is
+    added. A path's latency percentile comes from the summed mean and
+    variance of every visit's response time (M/M/c wait plus exponential
+    service) fitted with a lognormal; parallel branches count as their
+    slowest branch. Components outside the platform are pure delays.
+
+    Args:
+        target_rps: Requests per second to plan for
+        slo_ms: Latency objective in ms for every sample query path
+        mix: Relative weight of each sample query (defaults to an even mix)
+        slo_percentile: Percentile the SLO applies to (None for the mean)
+        max_utilisation: Highest planned utilisation per component
+        slots_per_replica: Requests one replica serves at a time
+        service_ms: Mean service time overrides per component id (defaults to COMPONENT_LATENCY_MS)
+
+    Returns:
+        Dictionary with components (current and required replicas, arrival_rps,
+        utilisation and mean wait_ms per containerized component id), paths
+        (latency_ms and queue-free base_ms at the SLO percentile, and
+        meets_slo, per sample query), infeasible (paths missing the SLO
+        even without queueing) and skipped (components without a deployment
+        type, planned as pure delays)
+    """
+    if target_rps <= 0:
+        raise ValueError("target_rps must be positive")
+    model = get_architecture_model()
+    latency = dict(COMPONENT_LATENCY_MS, **(service_ms or {}))
+    paths = sample_query_paths()
+    weights = {name: float((mix or {}).get(name, 0 if mix else 1)) for name in paths}
+    total_weight = sum(weights.values())
+    if not total_weight:
+        raise ValueError("The traffic mix gives every query a weight of zero")
+
+    path_visits = {}
+    path_segments = {}
+    for name, dag in paths.items():
+        visits = {}
+        for comp_id in dag:
+            if latency.get(comp_id, DEFAULT_HOP_LATENCY_MS) > 0:
+                visits[comp_id] = visits.get(comp_id, 0) + 1
+        path_visits[name] = visits
+        path_segments[name] = [
+            [[dag.comp_ids[position] for position in branch] for branch in segment]
+            if isinstance(segment, list) else [[dag.comp_ids[segment]]]
+            for segment in dag.segments()
+        ]
+
+    stations = {}
+    for name, visits in path_visits.items():
+        for comp_id, count in visits.items():
+            station = stations.setdefault(comp_id, {
+                "service_ms": float(latency.get(comp_id, DEFAULT_HOP_LATENCY_MS)),
+                "arrival_rps": 0.0,
+                "servers": None,
+                "replicas": None,
+            })
+            station["arrival_rps"] += target_rps * count * weights[name] / total_weight
+
+    for comp_id, station in stations.items():
+        if is_containerized(model.component(comp_id)):
+            offered_load = station["arrival_rps"] * station["service_ms"] / 1000
+            station["replicas"] = max(1, math.ceil(offered_load / (max_utilisation * slots_per_replica)))
+            station["servers"] = station["replicas"] * slots_per_replica
+
+    def branch_moments(comp_ids, queueing):
+        mean = variance = 0.0
+        for comp_id in comp_ids:
+            if comp_id not in stations:
+                continue
+            station = stations[comp_id]
+            servers = station["servers"] if queueing else None
+            visit_mean, visit_variance = response_moments(servers, station["arrival_rps"], station["service_ms"])
+            mean += visit_mean
+            variance += visit_variance
+        return mean, variance
+
+    def path_latency(name, queueing: bool = True):
+        mean = variance = 0.0
+        for branches in path_segments[name]:
+            # Parallel branches last as long as the slowest; the branch with the largest mean stands in for it
+            segment_mean, segment_variance = max(branch_moments(branch, queueing) for branch in branches)
+            mean += segment_mean
+            variance += segment_variance
+        return latency_percentile(mean, variance, slo_percentile)
+
+    base = {name: path_latency(name, queueing=False) for name in paths}
+    infeasible = [name for name in paths if weights[name] and base[name] > slo_ms]
+
+    # Greedy marginal allocation: queue waits fall convexly with each added replica
+    while True:
+        latencies = [(path_latency(name), name) for name in paths if weights[name] and name not in infeasible]
+        missing = [(latency_ms, name) for latency_ms, name in latencies if latency_ms > slo_ms]
+        if not missing:
+            break
+        worst_ms, worst = max(missing)
+        best, best_ms = None, worst_ms
+        for comp_id in path_visits[worst]:
+            station = stations[comp_id]
+            if not station["servers"] or station["replicas"] >= MAX_REPLICAS:
+                continue
+            station["servers"] += slots_per_replica
+            candidate_ms = path_latency(worst)
+            station["servers"] -= slots_per_replica
+            if candidate_ms < best_ms:
+                best, best_ms = station, candidate_ms
+        if best is None:
+            infeasible.append(worst)
+            continue
+        best["replicas"] += 1
+        best["servers"] += slots_per_replica
+
+    components = {}
+    for comp_id, station in stations.items():
+        if station["servers"] is None:
+            continue
+        mean, _ = response_moments(station["servers"], station["arrival_rps"], station["service_ms"])
+        components[comp_id] = {
+            "current": model.component(comp_id).replicas,
+            "required": station["replicas"],
+            "arrival_rps": station["arrival_rps"],
+            "utilisation": station["arrival_rps"] * station["service_ms"] / 1000 / station["servers"],
+            "wait_ms": mean - station["service_ms"],
+        }
+
+    path_latencies = {name: path_latency(name) for name in paths if weights[name]}
+    skipped = [comp_id for comp_id in stations if not model.component(comp_id).deployment_type]
+    return {
+        "components": components,
+        "paths": {
+            name: {"latency_ms": latency_ms, "base_ms": base[name], "meets_slo": latency_ms <= slo_ms}
+            for name, latency_ms in path_latencies.items()
+        },
+        "infeasible": infeasible,
+        "skipped": skipped,
+    }
+
+
+def replica_diff(plan: dict, details_path: str = ENHANCED_DETAILS_PATH) -> str:
+    """
+    Unified diff applying a plan's replica counts to the enhanced details file
+
+    Args:
+        plan: Result of plan_replicas()
+        details_path: Enhanced component details JSON file
+
+    Returns:
+        Diff text (git apply compatible; empty when nothing changes)
+    """
+    with open(details_path, 'r', encoding='utf-8') as f:
+        original = f.read()
+    details = json.loads(original)
+    for comp_id, sizing in plan["components"].items():
+        if sizing["required"] != sizing["current"]:
+            details.setdefault(comp_id, {})["replicas"] = sizing["required"]
+    updated = json.dumps(details, indent=2)
+    if original.endswith("\n"):
+        updated += "\n"
+    name = os.path.basename(details_path)
+    return "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), updated.splitlines(keepends=True), f"a/{name}", f"b/{name}"
+    ))
+
+
+def _parse_mix(text: str) -> dict:
+    """Parse "Query Name=weight,..." into a mix dictionary"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = part.rpartition("=")
+        if not name:
+            raise ValueError(f"Expected 'Query Name=weight', got {part!r}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan component replicas for a target request rate and latency SLO")
+    parser.add_argument("--rps", type=float, required=True, help="target requests per second")
+    parser.add_argument("--slo", type=float, required=True, help="latency objective in ms")
+    parser.add_argument("--percentile", type=float, default=DEFAULT_SLO_PERCENTILE,
+                        help="latency percentile the SLO applies to")
+    parser.add_argument("--mix", default="", help="traffic mix as 'Query Name=weight,...' (default: even mix)")
+    parser.add_argument("--max-utilisation", type=float, default=DEFAULT_MAX_UTILISATION,
+                        help="highest planned utilisation per component")
+    args = parser.parse_args()
+
+    try:
+        mix = _parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    unknown = sorted(set(mix) - set(get_architecture_model().sample_queries))
+    if unknown:
+        parser.error(f"unknown sample quer{'y' if len(unknown) == 1 else 'ies'}: {', '.join(unknown)}")
+
+    plan = plan_replicas(args.rps, args.slo, mix or None, args.percentile, args.max_utilisation)
+    print(f"{'component':<20} {'current':>8} {'required':>9} {'visits/s':>9} {'util':>6} {'wait':>9}")
+    for comp_id, sizing in sorted(plan["components"].items()):
+        current = sizing["current"] if sizing["current"] is not None else "-"
+        print(f"{comp_id:<20} {current:>8} {sizing['required']:>9} {sizing['arrival_rps']:>9.1f} "
+              f"{sizing['utilisation']:>6.0%} {sizing['wait_ms']:>6.1f} ms")
+    print()
+    for name, path in plan["paths"].items():
+        status = "ok" if path["meets_slo"] else "MISSES SLO"
+        print(f"{name:<20} p{args.percentile:g} {path['latency_ms']:7.1f} ms (without queueing {path['base_ms']:.0f} ms) {status}")
+    if plan["skipped"]:
+        print(f"Not sized (no deployment type in the model): {', '.join(plan['skipped'])}")
+    print()
+    print(replica_diff(plan) or "Current replicas already meet the plan")
+
+
+if __name__ == "__main__":
+    main()
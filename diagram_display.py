@@ -0,0 +1,95 @@
+"""
+Diagram Display
+Shows Graphviz diagrams as cached server-side SVG renders, falling back to client-side rendering
+"""
+
+import re
+import streamlit as st
+import graphviz
+from diagram_layout import layout_svg
+from render_cache import dot_available, get_render_cache, render_key
+
+_SVG_START = re.compile(r'<svg\b')
+_SVG_SIZE = re.compile(r'<svg\b([^>]*?)\swidth="[^"]*"\s+height="[^"]*"')
+
+
+def svg_markup(svg: bytes, use_container_width: bool = False) -> str:
+    """
+    Inline-able SVG markup from a Graphviz SVG render
+
+    Drops the XML prolog and DOCTYPE, and optionally lets the drawing scale
+    to the container width (the viewBox keeps the aspect ratio).
+    """
+    text = svg.decode('utf-8')
+    start = _SVG_START.search(text)
+    if start:
+        text = text[start.start():]
+    if use_container_width:
+        text = _SVG_SIZE.sub(r'<svg\1 width="100%"', text, count=1)
+    return text
+
+
+def _cached_svg(source: str) -> bytes:
+    """SVG render of DOT source from the shared render cache (None when Graphviz cannot render)"""
+    if not dot_available():
+        return None
+    try:
+        return get_render_cache().render(source)
+    except (graphviz.ExecutableNotFound, graphviz.CalledProcessError):
+        return None
+
+
+def _show_svg(svg: bytes, use_container_width: bool, scope: str = "", css: str = ""):
+    style = f"<style>{css}</style>" if css else ""
+    scope_class = f' class="{scope}"' if scope else ""
+    st.markdown(
+        f'{style}<div{scope_class} style="overflow-x: auto; text-align: center;">{svg_markup(svg, use_container_width)}</div>',
+        unsafe_allow_html=True
+    )
+
+
+def show_diagram(diagram, use_container_width: bool = False):
+    """
+    Display a Graphviz diagram
+
+    The SVG comes from the shared render cache, so repeated views of the same
+    DOT source skip Graphviz entirely. Without the 'dot' executable the
+    diagram is handed to st.graphviz_chart as before.
+
+    Args:
+        diagram: graphviz.Digraph/Graph or DOT source string
+        use_container_width: Scale the diagram to the container width
+    """
+    source = diagram.source if hasattr(diagram, 'source') else diagram
+    svg = _cached_svg(source)
+    if svg is not None:
+        _show_svg(svg, use_container_width)
+        return
+    st.graphviz_chart(diagram, use_container_width=use_container_width)
+
+
+def show_restyled_diagram(diagram, restyle, fallback, use_container_width: bool = False):
+    """
+    Display a base diagram with view-specific styling applied as CSS
+
+    The base diagram is laid out once (the same pass that gives exporters
+    their coordinates, see diagram_layout) and its SVG cached; highlights and
+    other styling changes only rebuild the CSS wrapped around the same SVG.
+    Without the 'dot' executable the fully styled fallback diagram is
+    rendered in the browser instead.
+
+    Args:
+        diagram: Base graphviz.Digraph/Graph or DOT source with stable element ids
+        restyle: Callable(scope) returning CSS for the view, scope being the CSS
+            class of the element wrapping the SVG
+        fallback: Zero-argument callable building the fully styled diagram
+        use_container_width: Scale the diagram to the container width
+    """
+    source = diagram.source if hasattr(diagram, 'source') else diagram
+    svg = layout_svg(source)
+    if svg is None:
+        st.graphviz_chart(fallback(), use_container_width=use_container_width)
+        return
+    # Scope the rules to this render so other diagrams on the page keep their styling
+    scope = f"diagram-{render_key(source)[:12]}"
+    _show_svg(svg, use_container_width, scope, restyle(scope))
@@ -0,0 +1,138 @@
+"""
+Diagram Layout
+Shared Graphviz layout pass: one run yields the SVG and the node/edge coordinates reused by exporters
+"""
+
+import json
+import threading
+from collections import OrderedDict
+import graphviz
+from render_cache import dot_available, get_render_cache, render_key
+
+# Formats produced together by the layout pass
+LAYOUT_FORMATS = ("svg", "json")
+
+# Parsed layouts kept in memory before the least recently used is dropped
+MAX_CACHED_LAYOUTS = 16
+
+# Graphviz node sizes are in inches, positions in points
+POINTS_PER_INCH = 72
+
+
+def _floats(value: str) -> list:
+    return [float(part) for part in value.split(',')]
+
+
+def _spline_knots(pos: str) -> list:
+    """
+    End points of the Bezier segments of a Graphviz edge spline
+
+    Args:
+        pos: Edge "pos" attribute ("e,x,y" / "s,x,y" arrow points, then control points)
+
+    Returns:
+        List of (x, y) points: the first control point and every third one after it
+    """
+    points = [_floats(token) for token in pos.split() if not token.startswith(('e,', 's,'))]
+    return points[::3]
+
+
+class DiagramLayout:
+    """
+    Geometry of a laid-out diagram
+
+    Coordinates are in points with the origin at the top-left corner, the
+    convention of draw.io and SVG (Graphviz's own y axis points up).
+    Rectangles are (left, top, width, height).
+    """
+
+    __slots__ = ('width', 'height', 'nodes', 'clusters', 'edges')
+
+    def __init__(self, layout: dict):
+        x0, y0, x1, y1 = _floats(layout.get('bb', '0,0,0,0'))
+        self.width = x1 - x0
+        self.height = y1 - y0
+        self.nodes = {}
+        self.clusters = {}
+        self.edges = {}
+
+        def flip(x, y):
+            return (x - x0, y1 - y)
+
+        names = {}
+        for obj in layout.get('objects', ()):
+            names[obj['_gvid']] = obj['name']
+            if 'bb' in obj:
+                left, bottom, right, top = _floats(obj['bb'])
+                self.clusters[obj['name']] = flip(left, top) + (right - left, top - bottom)
+            elif 'pos' in obj:
+                x, y = flip(*_floats(obj['pos']))
+                width = float(obj.get('width', 0)) * POINTS_PER_INCH
+                height = float(obj.get('height', 0)) * POINTS_PER_INCH
+                self.nodes[obj['name']] = (x - width / 2, y - height / 2, width, height)
+
+        for edge in layout.get('edges', ()):
+            key = edge.get('id') or f"{names[edge['tail']]}->{names[edge['head']]}"
+            knots = [flip(x, y) for x, y in _spline_knots(edge.get('pos', ''))]
+            # The first and last knots sit on the node borders; the rest are bends
+            self.edges[key] = knots[1:-1]
+
+    def waypoints(self, edge_id: str) -> list:
+        """Bend points of an edge by its element id (empty when unknown)"""
+        return self.edges.get(edge_id, [])
+
+
+_LAYOUTS = OrderedDict()
+_LAYOUTS_LOCK = threading.Lock()
+
+
+def layout_outputs(source: str) -> dict:
+    """
+    SVG and JSON layout of DOT source from the shared render cache
+
+    Both come from the same Graphviz run, so a view and its export share one
+    layout pass.
+
+    Returns:
+        Dictionary of format to bytes, or None when Graphviz cannot render
+    """
+    if not dot_available():
+        return None
+    try:
+        return get_render_cache().render_formats(source, LAYOUT_FORMATS)
+    except (graphviz.ExecutableNotFound, graphviz.CalledProcessError):
+        return None
+
+
+def layout_svg(source: str) -> bytes:
+    """SVG of the shared layout pass (None when Graphviz cannot render)"""
+    outputs = layout_outputs(source)
+    return outputs["svg"] if outputs else None
+
+
+def get_layout(source: str) -> DiagramLayout:
+    """
+    Geometry of DOT source as laid out by Graphviz
+
+    Args:
+        source: DOT source
+
+    Returns:
+        DiagramLayout, or None when Graphviz is not available
+    """
+    key = render_key(source, "json")
+    with _LAYOUTS_LOCK:
+        layout = _LAYOUTS.get(key)
+        if layout is not None:
+            _LAYOUTS.move_to_end(key)
+            return layout
+
+    outputs = layout_outputs(source)
+    if not outputs:
+        return None
+    layout = DiagramLayout(json.loads(outputs["json"]))
+    with _LAYOUTS_LOCK:
+        _LAYOUTS[key] = layout
+        while len(_LAYOUTS) > MAX_CACHED_LAYOUTS:
+            _LAYOUTS.popitem(last=False)
+    return layout
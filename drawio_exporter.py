@@ -3,40 +3,203 @@ Draw.io (diagrams.net) XML Exporter
 Converts architecture diagram to draw.io format
 """
 
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
-from architecture_data import COMPONENTS, LAYERS, FLOWS
+import base64
+import io
+import re
+import zlib
+from urllib.parse import quote, unquote
+from architecture_diagram import cluster_element_id, create_architecture_diagram, flow_element_id
+from architecture_graph import get_architecture_graph
+from diagram_layout import get_layout
+from xml_writer import XmlWriter
 
 
-def create_drawio_xml(show_layers: list, direction: str = "TB") -> str:
+
+# Characters of XML text URI-encoded and deflated at a time in compressed exports
+DEFLATE_CHUNK_SIZE = 64 * 1024
+
+# Characters percent-encoded in compressed diagram content
+_URI_UNSAFE = re.compile(r'[^\x00-\x7f]+|%')
+
+# Offset of the Graphviz drawing from the page corner
+GRAPHVIZ_MARGIN = 50
+
+# Extra room above a Graphviz cluster for the swimlane header
+SWIMLANE_HEADER_PAD = 10
+
+
+def format_coordinate(value: float) -> str:
+    """Geometry attribute value of a coordinate (whole points)"""
+    return str(round(value))
+
+
+def _uri_encode(text: str) -> str:
+    """Percent-encode '%' and non-ASCII characters (all decodeURIComponent needs to restore the text)"""
+    return _URI_UNSAFE.sub(lambda match: quote(match.group(0), safe=''), text)
+
+
+class DeflateStream:
     """
-    Create draw.io XML format from architecture data
-    
+    Text stream producing draw.io's compressed diagram content
+
+    draw.io stores a compressed diagram as base64(raw deflate(encodeURIComponent(xml)))
+    and reads it back with decodeURIComponent, which only needs '%' and
+    non-ASCII characters escaped. Written text is batched, then escaped and
+    deflated a chunk at a time; finish() returns the base64 payload.
+    """
+
+    def __init__(self, level: int = zlib.Z_DEFAULT_COMPRESSION, chunk_size: int = DEFLATE_CHUNK_SIZE):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._chunk_size = chunk_size
+        self._pending = []
+        self._pending_size = 0
+        self._chunks = []
+
+    def _compress_pending(self):
+        text = "".join(self._pending)
+        self._chunks.append(self._compressor.compress(_uri_encode(text).encode('ascii')))
+        self._pending = []
+        self._pending_size = 0
+
+    def write(self, text: str):
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self._chunk_size:
+            self._compress_pending()
+
+    def finish(self) -> str:
+        """Flush the compressor and return the base64-encoded payload"""
+        self._compress_pending()
+        self._chunks.append(self._compressor.flush())
+        return base64.b64encode(b"".join(self._chunks)).decode('ascii')
+
+
+def decompress_diagram(payload: str) -> str:
+    """
+    Decode compressed draw.io diagram content back to XML
+
+    Args:
+        payload: Text of a compressed <diagram> element
+
+    Returns:
+        The mxGraphModel XML
+    """
+    return unquote(zlib.decompress(base64.b64decode(payload), -zlib.MAX_WBITS).decode('ascii'))
+
+
+def _graphviz_positions(graph, show_layers: list, direction: str) -> tuple:
+    """
+    Geometry of the architecture diagram as Graphviz lays it out on screen
+
+    Uses the cached layout of the same DOT source the Full Architecture page
+    renders, so exporting costs no extra layout pass once the view was shown.
+
     Args:
+        graph: ArchitectureGraph to export
         show_layers: List of layer names to include
         direction: "TB" (top to bottom) or "LR" (left to right)
-    
+
     Returns:
-        XML string in draw.io format
+        (layer rects by layer id, component rects by id, bend points by flow
+        index) in absolute page coordinates, or None when Graphviz is not available
     """
-    
-    # Create root mxfile element
-    mxfile = ET.Element('mxfile', {
+    diagram = create_architecture_diagram(show_layers, "None", "Top to Bottom" if direction == "TB" else "Left to Right")
+    layout = get_layout(diagram.source)
+    if layout is None:
+        return None
+
+    def place(x, y):
+        return (x + GRAPHVIZ_MARGIN, y + GRAPHVIZ_MARGIN + SWIMLANE_HEADER_PAD)
+
+    layer_rects = {}
+    for layer_id, _ in graph.layers_in_order:
+        cluster = layout.clusters.get(cluster_element_id(layer_id))
+        if cluster is not None:
+            x, y, width, height = cluster
+            layer_rects[layer_id] = place(x, y - SWIMLANE_HEADER_PAD) + (width, height + SWIMLANE_HEADER_PAD)
+    component_rects = {
+        comp_id: place(x, y) + (width, height)
+        for comp_id, (x, y, width, height) in layout.nodes.items()
+    }
+    edge_waypoints = {
+        flow.index: [place(x, y) for x, y in layout.waypoints(flow_element_id(flow))]
+        for flow in graph.visible_flows(show_layers)
+    }
+    return layer_rects, component_rects, edge_waypoints
+
+
+def _grid_positions(graph, show_layers: list) -> tuple:
+    """
+    Grid geometry used when Graphviz is not installed
+
+    Components are placed four per row inside stacked layer swimlanes.
+
+    Args:
+        graph: ArchitectureGraph to export
+        show_layers: List of layer names to include
+
+    Returns:
+        (layer rects by layer id, component rects by id, empty bend points)
+        in absolute page coordinates
+    """
+    # Layout parameters
+    layer_width = 800
+    layer_height = 200
+    layer_spacing = 50
+    component_width = 140
+    component_height = 60
+    component_spacing_x = 20
+    component_spacing_y = 20
+    components_per_row = 4
+    start_x = 50
+    start_y = 50
+
+    layer_rects = {}
+    component_rects = {}
+    current_y = start_y
+    for layer_id, layer_info in graph.layers_in_order:
+        if layer_info['name'] not in show_layers:
+            continue
+        members = graph.layer_members(layer_id)
+        if not members:
+            continue
+
+        # Calculate layer dimensions based on components
+        num_rows = (len(members) + components_per_row - 1) // components_per_row
+        actual_layer_height = max(layer_height, num_rows * (component_height + component_spacing_y) + 80)
+        layer_rects[layer_id] = (start_x, current_y, layer_width, actual_layer_height)
+
+        for i, comp_id in enumerate(members):
+            row, col = divmod(i, components_per_row)
+            component_rects[comp_id] = (
+                start_x + 20 + col * (component_width + component_spacing_x),
+                current_y + 50 + row * (component_height + component_spacing_y),
+                component_width,
+                component_height
+            )
+
+        current_y += actual_layer_height + layer_spacing
+    return layer_rects, component_rects, {}
+
+
+def start_mxfile(writer: XmlWriter, compressed: bool = False):
+    """Write the XML declaration and open the root mxfile element"""
+    writer.declaration()
+    mxfile = {
         'host': 'app.diagrams.net',
         'modified': '2024-01-01T00:00:00.000Z',
         'agent': 'Manus Architecture Visualizer',
         'version': '22.1.0',
         'type': 'device'
-    })
-    
-    # Create diagram element
-    diagram = ET.SubElement(mxfile, 'diagram', {
-        'id': 'architecture-diagram',
-        'name': 'Enterprise Agent Platform Architecture'
-    })
-    
-    # Create mxGraphModel
-    graph_model = ET.SubElement(diagram, 'mxGraphModel', {
+    }
+    if compressed:
+        mxfile['compressed'] = 'true'
+    writer.start('mxfile', mxfile)
+
+
+def start_graph_model(writer: XmlWriter):
+    """Open the mxGraphModel and root elements and write the two base cells"""
+    writer.start('mxGraphModel', {
         'dx': '1422',
         'dy': '794',
         'grid': '1',
@@ -53,86 +216,102 @@ def create_drawio_xml(show_layers: list, direction: str = "TB") -> str:
         'math': '0',
         'shadow': '0'
     })
+    writer.start('root')
+    writer.element('mxCell', {'id': '0'})
+    writer.element('mxCell', {'id': '1', 'parent': '0'})
+
+
+def write_diagram(writer: XmlWriter, diagram_id: str, name: str, write_model, compressed: bool = False):
+    """
+    Write one diagram (page) element
     
-    # Create root and parent cells
-    root = ET.SubElement(graph_model, 'root')
-    ET.SubElement(root, 'mxCell', {'id': '0'})
-    ET.SubElement(root, 'mxCell', {'id': '1', 'parent': '0'})
-    
-    # Calculate layout positions
-    layer_positions = {}
-    component_positions = {}
+    Args:
+        writer: Writer positioned inside the mxfile element
+        diagram_id: Page id
+        name: Page name shown on the draw.io tab
+        write_model: Callable(writer) writing the page's mxGraphModel element
+        compressed: Store the page as deflated, base64-encoded content
+    """
+    diagram = {'id': diagram_id, 'name': name}
+    if compressed:
+        # The graph model is streamed through the compressor, never held as a whole
+        payload = DeflateStream()
+        write_model(XmlWriter(payload, None))
+        writer.text_element('diagram', diagram, payload.finish())
+    else:
+        writer.start('diagram', diagram)
+        write_model(writer)
+        writer.end()
+
+
+def write_drawio_xml(out, show_layers: list, direction: str = "TB", indent: str = "  ", compressed: bool = False):
+    """
+    Stream draw.io XML for the architecture to a text stream
     
-    # Layout parameters
-    layer_width = 800
-    layer_height = 200
-    layer_spacing = 50
-    component_width = 140
-    component_height = 60
-    component_spacing_x = 20
-    component_spacing_y = 20
-    start_x = 50
-    start_y = 50
+    Cells are written as they are produced, so memory use stays flat however
+    large the model is.
     
-    # Group components by layer
-    components_by_layer = {}
-    for comp_id, comp_data in COMPONENTS.items():
-        layer_name = LAYERS[comp_data['layer']]['name']
-        if layer_name in show_layers:
-            if layer_name not in components_by_layer:
-                components_by_layer[layer_name] = []
-            components_by_layer[layer_name].append((comp_id, comp_data))
+    Args:
+        out: Text stream with a write() method
+        show_layers: List of layer names to include
+        direction: "TB" (top to bottom) or "LR" (left to right)
+        indent: Indentation per nesting level, or None for compact output
+        compressed: Store the diagram as deflated, base64-encoded content
+            (draw.io's compressed format) instead of plain XML
+    """
+    writer = XmlWriter(out, indent)
+    start_mxfile(writer, compressed)
+    write_diagram(
+        writer, 'architecture-diagram', 'Enterprise Agent Platform Architecture',
+        lambda model_writer: write_architecture_model(model_writer, show_layers, direction),
+        compressed
+    )
+    writer.close()
+
+
+def write_architecture_model(writer: XmlWriter, show_layers: list, direction: str = "TB"):
+    """Write the mxGraphModel element of the architecture diagram"""
+    graph = get_architecture_graph()
+    start_graph_model(writer)
     
-    # Calculate positions for each layer
-    current_y = start_y
-    cell_id = 2
+    # Place layers and components where Graphviz puts them on screen, or on a grid without Graphviz
+    positions = _graphviz_positions(graph, show_layers, direction) or _grid_positions(graph, show_layers)
+    layer_rects, component_rects, edge_waypoints = positions
     
-    for layer_id, layer_info in sorted(LAYERS.items(), key=lambda x: x[1]['order']):
-        layer_name = layer_info['name']
-        if layer_name not in show_layers:
+    for layer_id, layer_info in graph.layers_in_order:
+        if layer_id not in layer_rects:
             continue
+        layer_x, layer_y, layer_width, layer_height = layer_rects[layer_id]
         
-        components = components_by_layer.get(layer_name, [])
-        if not components:
-            continue
-        
-        # Calculate layer dimensions based on components
-        components_per_row = 4
-        num_rows = (len(components) + components_per_row - 1) // components_per_row
-        actual_layer_height = max(layer_height, num_rows * (component_height + component_spacing_y) + 80)
-        
-        # Create layer container (swimlane)
+        # Layer container (swimlane)
         layer_cell_id = f'layer_{layer_id}'
-        layer_cell = ET.SubElement(root, 'mxCell', {
+        writer.start('mxCell', {
             'id': layer_cell_id,
-            'value': layer_name,
+            'value': layer_info['name'],
             'style': f'swimlane;startSize=30;fillColor={layer_info["color"]};strokeColor=#666666;fontStyle=1;fontSize=14;',
             'vertex': '1',
             'parent': '1'
         })
-        ET.SubElement(layer_cell, 'mxGeometry', {
-            'x': str(start_x),
-            'y': str(current_y),
-            'width': str(layer_width),
-            'height': str(actual_layer_height),
+        writer.element('mxGeometry', {
+            'x': format_coordinate(layer_x),
+            'y': format_coordinate(layer_y),
+            'width': format_coordinate(layer_width),
+            'height': format_coordinate(layer_height),
             'as': 'geometry'
         })
+        writer.end()
         
-        layer_positions[layer_name] = (start_x, current_y, layer_width, actual_layer_height)
-        
-        # Add components within layer
-        comp_x = 20
-        comp_y = 50
-        col_count = 0
-        
-        for comp_id, comp_data in components:
-            # Create component cell
-            comp_cell_id = f'comp_{comp_id}'
+        # Components within layer (geometry is relative to the swimlane)
+        for comp_id in graph.layer_members(layer_id):
+            if comp_id not in component_rects:
+                continue
+            comp = graph.component(comp_id)
+            comp_x, comp_y, comp_width, comp_height = component_rects[comp_id]
             
             # Style with color
             style = (
                 f'rounded=1;whiteSpace=wrap;html=1;'
-                f'fillColor={comp_data["color"]};'
+                f'fillColor={comp.color};'
                 f'strokeColor=#666666;'
                 f'fontColor=#FFFFFF;'
                 f'fontSize=11;'
@@ -140,94 +319,90 @@ def create_drawio_xml(show_layers: list, direction: str = "TB") -> str:
             )
             
             # Component label with icon and name
-            label = f'{comp_data["icon"]} {comp_data["name"]}'
+            label = f'{comp.icon} {comp.name}'
             
-            comp_cell = ET.SubElement(root, 'mxCell', {
-                'id': comp_cell_id,
+            writer.start('mxCell', {
+                'id': f'comp_{comp_id}',
                 'value': label,
                 'style': style,
                 'vertex': '1',
                 'parent': layer_cell_id
             })
-            
-            ET.SubElement(comp_cell, 'mxGeometry', {
-                'x': str(comp_x),
-                'y': str(comp_y),
-                'width': str(component_width),
-                'height': str(component_height),
+            writer.element('mxGeometry', {
+                'x': format_coordinate(comp_x - layer_x),
+                'y': format_coordinate(comp_y - layer_y),
+                'width': format_coordinate(comp_width),
+                'height': format_coordinate(comp_height),
                 'as': 'geometry'
             })
-            
-            # Store absolute position for edges
-            abs_x = start_x + comp_x + component_width / 2
-            abs_y = current_y + comp_y + component_height / 2
-            component_positions[comp_id] = (comp_cell_id, abs_x, abs_y)
-            
-            # Update position for next component
-            col_count += 1
-            if col_count >= components_per_row:
-                col_count = 0
-                comp_x = 20
-                comp_y += component_height + component_spacing_y
-            else:
-                comp_x += component_width + component_spacing_x
-        
-        current_y += actual_layer_height + layer_spacing
+            writer.end()
     
-    # Add edges (connections)
+    # Edges (connections)
     edge_id = 1000
-    for flow in FLOWS:
-        from_layer = LAYERS[COMPONENTS[flow['from']]['layer']]['name']
-        to_layer = LAYERS[COMPONENTS[flow['to']]['layer']]['name']
-        
-        # Only show edges if both components' layers are visible
-        if from_layer in show_layers and to_layer in show_layers:
-            if 'condition' not in flow:  # Skip conditional flows
-                if flow['from'] in component_positions and flow['to'] in component_positions:
-                    from_cell_id = component_positions[flow['from']][0]
-                    to_cell_id = component_positions[flow['to']][0]
-                    
-                    # Create edge
-                    edge_cell = ET.SubElement(root, 'mxCell', {
-                        'id': f'edge_{edge_id}',
-                        'value': flow['label'],
-                        'style': (
-                            'edgeStyle=orthogonalEdgeStyle;'
-                            'rounded=1;'
-                            'orthogonalLoop=1;'
-                            'jettySize=auto;'
-                            'html=1;'
-                            'strokeColor=#6B7280;'
-                            'fontSize=9;'
-                            'fontColor=#6B7280;'
-                            'endArrow=classic;'
-                        ),
-                        'edge': '1',
-                        'parent': '1',
-                        'source': from_cell_id,
-                        'target': to_cell_id
-                    })
-                    
-                    ET.SubElement(edge_cell, 'mxGeometry', {
-                        'relative': '1',
-                        'as': 'geometry'
-                    })
-                    
-                    edge_id += 1
+    # Only edges whose endpoints are both visible; conditional flows are skipped
+    for flow in graph.visible_flows(show_layers):
+        if flow.source.id in component_rects and flow.target.id in component_rects:
+            writer.start('mxCell', {
+                'id': f'edge_{edge_id}',
+                'value': flow.label,
+                'style': (
+                    'edgeStyle=orthogonalEdgeStyle;'
+                    'rounded=1;'
+                    'orthogonalLoop=1;'
+                    'jettySize=auto;'
+                    'html=1;'
+                    'strokeColor=#6B7280;'
+                    'fontSize=9;'
+                    'fontColor=#6B7280;'
+                    'endArrow=classic;'
+                ),
+                'edge': '1',
+                'parent': '1',
+                'source': f'comp_{flow.source.id}',
+                'target': f'comp_{flow.target.id}'
+            })
+            
+            # Bend points of the Graphviz route, so edges follow the on-screen drawing
+            geometry = {'relative': '1', 'as': 'geometry'}
+            waypoints = edge_waypoints.get(flow.index)
+            if waypoints:
+                writer.start('mxGeometry', geometry)
+                writer.start('Array', {'as': 'points'})
+                for x, y in waypoints:
+                    writer.element('mxPoint', {'x': format_coordinate(x), 'y': format_coordinate(y)})
+                writer.end()
+                writer.end()
+            else:
+                writer.element('mxGeometry', geometry)
+            writer.end()
+            
+            edge_id += 1
     
-    # Convert to pretty XML string
-    xml_str = ET.tostring(mxfile, encoding='unicode')
+    # Close root and mxGraphModel
+    writer.end()
+    writer.end()
+
+
+def create_drawio_xml(show_layers: list, direction: str = "TB", indent: str = "  ", compressed: bool = False) -> str:
+    """
+    Create draw.io XML format from architecture data
     
-    # Pretty print
-    dom = minidom.parseString(xml_str)
-    pretty_xml = dom.toprettyxml(indent='  ')
+    Args:
+        show_layers: List of layer names to include
+        direction: "TB" (top to bottom) or "LR" (left to right)
+        indent: Indentation per nesting level, or None for compact output
+        compressed: Use draw.io's compressed diagram format
     
-    # Remove extra blank lines
-    lines = [line for line in pretty_xml.split('\n') if line.strip()]
-    return '\n'.join(lines)
+    Returns:
+        XML string in draw.io format
+    """
+    buffer = io.StringIO()
+    write_drawio_xml(buffer, show_layers, direction, indent, compressed)
+    return buffer.getvalue()
 
 
-def export_to_drawio(show_layers: list, direction: str = "TB", filename: str = "architecture.drawio") -> bytes:
+def export_to_drawio(show_layers: list, direction: str = "TB", filename: str = "architecture.drawio",
+                     compressed: bool = False) -> bytes:
     """
     Export architecture diagram to draw.io file
     
@@ -235,9 +410,10 @@ def export_to_drawio(show_layers: list, direction: str = "TB", filename: str = "
         show_layers: List of layer names to include
         direction: "TB" (top to bottom) or "LR" (left to right)
         filename: Output filename
+        compressed: Use draw.io's compressed diagram format (smaller, faster to download and open)
     
     Returns:
         Bytes content of the draw.io file
     """
-    xml_content = create_drawio_xml(show_layers, direction)
+    xml_content = create_drawio_xml(show_layers, direction, compressed=compressed)
     return xml_content.encode('utf-8')
@@ -0,0 +1,279 @@
+"""
+Multi-page Draw.io Export
+Exports every view (architecture, numbered flows, sample queries, airport journey) as one draw.io file, pages built in parallel
+"""
+
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from airport_transfer_flow import AIRPORT_TRANSFER_FLOW
+from architecture_diagram import (
+    AIRPORT_PHASE_COLORS, airport_step_label, create_airport_transfer_diagram, create_flow_diagram, flow_edges,
+    flow_split_point
+)
+from architecture_graph import get_architecture_graph
+from architecture_model import get_architecture_model
+from diagram_layout import get_layout
+from drawio_exporter import (
+    GRAPHVIZ_MARGIN, format_coordinate, start_graph_model, start_mxfile, write_architecture_model, write_diagram
+)
+from numbered_flow_diagram import create_numbered_flow_diagram
+from render_cache import dot_available
+from xml_writer import XmlWriter
+
+# Default number of worker processes building pages
+EXPORT_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+# Page names of the bundled numbered-flow sequences (other sequences use their own name)
+SEQUENCE_PAGE_NAMES = {"rag": "RAG_FLOW", "mcp": "MCP_FLOW", "mcp_openapi": "OPENAPI_MCP_FLOW"}
+
+# Grid used for flow pages when Graphviz is not installed
+FLOW_NODES_PER_ROW = 6
+FLOW_NODE_WIDTH = 160
+FLOW_NODE_HEIGHT = 60
+FLOW_SPACING_X = 60
+FLOW_SPACING_Y = 80
+
+
+def drawio_pages() -> list:
+    """
+    Pages of the multi-page export, in page order
+
+    Returns:
+        List of (kind, key, page name) tuples: the full architecture, every
+        numbered-flow sequence, every sample query path and the airport
+        transfer journey
+    """
+    model = get_architecture_model()
+    pages = [("architecture", None, "Full Architecture")]
+    for name in model.sequences:
+        pages.append(("sequence", name, SEQUENCE_PAGE_NAMES.get(name, name)))
+    for name in model.sample_queries:
+        pages.append(("query", name, f"Query: {name}"))
+    pages.append(("airport", None, AIRPORT_TRANSFER_FLOW['name']))
+    return pages
+
+
+def _component_label(comp) -> str:
+    return f"{comp.icon} {comp.name}"
+
+
+def _sequence_page(name: str) -> tuple:
+    """Nodes, edges and layout source of a numbered-flow sequence page"""
+    graph = get_architecture_graph()
+    steps = graph.model.sequences[name]
+    nodes = {}
+    for step in steps:
+        for comp in (step.source, step.target):
+            nodes.setdefault(comp.id, (comp.id, _component_label(comp), comp.color))
+    edges = [(step.source.id, step.target.id, f"{step.step}. {step.label}", step.color) for step in steps]
+    # The bundled sequences are laid out like the Numbered Flows page
+    layout_source = create_numbered_flow_diagram(name).source if name in SEQUENCE_PAGE_NAMES else None
+    return list(nodes.values()), edges, layout_source
+
+
+def _query_page(name: str) -> tuple:
+    """Nodes, edges and layout source of a sample query path page (laid out like the simulator's flow diagram)"""
+    model = get_architecture_model()
+    query = model.sample_queries[name]
+    path = model.path_components(query.path)
+    split_point = flow_split_point(path, query.parallel)
+    nodes = [(f"{comp.id}_step{i}", _component_label(comp), comp.color) for i, comp in enumerate(path)]
+    edges = []
+    # Parallel branches fan out from their fork and back into their join
+    for i, j, protocol, is_request in flow_edges(path, split_point, query.parallel):
+        label = f"{j}. {protocol}" if protocol else str(j)
+        color = '#3B82F6' if is_request else '#10B981'
+        edges.append((nodes[i][0], nodes[j][0], label, color))
+    return nodes, edges, create_flow_diagram(path, split_point, query.parallel).source
+
+
+def _airport_page() -> tuple:
+    """Nodes, edges and layout source of the airport transfer journey page"""
+    steps = AIRPORT_TRANSFER_FLOW['steps']
+    nodes = [
+        (f"step_{step['id']}", airport_step_label(step).replace('\\n', '<br>'),
+         AIRPORT_PHASE_COLORS.get(step['phase'], '#6B7280'))
+        for step in steps
+    ]
+    edges = [
+        (f"step_{step['id']}", f"step_{next_step['id']}", step['protocol'], '#6B7280')
+        for step, next_step in zip(steps, steps[1:])
+    ]
+    return nodes, edges, create_airport_transfer_diagram().source
+
+
+def _flow_positions(nodes: list, layout_source: str) -> dict:
+    """Node rectangles from the Graphviz layout of the page's on-screen view, or a grid without Graphviz"""
+    layout = get_layout(layout_source) if layout_source else None
+    if layout is not None and all(node_id in layout.nodes for node_id, _, _ in nodes):
+        return {
+            node_id: (x + GRAPHVIZ_MARGIN, y + GRAPHVIZ_MARGIN, width, height)
+            for node_id, (x, y, width, height) in layout.nodes.items()
+        }
+    positions = {}
+    for i, (node_id, _, _) in enumerate(nodes):
+        row, col = divmod(i, FLOW_NODES_PER_ROW)
+        positions[node_id] = (
+            GRAPHVIZ_MARGIN + col * (FLOW_NODE_WIDTH + FLOW_SPACING_X),
+            GRAPHVIZ_MARGIN + row * (FLOW_NODE_HEIGHT + FLOW_SPACING_Y),
+            FLOW_NODE_WIDTH,
+            FLOW_NODE_HEIGHT
+        )
+    return positions
+
+
+def write_flow_model(writer: XmlWriter, nodes: list, edges: list, layout_source: str = None):
+    """
+    Write the mxGraphModel element of a flow page
+
+    Args:
+        writer: Writer positioned inside a diagram element
+        nodes: (node id, label, fill color) tuples
+        edges: (source node id, target node id, label, color) tuples
+        layout_source: DOT source of the matching on-screen diagram whose
+            Graphviz layout places the nodes (grid placement when None)
+    """
+    positions = _flow_positions(nodes, layout_source)
+    start_graph_model(writer)
+
+    for node_id, label, fill in nodes:
+        x, y, width, height = positions[node_id]
+        writer.start('mxCell', {
+            'id': f'node_{node_id}',
+            'value': label,
+            'style': (
+                f'rounded=1;whiteSpace=wrap;html=1;'
+                f'fillColor={fill};'
+                f'strokeColor=#666666;'
+                f'fontColor=#FFFFFF;'
+                f'fontSize=11;'
+                f'fontStyle=1;'
+            ),
+            'vertex': '1',
+            'parent': '1'
+        })
+        writer.element('mxGeometry', {
+            'x': format_coordinate(x),
+            'y': format_coordinate(y),
+            'width': format_coordinate(width),
+            'height': format_coordinate(height),
+            'as': 'geometry'
+        })
+        writer.end()
+
+    for i, (source, target, label, color) in enumerate(edges):
+        writer.start('mxCell', {
+            'id': f'edge_{i}',
+            'value': label,
+            'style': (
+                'edgeStyle=orthogonalEdgeStyle;'
+                'rounded=1;'
+                'orthogonalLoop=1;'
+                'jettySize=auto;'
+                'html=1;'
+                f'strokeColor={color};'
+                'strokeWidth=2;'
+                'fontSize=9;'
+                f'fontColor={color};'
+                'endArrow=classic;'
+            ),
+            'edge': '1',
+            'parent': '1',
+            'source': f'node_{source}',
+            'target': f'node_{target}'
+        })
+        writer.element('mxGeometry', {'relative': '1', 'as': 'geometry'})
+        writer.end()
+
+    # Close root and mxGraphModel
+    writer.end()
+    writer.end()
+
+
+def _write_page_model(writer: XmlWriter, kind: str, key: str):
+    if kind == "architecture":
+        write_architecture_model(writer, get_architecture_graph().layer_names, "TB")
+    elif kind == "sequence":
+        write_flow_model(writer, *_sequence_page(key))
+    elif kind == "query":
+        write_flow_model(writer, *_query_page(key))
+    elif kind == "airport":
+        write_flow_model(writer, *_airport_page())
+    else:
+        raise ValueError(f"Unknown draw.io page kind: {kind}")
+
+
+def build_page(kind: str, key: str, name: str, page_id: str, compressed: bool = False, indent: str = "  ") -> str:
+    """
+    Serialize one page as a diagram element (runs in the worker processes)
+
+    Args:
+        kind: "architecture", "sequence", "query" or "airport"
+        key: Sequence or sample query name (None for the other kinds)
+        name: Page name shown on the draw.io tab
+        page_id: Page id
+        compressed: Store the page in draw.io's compressed format
+        indent: Indentation per nesting level, or None for compact output
+
+    Returns:
+        Diagram element markup, indented one level for splicing into mxfile
+    """
+    buffer = io.StringIO()
+    writer = XmlWriter(buffer, indent, level=1)
+    write_diagram(writer, page_id, name, lambda model_writer: _write_page_model(model_writer, kind, key), compressed)
+    return buffer.getvalue()
+
+
+def create_multipage_drawio_xml(pages: list = None, compressed: bool = False, indent: str = "  ",
+                                max_workers: int = EXPORT_WORKERS) -> str:
+    """
+    Create a draw.io file with one page per view
+
+    Pages (each needing a Graphviz layout) are built concurrently in a
+    process pool and spliced into the file in page order.
+
+    Args:
+        pages: (kind, key, page name) tuples (defaults to drawio_pages())
+        compressed: Store pages in draw.io's compressed format
+        indent: Indentation per nesting level, or None for compact output
+        max_workers: Maximum number of worker processes (1, or Graphviz not
+            being installed, builds the pages in this process)
+
+    Returns:
+        XML string in draw.io format
+    """
+    pages = drawio_pages() if pages is None else pages
+    jobs = [(kind, key, name, f"page-{i}", compressed, indent) for i, (kind, key, name) in enumerate(pages)]
+
+    # Without Graphviz a page is pure serialization, cheaper than starting workers
+    if max_workers <= 1 or len(jobs) <= 1 or not dot_available():
+        fragments = [build_page(*job) for job in jobs]
+    else:
+        # Spawned workers do not inherit the parent's threads (e.g. the Streamlit server)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=context) as pool:
+            fragments = list(pool.map(build_page, *zip(*jobs)))
+
+    buffer = io.StringIO()
+    writer = XmlWriter(buffer, indent)
+    start_mxfile(writer, compressed)
+    for fragment in fragments:
+        writer.raw(fragment)
+    writer.close()
+    return buffer.getvalue()
+
+
+def export_all_to_drawio(compressed: bool = False, max_workers: int = EXPORT_WORKERS) -> bytes:
+    """
+    Export every view to one multi-page draw.io file
+
+    Args:
+        compressed: Store pages in draw.io's compressed format
+        max_workers: Maximum number of worker processes
+
+    Returns:
+        Bytes content of the draw.io file
+    """
+    return create_multipage_drawio_xml(compressed=compressed, max_workers=max_workers).encode('utf-8')
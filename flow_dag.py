@@ -0,0 +1,109 @@
+"""
+Flow DAG
+Execution graph of a request path with parallel fork/join branches, and its critical path
+"""
+
+from architecture_data import COMPONENT_LATENCY_MS
+from architecture_model import get_architecture_model
+from latency_analysis import DEFAULT_HOP_LATENCY_MS
+
+
+class FlowDAG:
+    """
+    Execution DAG of a request path
+
+    The positions of the flat path are the nodes. Consecutive positions are
+    connected, except around a fork: the fork position connects to the first
+    position of every branch, and the last position of every branch
+    connects to the join position. Iterating a FlowDAG yields the flat
+    path's component ids, so it can stand in for a plain path.
+    """
+
+    __slots__ = ('comp_ids', 'forks', 'edges', 'predecessors')
+
+    def __init__(self, path: list, forks: tuple = ()):
+        """
+        Args:
+            path: Component ids, indices or records of the flat path
+            forks: ForkRecords of the path (e.g. QueryRecord.parallel)
+        """
+        self.comp_ids = get_architecture_model().path_ids(path)
+        self.forks = tuple(forks)
+        self.predecessors = [[i - 1] if i else [] for i in range(len(self.comp_ids))]
+        for fork in self.forks:
+            for start, end in fork.branches:
+                self.predecessors[start] = [fork.fork]
+            self.predecessors[fork.join] = [end - 1 for _, end in fork.branches]
+        self.edges = [(source, target) for target, sources in enumerate(self.predecessors) for source in sources]
+
+    def __iter__(self):
+        return iter(self.comp_ids)
+
+    def __len__(self):
+        return len(self.comp_ids)
+
+    def segments(self) -> list:
+        """
+        The path as a series-parallel plan
+
+        Returns:
+            List whose items are either a position or, for a fork, a list of
+            branches (each a list of positions) run between the fork and join
+            positions
+        """
+        plan = []
+        position = 0
+        for fork in self.forks:
+            plan.extend(range(position, fork.fork + 1))
+            plan.append([list(range(start, end)) for start, end in fork.branches])
+            position = fork.join
+        plan.extend(range(position, len(self.comp_ids)))
+        return plan
+
+    def critical_path(self, component_latency: dict = None) -> dict:
+        """
+        Longest path through the DAG
+
+        Each position costs the latency of its component (the hop into it);
+        the first position is where the request starts and costs nothing.
+
+        Args:
+            component_latency: Per-component latency table (defaults to COMPONENT_LATENCY_MS)
+
+        Returns:
+            Dictionary with total_ms (critical path), sequential_ms (every
+            position back to back), parallel_savings_ms, critical_path
+            (positions in order) and finish_ms (completion time per position)
+        """
+        table = COMPONENT_LATENCY_MS if component_latency is None else component_latency
+        cost = [0.0] + [float(table.get(comp_id, DEFAULT_HOP_LATENCY_MS)) for comp_id in self.comp_ids[1:]]
+        finish = []
+        slowest = []
+        # Positions are already in topological order: every edge points forward
+        for i, sources in enumerate(self.predecessors):
+            previous = max(sources, key=lambda source: finish[source]) if sources else None
+            finish.append(cost[i] + (finish[previous] if previous is not None else 0.0))
+            slowest.append(previous)
+
+        path = []
+        position = len(finish) - 1 if finish else None
+        while position is not None:
+            path.append(position)
+            position = slowest[position]
+        path.reverse()
+
+        total = finish[-1] if finish else 0.0
+        sequential = sum(cost)
+        return {
+            "total_ms": total,
+            "sequential_ms": sequential,
+            "parallel_savings_ms": sequential - total,
+            "critical_path": path,
+            "finish_ms": finish,
+        }
+
+
+def query_dag(name: str) -> FlowDAG:
+    """Execution DAG of a sample query"""
+    query = get_architecture_model().sample_queries[name]
+    return FlowDAG(query.path, query.parallel)
\ No newline at end of file
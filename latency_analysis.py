@@ -0,0 +1,136 @@
+"""
+Latency Analysis Engine
+Computes end-to-end latency, the critical path and per-component share for numbered flows
+"""
+
+import re
+from architecture_data import COMPONENT_LATENCY_MS
+
+# Latency assumed for a hop into a component missing from COMPONENT_LATENCY_MS
+DEFAULT_HOP_LATENCY_MS = 10
+
+_LATENCY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*ms')
+
+
+def hop_latency_ms(step: dict, component_latency: dict = None) -> float:
+    """
+    Get the latency of a single hop
+
+    Explicit per-step values win over the component table: a numeric
+    "latency_ms" or a string "latency" such as "5ms".
+
+    Args:
+        step: Flow step with "from"/"to" and optional latency fields
+        component_latency: Per-component latency table (defaults to COMPONENT_LATENCY_MS)
+
+    Returns:
+        Hop latency in milliseconds
+    """
+    if 'latency_ms' in step:
+        return float(step['latency_ms'])
+    if isinstance(step.get('latency'), str):
+        match = _LATENCY_PATTERN.search(step['latency'])
+        if match:
+            return float(match.group(1))
+    table = COMPONENT_LATENCY_MS if component_latency is None else component_latency
+    return float(table.get(step['to'], DEFAULT_HOP_LATENCY_MS))
+
+
+def is_async_step(step: dict) -> bool:
+    """Async steps (fire-and-forget events) run off the critical path"""
+    return bool(step.get('async')) or '(async)' in step.get('label', '')
+
+
+def group_steps(steps: list) -> list:
+    """
+    Group flow steps into sequential stages
+
+    Steps sharing the same "step" value are a fan-out and run in parallel.
+    Stages keep the order in which their step number first appears.
+
+    Args:
+        steps: Numbered flow steps
+
+    Returns:
+        List of lists of steps, one inner list per stage
+    """
+    stages = {}
+    for step in steps:
+        stages.setdefault(step.get('step'), []).append(step)
+    return list(stages.values())
+
+
+def analyze_flow(steps: list, component_latency: dict = None) -> dict:
+    """
+    Compute latency metrics for a numbered flow
+
+    Each stage takes as long as its slowest synchronous hop; async hops start
+    with their stage but never delay it. The critical path is the slowest hop
+    of every stage, and each component's share is the time spent on hops into
+    that component along the critical path.
+
+    Args:
+        steps: Numbered flow steps (e.g. RAG_FLOW, MCP_FLOW)
+        component_latency: Optional per-component latency table override
+
+    Returns:
+        Dictionary with total_ms, critical_path, component_share,
+        sequential_ms, fanout_savings_ms, async_hops and async_tail_ms
+    """
+    elapsed = 0.0
+    sequential = 0.0
+    async_tail = 0.0
+    async_hops = 0
+    critical_path = []
+    component_ms = {}
+
+    for stage in group_steps(steps):
+        slowest = None
+        slowest_ms = 0.0
+        for step in stage:
+            latency = hop_latency_ms(step, component_latency)
+            if is_async_step(step):
+                async_hops += 1
+                async_tail = max(async_tail, elapsed + latency)
+                continue
+            sequential += latency
+            if slowest is None or latency > slowest_ms:
+                slowest, slowest_ms = step, latency
+
+        if slowest is None:
+            continue
+
+        critical_path.append({
+            "step": slowest.get('step'),
+            "from": slowest['from'],
+            "to": slowest['to'],
+            "label": slowest.get('label', ''),
+            "start_ms": elapsed,
+            "latency_ms": slowest_ms,
+            "parallel_hops": len(stage),
+        })
+        component_ms[slowest['to']] = component_ms.get(slowest['to'], 0.0) + slowest_ms
+        elapsed += slowest_ms
+
+    component_share = {
+        comp_id: {
+            "latency_ms": ms,
+            "share": (ms / elapsed) if elapsed else 0.0,
+        }
+        for comp_id, ms in sorted(component_ms.items(), key=lambda x: x[1], reverse=True)
+    }
+
+    return {
+        "total_ms": elapsed,
+        "critical_path": critical_path,
+        "component_share": component_share,
+        "sequential_ms": sequential,
+        "fanout_savings_ms": sequential - elapsed,
+        "async_hops": async_hops,
+        "async_tail_ms": max(0.0, async_tail - elapsed),
+    }
+
+
+def format_latency(latency_ms: float) -> str:
+    """Format a computed latency the way the summary cards display it"""
+    return f"~{round(latency_ms)}ms"
@@ -0,0 +1,81 @@
+"""
+Latency Distribution Display
+Interactive Monte Carlo latency CDFs and tail percentiles shared by the Numbered Flows and comparison pages
+"""
+
+import streamlit as st
+from architecture_data import COMPONENT_LATENCY_MS
+from architecture_graph import get_architecture_graph
+from latency_analysis import format_latency
+from latency_distribution import DEFAULT_SIGMA, FLOW_SEQUENCES, estimate_latency_distributions
+from model_watcher import cached_derived, query_key, sequence_dependencies
+
+# Simulated requests per flow offered by the panel
+SAMPLE_OPTIONS = (100_000, 250_000, 1_000_000)
+
+# Simulated requests per flow when the panel opens
+DEFAULT_PANEL_SAMPLES = 250_000
+
+
+def distribution_dependencies(graph, names: list) -> frozenset:
+    """Dependency keys of the distributions of numbered flows and sample queries (latency edits arrive as component ids)"""
+    depends_on = set(sequence_dependencies(graph, [FLOW_SEQUENCES[name] for name in names if name in FLOW_SEQUENCES]))
+    for name in names:
+        if name in graph.model.sample_queries:
+            depends_on.add(query_key(name))
+            depends_on.update(graph.model.path_ids(graph.model.sample_queries[name].path))
+    return frozenset(depends_on)
+
+
+def show_latency_distribution(names: list, key: str):
+    """
+    Display latency CDFs and p50/p95/p99 of flows, with sliders recomputing them
+
+    Args:
+        names: Numbered flow (e.g. "RAG_FLOW") or sample query names to compare
+        key: Widget key prefix, unique per page
+    """
+    graph = get_architecture_graph()
+    what_if_options = ["None"] + [comp.id for comp in graph.components.values() if COMPONENT_LATENCY_MS.get(comp.id)]
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sigma = st.slider(
+            "Hop latency variability (σ)", min_value=0.0, max_value=1.5, value=DEFAULT_SIGMA, step=0.05,
+            key=f"{key}_sigma", help="Spread of every hop's lognormal latency; 0 gives the fixed model latencies"
+        )
+    with col2:
+        what_if = st.selectbox(
+            "What-if component", what_if_options, key=f"{key}_component",
+            format_func=lambda comp_id: comp_id if comp_id == "None" else
+            f"{graph.component(comp_id).icon} {graph.component(comp_id).name}"
+        )
+        scale = st.slider(
+            "Latency multiplier", min_value=0.25, max_value=4.0, value=1.0, step=0.25,
+            key=f"{key}_scale", disabled=what_if == "None"
+        )
+    with col3:
+        samples = st.select_slider(
+            "Simulated requests per flow", options=SAMPLE_OPTIONS, value=DEFAULT_PANEL_SAMPLES,
+            key=f"{key}_samples", format_func=lambda count: f"{count:,}"
+        )
+
+    latency_scale = {what_if: scale} if what_if != "None" and scale != 1.0 else {}
+    result = cached_derived(
+        ("latency_distribution", tuple(names), samples, sigma, tuple(latency_scale.items())),
+        distribution_dependencies(graph, names),
+        lambda: estimate_latency_distributions(names, samples, sigma, latency_scale)
+    )
+
+    st.line_chart(result['cdf'], x="Latency (ms)")
+    st.caption("Share of requests completing within each latency")
+    st.table([
+        {
+            "Flow": name,
+            "Mean": format_latency(summary['mean']),
+            "p50": format_latency(summary['p50']),
+            "p95": format_latency(summary['p95']),
+            "p99": format_latency(summary['p99'])
+        }
+        for name, summary in result['summary'].items()
+    ])
@@ -0,0 +1,234 @@
+"""
+Latency Distribution Estimator
+Vectorized Monte Carlo estimate of end-to-end latency distributions for numbered flows and sample query paths
+"""
+
+import numpy as np
+from architecture_data import COMPONENT_LATENCY_MS
+from architecture_model import get_architecture_model
+from flow_dag import FlowDAG
+from latency_analysis import DEFAULT_HOP_LATENCY_MS, group_steps, hop_latency_ms, is_async_step
+
+# Numbered flows offered by the estimator and the model sequence each is read from
+FLOW_SEQUENCES = {"RAG_FLOW": "rag", "MCP_FLOW": "mcp", "OPENAPI_MCP_FLOW": "mcp_openapi"}
+
+# Simulated requests per distribution by default
+DEFAULT_SAMPLES = 1_000_000
+
+# Requests drawn per block (bounds memory to CHUNK_ROWS x hops values)
+CHUNK_ROWS = 1 << 17
+
+# Spread of the lognormal hop latencies (sigma of the underlying normal)
+DEFAULT_SIGMA = 0.4
+
+# Resolution of the CDF curves
+CDF_POINTS = 200
+
+# The CDF grid ends at this percentile of the slowest distribution
+CDF_UPPER_PERCENTILE = 99.9
+
+# Latency percentiles reported
+PERCENTILES = (50, 95, 99)
+
+
+def flow_stages(steps: list, component_latency: dict = None) -> list:
+    """
+    Sequential stages of a numbered flow as hop lists
+
+    Steps sharing a step number run in parallel (the stage lasts as long as
+    its slowest hop); async hops are left out, as in analyze_flow().
+
+    Args:
+        steps: Numbered flow steps (e.g. RAG_FLOW)
+        component_latency: Per-component mean latency table (defaults to COMPONENT_LATENCY_MS)
+
+    Returns:
+        List of stages, each a list of (target component id, mean latency in ms)
+    """
+    stages = []
+    for stage in group_steps(steps):
+        hops = [(step['to'], hop_latency_ms(step, component_latency)) for step in stage if not is_async_step(step)]
+        if hops:
+            stages.append(hops)
+    return stages
+
+
+def path_stages(path: list, component_latency: dict = None, forks: tuple = ()) -> list:
+    """
+    Sequential stages of a component path (each hop costs its target's latency)
+
+    Args:
+        path: Component ids, indices or records of a sample query path
+        component_latency: Per-component mean latency table (defaults to COMPONENT_LATENCY_MS)
+        forks: ForkRecords of the path (e.g. QueryRecord.parallel)
+
+    Returns:
+        List of stages: one (target component id, mean latency in ms) per
+        hop, and for every fork one stage of its branches, each a list of
+        hops run one after another
+    """
+    table = COMPONENT_LATENCY_MS if component_latency is None else component_latency
+    dag = FlowDAG(path, forks)
+
+    def hop(position):
+        comp_id = dag.comp_ids[position]
+        return comp_id, float(table.get(comp_id, DEFAULT_HOP_LATENCY_MS))
+
+    stages = []
+    for segment in dag.segments():
+        if isinstance(segment, list):
+            stages.append([[hop(position) for position in branch] for branch in segment])
+        elif segment:
+            stages.append([hop(segment)])
+    return stages
+
+
+def estimator_stages(component_latency: dict = None) -> dict:
+    """Stages of every numbered flow the model defines and every sample query path, keyed by display name"""
+    model = get_architecture_model()
+    stages = {
+        name: flow_stages(model.sequence_steps(sequence), component_latency)
+        for name, sequence in FLOW_SEQUENCES.items() if sequence in model.sequences
+    }
+    for name, query in model.sample_queries.items():
+        stages[name] = path_stages(query.path, component_latency, query.parallel)
+    return stages
+
+
+def simulate_latencies(stages: list, samples: int = DEFAULT_SAMPLES, sigma: float = DEFAULT_SIGMA,
+                       empirical: dict = None, seed: int = 0) -> np.ndarray:
+    """
+    Draw end-to-end latencies of many requests at once
+
+    Every hop latency is lognormal with the hop's mean latency, or drawn
+    from observed samples of its target component. Each block of requests
+    is one matrix of hop latencies: multi-hop branches are summed, parallel
+    branches reduced with a maximum and the stages summed, with no
+    per-request Python loop. Requests come in
+    antithetic pairs (mirrored normal draws), so every request's latency has
+    the modeled distribution while half the random numbers are drawn.
+
+    Args:
+        stages: Stages from flow_stages() or path_stages()
+        samples: Number of simulated requests
+        sigma: Spread of the lognormal hop latencies (0 for fixed latencies)
+        empirical: Observed latencies in ms per component id, used instead
+            of the lognormal for hops into those components
+        seed: Random seed
+
+    Returns:
+        float32 array of end-to-end latencies in ms, one per request
+    """
+    rng = np.random.default_rng(seed)
+    empirical = {comp_id: np.asarray(values, dtype=np.float32) for comp_id, values in (empirical or {}).items()}
+
+    # Every stage as parallel branches of sequential hops (a plain hop is a one-hop branch);
+    # zero-latency lognormal hops never add time, and branches or stages left empty drop out
+    stages = [
+        [
+            [(comp_id, mean) for comp_id, mean in (branch if isinstance(branch, list) else [branch])
+             if mean > 0 or comp_id in empirical]
+            for branch in stage
+        ]
+        for stage in stages
+    ]
+    stages = [[branch for branch in stage if branch] for stage in stages]
+    stages = [stage for stage in stages if stage]
+    branches = [branch for stage in stages for branch in stage]
+    hops = [hop for branch in branches for hop in branch]
+    totals = np.zeros(samples, dtype=np.float32)
+    if not hops:
+        return totals
+
+    # mu chosen so every hop's mean stays its configured latency (empirical columns are overwritten)
+    means = np.array([mean for _, mean in hops], dtype=np.float32)
+    mu = np.log(np.maximum(means, 1e-9)) - np.float32(sigma ** 2 / 2)
+    empirical_columns = [(i, empirical[comp_id]) for i, (comp_id, _) in enumerate(hops) if comp_id in empirical]
+    branch_starts = np.cumsum([0] + [len(branch) for branch in branches[:-1]])
+    stage_starts = np.cumsum([0] + [len(stage) for stage in stages[:-1]])
+    sequential_branches = len(branches) < len(hops)
+    parallel = len(stages) < len(branches)
+
+    block = np.empty((CHUNK_ROWS, len(hops)), dtype=np.float32)
+    for start in range(0, samples, CHUNK_ROWS):
+        rows = min(CHUNK_ROWS, samples - start)
+        half = (rows + 1) // 2
+        view = block[:rows]
+        # Antithetic pairs: the second half reuses the first half's normals negated,
+        # halving the draws (the dominant cost) and reducing the estimate's variance
+        rng.standard_normal(out=view[:half], dtype=np.float32)
+        np.negative(view[:rows - half], out=view[half:])
+        view *= np.float32(sigma)
+        view += mu
+        np.exp(view, out=view)
+        for i, values in empirical_columns:
+            view[:, i] = rng.choice(values, size=rows)
+        branch_totals = np.add.reduceat(view, branch_starts, axis=1) if sequential_branches else view
+        stage_totals = np.maximum.reduceat(branch_totals, stage_starts, axis=1) if parallel else branch_totals
+        stage_totals.sum(axis=1, out=totals[start:start + rows])
+    return totals
+
+
+def latency_percentiles(latencies: np.ndarray) -> dict:
+    """Mean and the PERCENTILES ("p50", ...) of simulated latencies in ms"""
+    values = np.percentile(latencies, PERCENTILES)
+    summary = {"mean": float(latencies.mean())}
+    for q, value in zip(PERCENTILES, values):
+        summary[f"p{q}"] = float(value)
+    return summary
+
+
+def latency_cdfs(distributions: dict, points: int = CDF_POINTS) -> dict:
+    """
+    Cumulative distribution curves of several latency distributions on a shared axis
+
+    Each curve is a cumulative histogram, so no distribution is sorted.
+
+    Args:
+        distributions: Simulated latencies keyed by name
+        points: Number of points per curve
+
+    Returns:
+        Chart data: "Latency (ms)" grid values plus the fraction of requests
+        at or below each grid value, keyed by name
+    """
+    upper = max(float(np.percentile(values, CDF_UPPER_PERCENTILE)) for values in distributions.values())
+    edges = np.linspace(0.0, upper, points)
+    chart = {"Latency (ms)": edges.tolist()}
+    bins = np.concatenate(([-np.inf], edges))
+    for name, values in distributions.items():
+        # Bin i counts the requests between grid values i-1 and i, so the running total is the CDF
+        counts, _ = np.histogram(values, bins=bins)
+        chart[name] = (np.cumsum(counts) / len(values)).tolist()
+    return chart
+
+
+def estimate_latency_distributions(names: list = None, samples: int = DEFAULT_SAMPLES, sigma: float = DEFAULT_SIGMA,
+                                   latency_scale: dict = None, empirical: dict = None, seed: int = 0) -> dict:
+    """
+    Monte Carlo latency distributions of numbered flows and sample query paths
+
+    Args:
+        names: Flow or sample query names (defaults to every numbered flow in the model)
+        samples: Simulated requests per distribution
+        sigma: Spread of the lognormal hop latencies
+        latency_scale: Mean latency multipliers per component id (what-if changes)
+        empirical: Observed latencies in ms per component id
+        seed: Random seed
+
+    Returns:
+        Dictionary with "summary" (latency_percentiles() per name) and "cdf" (latency_cdfs() chart data)
+    """
+    table = dict(COMPONENT_LATENCY_MS)
+    for comp_id, scale in (latency_scale or {}).items():
+        table[comp_id] = table.get(comp_id, DEFAULT_HOP_LATENCY_MS) * scale
+    stages = estimator_stages(table)
+    names = [name for name in FLOW_SEQUENCES if name in stages] if names is None else names
+    distributions = {
+        name: simulate_latencies(stages[name], samples, sigma, empirical, seed + i)
+        for i, name in enumerate(names)
+    }
+    return {
+        "summary": {name: latency_percentiles(values) for name, values in distributions.items()},
+        "cdf": latency_cdfs(distributions),
+    }
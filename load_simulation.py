@@ -0,0 +1,472 @@
+"""
+Load Simulation Engine
+Discrete-event simulation of request streams through sample query paths with replica-aware queueing
+"""
+
+import heapq
+import math
+import random
+import time
+from collections import deque
+from architecture_data import COMPONENT_LATENCY_MS
+from architecture_model import get_architecture_model
+from flow_dag import FlowDAG, query_dag
+from latency_analysis import DEFAULT_HOP_LATENCY_MS
+
+# Service time distributions: exponential (M/M/c-like), lognormal (heavier tail) or deterministic
+SERVICE_DISTRIBUTIONS = ("exponential", "lognormal", "deterministic")
+
+# Shape of the lognormal service time distribution (the mean stays the component latency)
+LOGNORMAL_SIGMA = 0.5
+
+# Requests one replica serves at a time
+SLOTS_PER_REPLICA = 1
+
+# Share of the simulated time discarded as warm-up before measuring
+DEFAULT_WARMUP_SHARE = 0.1
+
+# Latency percentiles reported
+PERCENTILES = (50, 95, 99)
+
+# Event kinds of the simulation loop
+_ARRIVAL, _SERVED, _TIMED_OUT, _RETRY = range(4)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """
+    Percentile of sorted values with linear interpolation
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def latency_summary(latencies: list) -> dict:
+    """Count, mean, max and the PERCENTILES ("p50", ...) of latencies in milliseconds"""
+    values = sorted(latencies)
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "max": values[-1] if values else 0.0,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}"] = percentile(values, q)
+    return summary
+
+
+def sample_query_paths() -> dict:
+    """Execution DAGs of every sample query (iterating their component ids), keyed by query name"""
+    return {name: query_dag(name) for name in get_architecture_model().sample_queries}
+
+
+def _service_sampler(distribution: str, rng: random.Random):
+    """Function drawing a service time from its mean"""
+    if distribution == "exponential":
+        return lambda mean: rng.expovariate(1 / mean)
+    if distribution == "lognormal":
+        # mu chosen so the distribution's mean equals the component latency
+        offset = LOGNORMAL_SIGMA ** 2 / 2
+        return lambda mean: rng.lognormvariate(math.log(mean) - offset, LOGNORMAL_SIGMA)
+    if distribution == "deterministic":
+        return lambda mean: mean
+    raise ValueError(f"Unknown service time distribution: {distribution}")
+
+
+class _Station:
+    """A component as a multi-server FIFO queue (unbounded servers when servers is None)"""
+
+    __slots__ = (
+        'comp_id', 'servers', 'mean_ms', 'failure_rate', 'timeout_ms', 'busy', 'queue', 'busy_ms', 'wait_ms', 'waits',
+        'max_queue', 'attempts', 'retries', 'failures', 'timeouts'
+    )
+
+    def __init__(self, comp_id: str, servers: int, mean_ms: float, failure_rate: float = 0.0, timeout_ms: float = None):
+        self.comp_id = comp_id
+        self.servers = servers
+        self.mean_ms = mean_ms
+        self.failure_rate = failure_rate
+        self.timeout_ms = timeout_ms
+        self.busy = 0
+        self.queue = deque()
+        self.busy_ms = 0.0
+        self.wait_ms = 0.0
+        self.waits = 0
+        self.max_queue = 0
+        # Measured attempts (first tries and retries), retries, failed and timed-out attempts
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.timeouts = 0
+
+
+class _Request:
+    """A request (or one parallel branch of it) walking its hops"""
+
+    __slots__ = ('path', 'query', 'arrival_ms', 'hop', 'parent', 'pending', 'failed')
+
+    def __init__(self, path: list, query: str, arrival_ms: float, parent: '_Request' = None):
+        self.path = path
+        self.query = query
+        self.arrival_ms = arrival_ms
+        self.hop = 0
+        # Branches report back to the request that forked them
+        self.parent = parent
+        self.pending = 0
+        self.failed = False
+
+    def root(self) -> '_Request':
+        request = self
+        while request.parent is not None:
+            request = request.parent
+        return request
+
+
+def _hop_plan(dag: FlowDAG, stations: dict, retries: dict) -> list:
+    """
+    Hops of a request through an execution DAG
+
+    Every hop is a (station, retry policy) tuple; a fork is a list of
+    branches, each a list of hops, all run before the path continues.
+    Zero-latency hops (the customer) take no time and never queue; each hop
+    keeps its caller (the component before it in the DAG) for retry lookups.
+    """
+    def hop(position):
+        comp_id = dag.comp_ids[position]
+        if stations[comp_id].mean_ms <= 0:
+            return []
+        sources = dag.predecessors[position]
+        caller = dag.comp_ids[sources[0]] if sources else "*"
+        return [(stations[comp_id], retry_policy(retries, caller, comp_id))]
+
+    plan = []
+    for segment in dag.segments():
+        if isinstance(segment, list):
+            plan.append([[step for position in branch for step in hop(position)] for branch in segment])
+        else:
+            plan.extend(hop(segment))
+    return plan
+
+
+def _plan_stations(plan: list):
+    """Stations visited by a hop plan, in order, parallel branches included"""
+    for step in plan:
+        if isinstance(step, list):
+            for branch in step:
+                yield from _plan_stations(branch)
+        else:
+            yield step[0]
+
+
+class _Attempt:
+    """One try of a request's current hop (a retry is a new attempt at the same station)"""
+
+    __slots__ = ('request', 'station', 'number', 'queued_ms', 'settled')
+
+    def __init__(self, request: _Request, station: _Station, number: int, queued_ms: float):
+        self.request = request
+        self.station = station
+        self.number = number
+        self.queued_ms = queued_ms
+        # Set once the caller has its answer: served, failed or timed out
+        self.settled = False
+
+
+class RetryPolicy:
+    """Retries of a failed or timed-out call with capped exponential backoff"""
+
+    __slots__ = ('max_attempts', 'backoff_ms', 'multiplier', 'max_backoff_ms', 'jitter')
+
+    def __init__(self, max_attempts: int = 3, backoff_ms: float = 100, multiplier: float = 2.0,
+                 max_backoff_ms: float = 5000, jitter: bool = True):
+        """
+        Args:
+            max_attempts: Attempts per call including the first (1 disables retries)
+            backoff_ms: Delay before the first retry
+            multiplier: Growth of the delay per retry
+            max_backoff_ms: Upper bound of the delay
+            jitter: Draw each delay uniformly between 0 and its bound ("full jitter")
+        """
+        self.max_attempts = max_attempts
+        self.backoff_ms = backoff_ms
+        self.multiplier = multiplier
+        self.max_backoff_ms = max_backoff_ms
+        self.jitter = jitter
+
+    def delay_ms(self, attempt: int, rng: random.Random) -> float:
+        """Delay before retrying after the given failed attempt (1 for the first)"""
+        bound = min(self.max_backoff_ms, self.backoff_ms * self.multiplier ** (attempt - 1))
+        return rng.uniform(0, bound) if self.jitter else bound
+
+
+def retry_policy(retries: dict, caller: str, callee: str) -> RetryPolicy:
+    """
+    Retry policy of a call edge
+
+    Args:
+        retries: Policies keyed by (caller id, callee id); either id may be "*"
+        caller: Calling component id
+        callee: Called component id
+
+    Returns:
+        The most specific matching RetryPolicy, or None (no retries)
+    """
+    for key in ((caller, callee), (caller, "*"), ("*", callee), ("*", "*")):
+        if key in retries:
+            return retries[key]
+    return None
+
+
+def missing_deployment_data(comp) -> bool:
+    """Whether a component has no deployment type, or is containerized without a replica count"""
+    return not comp.deployment_type or (comp.deployment_type.startswith("Container") and comp.replicas is None)
+
+
+def simulate_load(paths: dict, rps: float, duration_s: float = 60, mix: dict = None, service_ms: dict = None,
+                  replicas: dict = None, distribution: str = "exponential", slots_per_replica: int = SLOTS_PER_REPLICA,
+                  warmup_s: float = None, seed: int = 0, failure_rate: dict = None, timeout_ms: dict = None,
+                  retries: dict = None) -> dict:
+    """
+    Simulate a Poisson stream of requests through request paths
+
+    A path given as a FlowDAG runs its parallel branches concurrently: the
+    request continues past the join once every branch has finished. Every
+    visit to a component on a path queues for one of its servers
+    (replicas x slots per replica) and holds it for a service time drawn
+    around the component's latency. Components without replicas (managed
+    services, external APIs) scale outside the platform and are modeled as
+    pure delays. Requests arriving during the warm-up are simulated but not
+    measured.
+
+    A visit can fail after its service, or time out when the caller's
+    timeout expires first; the callee still finishes the abandoned work.
+    The caller then retries the hop after a backoff if the edge has a retry
+    policy, otherwise the request fails. Retries re-queue at the component,
+    so they add load exactly where the failures are.
+
+    Args:
+        paths: Component id paths or FlowDAGs keyed by name (e.g. sample_query_paths())
+        rps: Requests per second arriving in total
+        duration_s: Simulated seconds of arrivals (the last requests then drain)
+        mix: Relative weight of each path (defaults to an even mix)
+        service_ms: Mean service time overrides per component id (defaults to COMPONENT_LATENCY_MS)
+        replicas: Replica overrides per component id (None for unbounded)
+        distribution: One of SERVICE_DISTRIBUTIONS
+        slots_per_replica: Requests one replica serves at a time
+        warmup_s: Seconds excluded from the measurements (defaults to 10% of duration_s)
+        seed: Random seed (the same inputs give the same results)
+        failure_rate: Probability per component id that a visit fails
+        timeout_ms: Caller timeout per called component id
+        retries: RetryPolicy per (caller id, callee id) edge; either id may be "*"
+
+    Returns:
+        Dictionary with requests, throughput_rps (successful completions
+        inside the measurement window), success_rate, failed, latency_ms
+        (count, mean, max and percentiles of successful requests), queries
+        (latency summary per path name), components (servers, visits,
+        utilisation, offered_load, mean_wait_ms, max_queue, amplification
+        (attempts per first try), retries, failures and timeouts per
+        component id), skipped (components modeled as pure delays only
+        because the model lacks their deployment data), window_s and
+        wall_seconds
+    """
+    started = time.perf_counter()
+    if rps <= 0 or duration_s <= 0:
+        raise ValueError("rps and duration_s must be positive")
+    rng = random.Random(seed)
+    draw_service = _service_sampler(distribution, rng)
+    warmup_ms = (duration_s * DEFAULT_WARMUP_SHARE if warmup_s is None else warmup_s) * 1000
+    end_ms = duration_s * 1000
+    window_ms = max(end_ms - warmup_ms, 1e-9)
+
+    model = get_architecture_model()
+    latency = dict(COMPONENT_LATENCY_MS, **(service_ms or {}))
+    replicas = replicas or {}
+    stations = {}
+    skipped = []
+    for comp_ids in paths.values():
+        for comp_id in comp_ids:
+            if comp_id not in stations:
+                comp = model.component(comp_id)
+                count = replicas[comp_id] if comp_id in replicas else comp.replicas
+                servers = count * slots_per_replica if count else None
+                stations[comp_id] = _Station(
+                    comp_id, servers, float(latency.get(comp_id, DEFAULT_HOP_LATENCY_MS)),
+                    (failure_rate or {}).get(comp_id, 0.0), (timeout_ms or {}).get(comp_id)
+                )
+                if servers is None and stations[comp_id].mean_ms > 0 and missing_deployment_data(comp):
+                    skipped.append(comp_id)
+
+    names = list(paths)
+    weights = [float((mix or {}).get(name, 0 if mix else 1)) for name in names]
+    if not any(weights):
+        raise ValueError("The traffic mix gives every path a weight of zero")
+    station_paths = {
+        name: _hop_plan(path if isinstance(path, FlowDAG) else FlowDAG(path), stations, retries or {})
+        for name, path in paths.items()
+    }
+
+    events = []
+    sequence = 0
+    completed = 0
+    failed = 0
+    latencies = []
+    query_latencies = {name: [] for name in names}
+
+    def schedule(at_ms, kind, item):
+        nonlocal sequence
+        sequence += 1
+        heapq.heappush(events, (at_ms, sequence, kind, item))
+
+    def begin_service(now, attempt):
+        station = attempt.station
+        service = draw_service(station.mean_ms)
+        # Only the part of the service inside the measurement window counts towards utilisation
+        station.busy_ms += max(0.0, min(now + service, end_ms) - max(now, warmup_ms))
+        if now >= warmup_ms:
+            station.wait_ms += now - attempt.queued_ms
+            station.waits += 1
+        schedule(now + service, _SERVED, attempt)
+
+    def visit(now, request, number=1):
+        """Start attempt `number` of the request's current hop, fork its branches, or finish it"""
+        nonlocal completed
+        if request.hop == len(request.path):
+            parent = request.parent
+            if parent is not None:
+                # The last branch to finish resumes the forking request (unless a branch failed)
+                parent.pending -= 1
+                if not parent.pending and not parent.failed:
+                    parent.hop += 1
+                    visit(now, parent)
+                return
+            if warmup_ms <= now <= end_ms:
+                completed += 1
+            if request.arrival_ms >= warmup_ms:
+                elapsed = now - request.arrival_ms
+                latencies.append(elapsed)
+                query_latencies[request.query].append(elapsed)
+            return
+        step = request.path[request.hop]
+        if isinstance(step, list):
+            request.pending = len(step)
+            for branch in step:
+                visit(now, _Request(branch, request.query, request.arrival_ms, request))
+            return
+        station = step[0]
+        attempt = _Attempt(request, station, number, now)
+        if warmup_ms <= now <= end_ms:
+            station.attempts += 1
+        if station.timeout_ms is not None:
+            schedule(now + station.timeout_ms, _TIMED_OUT, attempt)
+        if station.servers is None or station.busy < station.servers:
+            station.busy += 1
+            begin_service(now, attempt)
+        else:
+            station.queue.append(attempt)
+            station.max_queue = max(station.max_queue, len(station.queue))
+
+    def fail(now, attempt):
+        """Retry a failed or timed-out attempt, or fail the whole request"""
+        nonlocal failed
+        request = attempt.request
+        policy = request.path[request.hop][1]
+        if policy is not None and attempt.number < policy.max_attempts:
+            if warmup_ms <= now <= end_ms:
+                attempt.station.retries += 1
+            schedule(now + policy.delay_ms(attempt.number, rng), _RETRY, (request, attempt.number + 1))
+            return
+        # A failed branch fails the whole request once; sibling branches still finish their work
+        root = request.root()
+        if root.failed:
+            return
+        while request is not None:
+            request.failed = True
+            request = request.parent
+        if root.arrival_ms >= warmup_ms:
+            failed += 1
+
+    # The first arrival; each arrival schedules the next one until the end of the run
+    schedule(rng.expovariate(rps / 1000), _ARRIVAL, None)
+    requests = 0
+    while events:
+        now, _, kind, item = heapq.heappop(events)
+        if kind == _ARRIVAL:
+            if now > end_ms:
+                continue
+            name = rng.choices(names, weights)[0]
+            requests += 1
+            visit(now, _Request(station_paths[name], name, now))
+            schedule(now + rng.expovariate(rps / 1000), _ARRIVAL, None)
+        elif kind == _SERVED:
+            # Hand the server to the next queued attempt (abandoned ones are still served)
+            station = item.station
+            if station.queue:
+                begin_service(now, station.queue.popleft())
+            else:
+                station.busy -= 1
+            if item.settled:
+                continue
+            item.settled = True
+            if station.failure_rate and rng.random() < station.failure_rate:
+                if warmup_ms <= now <= end_ms:
+                    station.failures += 1
+                fail(now, item)
+            else:
+                item.request.hop += 1
+                visit(now, item.request)
+        elif kind == _TIMED_OUT:
+            if item.settled:
+                continue
+            item.settled = True
+            if warmup_ms <= now <= end_ms:
+                item.station.timeouts += 1
+            fail(now, item)
+        else:
+            visit(now, *item)
+
+    total_weight = sum(weights)
+    visits = {comp_id: 0.0 for comp_id in stations}
+    for name, weight in zip(names, weights):
+        for station in _plan_stations(station_paths[name]):
+            visits[station.comp_id] += weight / total_weight
+
+    components = {}
+    for comp_id, station in stations.items():
+        if station.mean_ms <= 0:
+            continue
+        capacity = station.servers or math.inf
+        components[comp_id] = {
+            "servers": station.servers,
+            "visits": visits[comp_id],
+            "utilisation": station.busy_ms / (capacity * window_ms) if station.servers else None,
+            "offered_load": rps * visits[comp_id] * station.mean_ms / 1000 / capacity if station.servers else None,
+            "mean_wait_ms": station.wait_ms / station.waits if station.waits else 0.0,
+            "max_queue": station.max_queue,
+            "amplification": station.attempts / (station.attempts - station.retries) if station.attempts else 1.0,
+            "retries": station.retries,
+            "failures": station.failures,
+            "timeouts": station.timeouts,
+        }
+
+    return {
+        "requests": requests,
+        "throughput_rps": completed / (window_ms / 1000),
+        "success_rate": len(latencies) / (len(latencies) + failed) if latencies or failed else 1.0,
+        "failed": failed,
+        "latency_ms": latency_summary(latencies),
+        "queries": {name: latency_summary(values) for name, values in query_latencies.items() if values},
+        "components": components,
+        "skipped": skipped,
+        "window_s": window_ms / 1000,
+        "wall_seconds": time.perf_counter() - started,
+    }
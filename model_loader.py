@@ -0,0 +1,467 @@
+"""
+Model Loader
+Streams architecture models from external JSON, JSONL or YAML files with lazily decoded heavy fields
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+from collections.abc import Mapping
+
+# Environment variable naming an external model file to use instead of architecture_data.py
+MODEL_FILE_ENV = "ARCHITECTURE_MODEL_FILE"
+
+# Bytes read per chunk when streaming or hashing a model file
+CHUNK_SIZE = 1 << 16
+
+# Detail fields that are large and only needed when a component is opened in
+# the explorer; they are kept as raw text until first access
+HEAVY_FIELDS = frozenset(("prompts", "redis_ops", "cosmos_ops", "mongodb_ops", "database_operations"))
+
+# Top-level sections of a model file
+MODEL_SECTIONS = ("layers", "components", "flows", "sequences", "sample_queries", "enhanced_details")
+
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*(")?', re.S)
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(")?|[{}\[\]]', re.S)
+_SCALAR = re.compile(r'[^\s,:\]}]+')
+_WHITESPACE = re.compile(r'\s*')
+_MEMBER = re.compile(r'\s*(?:(\})|(,)?\s*"((?:[^"\\]|\\.)*)"\s*:\s*)', re.S)
+_DECODER = json.JSONDecoder()
+
+# Characters that can follow a complete value; anything else means a number or
+# literal may continue past the end of the buffer
+_VALUE_ENDS = frozenset(' \t\r\n,]}:')
+
+
+class _Deferred:
+    """A field value that has not been decoded yet"""
+
+    __slots__ = ('raw', 'decode')
+
+    def __init__(self, raw, decode):
+        self.raw = raw
+        self.decode = decode
+
+
+class LazyDetails(Mapping):
+    """
+    Read-only component details whose heavy fields are decoded on first access
+
+    Behaves like the plain dict the pages used before (get, [], in, items),
+    so callers do not need to know which fields are deferred.
+    """
+
+    __slots__ = ('_fields', '_decoded')
+
+    def __init__(self, fields: dict):
+        self._fields = fields
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        value = self._fields[key]
+        if isinstance(value, _Deferred):
+            if key not in self._decoded:
+                self._decoded[key] = value.decode(value.raw)
+            return self._decoded[key]
+        return value
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    @property
+    def pending(self) -> list:
+        """Names of fields that have not been decoded yet"""
+        return [
+            key for key, value in self._fields.items()
+            if isinstance(value, _Deferred) and key not in self._decoded
+        ]
+
+    def raw(self, key):
+        """Raw JSON text of a field that has not been decoded yet (None otherwise)"""
+        value = self._fields.get(key)
+        if isinstance(value, _Deferred) and key not in self._decoded and isinstance(value.raw, str):
+            return value.raw
+        return None
+
+    def signature(self) -> tuple:
+        """
+        Comparable form of the details that does not decode text fields
+
+        Deferred JSON fields contribute their raw text, so two loads of the
+        same file compare equal whether or not a field has been accessed.
+        """
+        return tuple(
+            (key, value.raw if isinstance(value, _Deferred) and isinstance(value.raw, str) else self[key])
+            for key, value in self._fields.items()
+        )
+
+    def __repr__(self):
+        return f"LazyDetails({list(self._fields)!r})"
+
+
+class _JsonStream:
+    """
+    Pull scanner over a JSON text stream
+
+    Walks objects key by key and returns each value either decoded or as raw
+    JSON text, so callers decide what to parse now and what to defer. Only one chunk (plus the
+    value currently being read) is held in memory.
+    """
+
+    def __init__(self, fp, chunk_size: int = CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self, size: int = None) -> bool:
+        """Read the next chunk, dropping consumed text; False at end of input"""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _complete(self, end: int) -> bool:
+        """Whether a value ending at end cannot continue in the next chunk"""
+        return self._buf[end] in _VALUE_ENDS if end < len(self._buf) else self._eof
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at offset {self._offset + self._pos}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"Expected {char!r}")
+        self._pos += 1
+
+    def _read_string(self) -> str:
+        """Raw text of the string token at the current position"""
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match and match.group(1):
+                self._pos = match.end()
+                return match.group(0)
+            if not self._fill():
+                raise self._error("Unterminated string")
+
+    def keys(self):
+        """
+        Iterate the keys of the object at the current position
+
+        The caller must consume each key's value (read_raw, read_value or keys)
+        before advancing the iterator.
+        """
+        self._expect('{')
+        first = True
+        while True:
+            match = _MEMBER.match(self._buf, self._pos)
+            if match is None:
+                if self._fill():
+                    continue
+                raise self._error("Expected a key or '}'")
+            if match.group(1):
+                self._pos = match.end()
+                return
+            if first == bool(match.group(2)):
+                raise self._error("Expected a key" if first else "Expected ',' or '}'")
+            first = False
+            self._pos = match.end()
+            key = match.group(3)
+            yield json.loads(f'"{key}"') if '\\' in key else key
+
+    def read_value(self):
+        """
+        Decode the value at the current position
+
+        Decoding is done by the C JSON scanner; when the value is cut by the
+        chunk boundary the buffer is grown geometrically and decoding retried.
+        A decode is only kept when a delimiter (or the end of input) follows
+        it, since a number cut after its "." or "e" still decodes.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except ValueError:
+                end = None
+            if end is not None and self._complete(end):
+                self._pos = end
+                return value
+            if not self._fill(max(self._chunk_size, len(self._buf))):
+                if end is None:
+                    raise self._error("Invalid value")
+
+    def read_raw(self) -> str:
+        """Raw JSON text of the value at the current position"""
+        char = self.peek()
+        if not char:
+            raise self._error("Expected a value")
+        if char == '"':
+            return self._read_string()
+        if char not in '{[':
+            while True:
+                match = _SCALAR.match(self._buf, self._pos)
+                if match and self._complete(match.end()):
+                    self._pos = match.end()
+                    return match.group(0)
+                if not match:
+                    raise self._error("Expected a value")
+                if not self._fill():
+                    continue
+
+        pieces = []
+        depth = 0
+        start = self._pos
+        scan = self._pos
+        while True:
+            end = None
+            for match in _TOKEN.finditer(self._buf, scan):
+                token = match.group(0)
+                if token[0] == '"':
+                    if not match.group(1):
+                        # String cut by the chunk boundary: rescan it after refilling
+                        end = match.start()
+                        break
+                elif token in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = match.end()
+                        pieces.append(self._buf[start:self._pos])
+                        return ''.join(pieces)
+            if end is None:
+                end = len(self._buf)
+            pieces.append(self._buf[start:end])
+            self._pos = end
+            if not self._fill():
+                raise self._error("Unterminated value")
+            start = scan = self._pos
+
+
+def _read_object(stream: _JsonStream, deferred: frozenset = frozenset()) -> dict:
+    """
+    Read an object, keeping deferred fields as raw text
+
+    A nested "details" object is read as LazyDetails with HEAVY_FIELDS deferred.
+    """
+    fields = {}
+    for key in stream.keys():
+        if key in deferred:
+            fields[key] = _Deferred(stream.read_raw(), json.loads)
+        elif key == 'details' and stream.peek() == '{':
+            fields[key] = LazyDetails(_read_object(stream, HEAVY_FIELDS))
+        else:
+            fields[key] = stream.read_value()
+    return fields
+
+
+def _split_details(components: dict, enhanced_details: dict):
+    """Move inline component "details" into the enhanced details section"""
+    for comp_id, component in components.items():
+        details = component.pop('details', None)
+        if details is not None and comp_id not in enhanced_details:
+            enhanced_details[comp_id] = details
+
+
+def _read_json_model(fp) -> dict:
+    """Stream a JSON model file section by section"""
+    stream = _JsonStream(fp)
+    sections = {name: {} for name in MODEL_SECTIONS}
+    sections['flows'] = []
+    for section in stream.keys():
+        if section == 'components':
+            for comp_id in stream.keys():
+                sections['components'][comp_id] = _read_object(stream)
+        elif section == 'enhanced_details':
+            for comp_id in stream.keys():
+                sections['enhanced_details'][comp_id] = LazyDetails(_read_object(stream, HEAVY_FIELDS))
+        elif section in MODEL_SECTIONS:
+            sections[section] = stream.read_value()
+        else:
+            stream.read_raw()
+    return sections
+
+
+def _read_jsonl_model(fp) -> dict:
+    """
+    Read a JSON Lines model file one record per line
+
+    Each line is an object with a "kind" of layer, component, details, flow,
+    step (with a "sequence" name) or query (with a "name").
+    """
+    sections = {name: {} for name in MODEL_SECTIONS}
+    sections['flows'] = []
+    for line_number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            record = _read_object(_JsonStream(io.StringIO(line)), HEAVY_FIELDS)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}") from e
+        kind = record.pop('kind', None)
+        if kind == 'layer':
+            sections['layers'][record.pop('id')] = record
+        elif kind == 'component':
+            sections['components'][record.pop('id')] = record
+        elif kind == 'details':
+            sections['enhanced_details'][record.pop('id')] = LazyDetails(record)
+        elif kind == 'flow':
+            sections['flows'].append(record)
+        elif kind == 'step':
+            sections['sequences'].setdefault(record.pop('sequence'), []).append(record)
+        elif kind == 'query':
+            sections['sample_queries'][record.pop('name')] = record
+        else:
+            raise ValueError(f"Line {line_number}: unknown record kind {kind!r}")
+    return sections
+
+
+def _read_yaml_model(fp) -> dict:
+    """
+    Read a YAML model file
+
+    The document is composed into a node tree once; heavy detail fields are
+    only constructed into Python objects on first access.
+    """
+    try:
+        import yaml
+    except ImportError as e:
+        raise ValueError("PyYAML is required to load YAML model files") from e
+
+    loader_class = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    root = yaml.compose(fp, Loader=loader_class)
+    construct = yaml.constructor.SafeConstructor()
+
+    def decode(node):
+        return construct.construct_document(node)
+
+    def read_details(node) -> LazyDetails:
+        fields = {}
+        for key_node, value_node in node.value:
+            if key_node.value in HEAVY_FIELDS:
+                fields[key_node.value] = _Deferred(value_node, decode)
+            else:
+                fields[key_node.value] = decode(value_node)
+        return LazyDetails(fields)
+
+    sections = {name: {} for name in MODEL_SECTIONS}
+    sections['flows'] = []
+    if root is None:
+        return sections
+    for key_node, value_node in root.value:
+        section = key_node.value
+        if section == 'components':
+            for comp_node, fields_node in value_node.value:
+                component = {}
+                for field_node, field_value in fields_node.value:
+                    if field_node.value == 'details':
+                        component['details'] = read_details(field_value)
+                    else:
+                        component[field_node.value] = decode(field_value)
+                sections['components'][comp_node.value] = component
+        elif section == 'enhanced_details':
+            for comp_node, details_node in value_node.value:
+                sections['enhanced_details'][comp_node.value] = read_details(details_node)
+        elif section in MODEL_SECTIONS:
+            sections[section] = decode(value_node)
+    return sections
+
+
+_READERS = {
+    '.json': _read_json_model,
+    '.jsonl': _read_jsonl_model,
+    '.ndjson': _read_jsonl_model,
+    '.yaml': _read_yaml_model,
+    '.yml': _read_yaml_model,
+}
+
+
+def load_model_sections(path: str) -> dict:
+    """
+    Load the sections of an external model file
+
+    Args:
+        path: Path to a .json, .jsonl/.ndjson or .yaml/.yml model file
+
+    Returns:
+        Dictionary with layers, components, flows, sequences, sample_queries
+        and enhanced_details (component id -> LazyDetails)
+    """
+    reader = _READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported model file type: {path}")
+    with open(path, 'r', encoding='utf-8') as f:
+        sections = reader(f)
+    _split_details(sections['components'], sections['enhanced_details'])
+    return sections
+
+
+def load_details_file(path: str) -> dict:
+    """
+    Stream an enhanced component details file (component id -> details object)
+
+    Args:
+        path: Path to the JSON details file
+
+    Returns:
+        Dictionary of component id to LazyDetails
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        return {comp_id: LazyDetails(_read_object(stream, HEAVY_FIELDS)) for comp_id in stream.keys()}
+
+
+_DIGESTS = {}
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file's contents
+
+    The digest is remembered per path with the file's mtime and size, so an
+    unchanged file is not re-read on every rerun.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    known = _DIGESTS.get(path)
+    if known and known[0] == signature:
+        return known[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    _DIGESTS[path] = (signature, digest.hexdigest())
+    return _DIGESTS[path][1]
@@ -0,0 +1,412 @@
+"""
+Model Watcher
+Hot-reloads the architecture data on file changes and invalidates only the derived results it affects
+"""
+
+import os
+import runpy
+import threading
+from collections import Counter, OrderedDict
+import architecture_data
+import openapi_flow_definitions
+from architecture_model import ENHANCED_DETAILS_PATH, ArchitectureModel, get_architecture_model, reload_architecture_model
+from model_loader import LazyDetails
+
+# Data modules reloaded in place when their source changes (in dependency order)
+WATCHED_MODULES = (architecture_data, openapi_flow_definitions)
+
+# Derived results kept by the shared cache before the least recently used is dropped
+MAX_DERIVED_ENTRIES = 256
+
+
+def layer_key(layer_id: str) -> str:
+    """Dependency key for a layer's definition and membership"""
+    return f"layer:{layer_id}"
+
+
+def sequence_key(name: str) -> str:
+    """Dependency key for a numbered-flow sequence"""
+    return f"sequence:{name}"
+
+
+def query_key(name: str) -> str:
+    """Dependency key for a sample query"""
+    return f"query:{name}"
+
+
+def reload_module_in_place(module):
+    """
+    Re-execute a data module and update its constants in place
+
+    Other modules imported COMPONENTS, FLOWS, ... by name, so the existing
+    dict/list objects are refilled rather than replaced.
+
+    Args:
+        module: Imported module whose source file changed
+    """
+    fresh = runpy.run_path(module.__file__, run_name=f"{module.__name__}_reload")
+    for name, value in fresh.items():
+        if not name.isupper():
+            continue
+        current = getattr(module, name, None)
+        if isinstance(current, dict) and isinstance(value, dict):
+            current.clear()
+            current.update(value)
+        elif isinstance(current, list) and isinstance(value, list):
+            current[:] = value
+        else:
+            setattr(module, name, value)
+
+
+def _details_signature(details):
+    if details is None:
+        return None
+    if isinstance(details, LazyDetails):
+        return details.signature()
+    return tuple(details.items())
+
+
+def _component_signature(comp) -> tuple:
+    return (
+        comp.name, comp.layer, comp.technical, comp.layman, comp.color, comp.icon,
+        _details_signature(comp.details)
+    )
+
+
+def _step_signature(steps: tuple) -> tuple:
+    return tuple((step.step, step.source.id, step.target.id, step.label, step.color, step.timing) for step in steps)
+
+
+def _query_signature(query) -> tuple:
+    parallel = tuple((fork.fork, fork.join, fork.branches) for fork in query.parallel)
+    return (query.query, query.intent, tuple(query.path), query.explanation, parallel)
+
+
+def diff_models(old: ArchitectureModel, new: ArchitectureModel) -> frozenset:
+    """
+    Find what changed between two models
+
+    Args:
+        old: Model before the reload
+        new: Model after the reload
+
+    Returns:
+        Frozenset of dependency keys: ids of changed components (including
+        both endpoints of added/removed flows) plus layer, sequence and
+        query keys for changed layers, sequences and sample queries
+    """
+    changed = set()
+
+    old_components = {comp.id: comp for comp in old.components}
+    new_components = {comp.id: comp for comp in new.components}
+    for comp_id in old_components.keys() | new_components.keys():
+        before = old_components.get(comp_id)
+        after = new_components.get(comp_id)
+        if before is None or after is None or before.layer != after.layer:
+            # Membership changed: diagrams of the layer(s) gain or lose a node
+            changed.add(comp_id)
+            changed.update(layer_key(comp.layer) for comp in (before, after) if comp is not None)
+        elif _component_signature(before) != _component_signature(after):
+            changed.add(comp_id)
+
+    old_flows = Counter((f.source.id, f.target.id, f.label, f.condition, f.inline, f.apis) for f in old.flows)
+    new_flows = Counter((f.source.id, f.target.id, f.label, f.condition, f.inline, f.apis) for f in new.flows)
+    for source, target, *_ in (old_flows - new_flows) + (new_flows - old_flows):
+        changed.update((source, target))
+
+    for layer_id in old.layers.keys() | new.layers.keys():
+        if old.layers.get(layer_id) != new.layers.get(layer_id):
+            changed.add(layer_key(layer_id))
+
+    for name in old.sequences.keys() | new.sequences.keys():
+        if _step_signature(old.sequences.get(name, ())) != _step_signature(new.sequences.get(name, ())):
+            changed.add(sequence_key(name))
+
+    for name in old.sample_queries.keys() | new.sample_queries.keys():
+        before = old.sample_queries.get(name)
+        after = new.sample_queries.get(name)
+        if before is None or after is None or _query_signature(before) != _query_signature(after):
+            changed.add(query_key(name))
+
+    return frozenset(changed)
+
+
+class _Build:
+    """A derived result being computed, marked stale when its dependencies change mid-build"""
+
+    __slots__ = ('done', 'depends_on', 'stale')
+
+    def __init__(self, depends_on: frozenset):
+        self.done = threading.Event()
+        self.depends_on = depends_on
+        self.stale = False
+
+
+class DerivedCache:
+    """
+    Cache of derived results (diagrams, exports, metrics) tagged with the model keys they depend on
+
+    Invalidation drops only the entries whose dependencies intersect the
+    changed keys, so unrelated diagrams survive a live edit. Concurrent
+    misses on the same key share one computation: the first caller computes
+    while the others wait for its result. A result whose dependencies were
+    invalidated while it was being computed is returned but not stored.
+    """
+
+    def __init__(self, max_entries: int = MAX_DERIVED_ENTRIES):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.invalidated = 0
+
+    def get_or_compute(self, key, depends_on, compute):
+        """
+        Get a derived result, computing and storing it on a miss
+
+        Args:
+            key: Hashable key identifying the result (including its parameters)
+            depends_on: Iterable of dependency keys (component ids, layer_key(), ...)
+            compute: Zero-argument callable producing the result
+
+        Returns:
+            The cached or freshly computed result
+        """
+        depends_on = frozenset(depends_on)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                build = self._pending.get(key)
+                if build is None:
+                    build = self._pending[key] = _Build(depends_on)
+                    self.misses += 1
+                    break
+                self.shared += 1
+            # Another caller is computing this key; use its result (or retry if it failed or went stale)
+            build.done.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                # A model change during the build may have made the result stale; don't serve it later
+                if not build.stale:
+                    self._entries[key] = (depends_on, value)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            build.done.set()
+        return value
+
+    def peek(self, key):
+        """
+        Get a derived result only if it is already cached
+
+        Args:
+            key: Key passed to get_or_compute()
+
+        Returns:
+            The cached result, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, changed: frozenset) -> int:
+        """
+        Drop entries that depend on any changed key
+
+        Args:
+            changed: Dependency keys reported by diff_models
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key, (depends_on, _) in self._entries.items() if not depends_on.isdisjoint(changed)]
+            for key in stale:
+                del self._entries[key]
+            for build in self._pending.values():
+                if not build.depends_on.isdisjoint(changed):
+                    build.stale = True
+            self.invalidated += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            for build in self._pending.values():
+                build.stale = True
+
+    def stats(self) -> dict:
+        """Entry count and hit/miss/shared/invalidation counters"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "invalidated": self.invalidated,
+        }
+
+
+class ModelWatcher:
+    """
+    Polls the architecture data files and swaps in a new model when they change
+
+    Polling is a stat() per watched file, cheap enough to run on every
+    Streamlit rerun. Reload errors (e.g. a half-saved file) keep the previous
+    model and are reported in last_error until the next successful reload.
+    """
+
+    def __init__(self, modules: tuple = WATCHED_MODULES, details_path: str = ENHANCED_DETAILS_PATH):
+        self._modules = modules
+        self._paths = [module.__file__ for module in modules] + [details_path]
+        self._signatures = {path: _file_signature(path) for path in self._paths}
+        self._model = get_architecture_model()
+        self._latency = dict(architecture_data.COMPONENT_LATENCY_MS)
+        self._lock = threading.Lock()
+        self.version = 0
+        self.last_error = None
+
+    @property
+    def model(self) -> ArchitectureModel:
+        """Model currently in use"""
+        return self._model
+
+    def poll(self) -> frozenset:
+        """
+        Reload changed files and diff the result against the current model
+
+        Returns:
+            Frozenset of changed dependency keys (empty when nothing changed)
+        """
+        with self._lock:
+            changed_paths = set()
+            for path in self._paths:
+                signature = _file_signature(path)
+                if signature != self._signatures[path]:
+                    self._signatures[path] = signature
+                    changed_paths.add(path)
+
+            if changed_paths:
+                try:
+                    for module in self._modules:
+                        if module.__file__ in changed_paths:
+                            reload_module_in_place(module)
+                    model = reload_architecture_model()
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    return frozenset()
+                self.last_error = None
+            else:
+                # An external model file (ARCHITECTURE_MODEL_FILE) reloads itself by hash
+                model = get_architecture_model()
+
+            latency = dict(architecture_data.COMPONENT_LATENCY_MS)
+            if model is self._model and latency == self._latency:
+                return frozenset()
+
+            changed = set(diff_models(self._model, model))
+            changed.update(
+                comp_id for comp_id in latency.keys() | self._latency.keys()
+                if latency.get(comp_id) != self._latency.get(comp_id)
+            )
+            self._model = model
+            self._latency = latency
+            self.version += 1
+            return frozenset(changed)
+
+
+def _file_signature(path: str) -> tuple:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_WATCHER = None
+_WATCHER_LOCK = threading.Lock()
+DERIVED_CACHE = DerivedCache()
+
+
+def get_model_watcher() -> ModelWatcher:
+    """Get the shared model watcher, creating it on first use"""
+    global _WATCHER
+    with _WATCHER_LOCK:
+        if _WATCHER is None:
+            _WATCHER = ModelWatcher()
+    return _WATCHER
+
+
+def check_for_changes() -> frozenset:
+    """
+    Poll for data file changes and invalidate affected derived results
+
+    Returns:
+        Frozenset of changed dependency keys (empty when nothing changed)
+    """
+    changed = get_model_watcher().poll()
+    if changed:
+        DERIVED_CACHE.invalidate(changed)
+    return changed
+
+
+def cached_derived(key, depends_on, compute):
+    """Get a derived result from the shared cache (see DerivedCache.get_or_compute)"""
+    return DERIVED_CACHE.get_or_compute(key, depends_on, compute)
+
+
+def peek_derived(key):
+    """Get a derived result from the shared cache only if it is already there (see DerivedCache.peek)"""
+    return DERIVED_CACHE.peek(key)
+
+
+def layer_dependencies(graph, layer_names: list) -> frozenset:
+    """
+    Dependency keys of a view showing the given layers
+
+    Args:
+        graph: ArchitectureGraph the view is drawn from
+        layer_names: Layer display names shown in the view
+
+    Returns:
+        Frozenset of layer keys and member component ids
+    """
+    depends_on = set()
+    for layer_id, layer_info in graph.layers_in_order:
+        if layer_info['name'] in layer_names:
+            depends_on.add(layer_key(layer_id))
+            depends_on.update(graph.layer_members(layer_id))
+    return frozenset(depends_on)
+
+
+def sequence_dependencies(graph, names: list) -> frozenset:
+    """Dependency keys of a view drawn from the given numbered-flow sequences"""
+    depends_on = set()
+    for name in names:
+        depends_on.add(sequence_key(name))
+        depends_on.update(graph.sequence_components(name))
+    return frozenset(depends_on)
+
+
+def model_dependencies(graph) -> frozenset:
+    """Dependency keys of a view drawn from the whole model (every component, layer, sequence and sample query)"""
+    depends_on = set(graph.components)
+    depends_on.update(layer_key(layer_id) for layer_id, _ in graph.layers_in_order)
+    depends_on.update(sequence_key(name) for name in graph.model.sequences)
+    depends_on.update(query_key(name) for name in graph.model.sample_queries)
+    return frozenset(depends_on)
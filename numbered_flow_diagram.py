@@ -4,8 +4,43 @@ Creates architecture diagrams with numbered, color-coded flows
 """
 
 import graphviz
-from architecture_data import COMPONENTS, RAG_FLOW, MCP_FLOW
-from openapi_flow_definitions import OPENAPI_MCP_FLOW
+from architecture_graph import get_architecture_graph
+from architecture_model import get_architecture_model
+from latency_analysis import analyze_flow, format_latency
+from openapi_flow_definitions import get_flow_comparison_summary
+
+# Sequences drawn by each numbered flow type
+FLOW_TYPE_SEQUENCES = {"both": ("rag", "mcp"), "rag": ("rag",), "mcp": ("mcp",), "mcp_openapi": ("mcp_openapi",)}
+
+
+def available_flow_types(flow_types) -> list:
+    """Flow types whose sequences the loaded model defines (external model files may leave them out)"""
+    sequences = get_architecture_model().sequences
+    return [
+        flow_type for flow_type in flow_types
+        if all(sequence in sequences for sequence in FLOW_TYPE_SEQUENCES[flow_type])
+    ]
+
+
+def _flow_components(flow_type: str) -> frozenset:
+    """Components touched by the selected flows, from the precompiled graph index"""
+    graph = get_architecture_graph()
+    mcp_sequence = "mcp_openapi" if flow_type == "mcp_openapi" else "mcp"
+    
+    components = frozenset()
+    if flow_type in ["rag", "both"]:
+        components |= graph.sequence_components("rag")
+    if flow_type in ["mcp", "mcp_openapi", "both"]:
+        components |= graph.sequence_components(mcp_sequence)
+    return components
+
+
+def _mcp_steps(flow_type: str) -> tuple:
+    """Steps and edge marker of the MCP sequence drawn for a flow type"""
+    if flow_type == "mcp_openapi":
+        return get_flow_steps("mcp_openapi"), "🟪"
+    return get_flow_steps("mcp"), "🔵"
+
 
 def create_numbered_flow_diagram(flow_type: str = "both") -> graphviz.Digraph:
     """
@@ -17,37 +52,25 @@ def create_numbered_flow_diagram(flow_type: str = "both") -> graphviz.Digraph:
     Returns:
         Graphviz Digraph object
     """
+    graph = get_architecture_graph()
     dot = graphviz.Digraph(comment='Numbered Flow Diagram')
     dot.attr(rankdir='LR', splines='ortho', nodesep='1.0', ranksep='1.5')
     dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
     dot.attr('edge', fontsize='10', fontname='Arial Bold')
     
     # Collect all unique components from selected flows
-    all_components = set()
-    
-    if flow_type in ["rag", "both"]:
-        for flow in RAG_FLOW:
-            all_components.add(flow['from'])
-            all_components.add(flow['to'])
-    
-    # Choose MCP flow based on type
-    mcp_flow_data = OPENAPI_MCP_FLOW if flow_type == "mcp_openapi" else MCP_FLOW
-    
-    if flow_type in ["mcp", "mcp_openapi", "both"]:
-        for flow in mcp_flow_data:
-            all_components.add(flow['from'])
-            all_components.add(flow['to'])
+    all_components = _flow_components(flow_type)
     
     # Add all components as nodes
-    for comp_id in all_components:
-        if comp_id in COMPONENTS:
-            comp_data = COMPONENTS[comp_id]
-            label = f"{comp_data['icon']}\\n{comp_data['name']}"
-            dot.node(comp_id, label, fillcolor=comp_data['color'], fontcolor='white', penwidth='1.5')
+    for comp_id in sorted(all_components):
+        if graph.has_component(comp_id):
+            comp = graph.component(comp_id)
+            label = f"{comp.icon}\\n{comp.name}"
+            dot.node(comp_id, label, fillcolor=comp.color, fontcolor='white', penwidth='1.5')
     
     # Add RAG flow edges (dark green)
     if flow_type in ["rag", "both"]:
-        for flow_step in RAG_FLOW:
+        for flow_step in get_flow_steps("rag"):
             edge_label = f"🟢 {flow_step['step']}\\n{flow_step['label']}"
             dot.edge(
                 flow_step['from'],
@@ -61,8 +84,9 @@ def create_numbered_flow_diagram(flow_type: str = "both") -> graphviz.Digraph:
     
     # Add MCP flow edges (blue)
     if flow_type in ["mcp", "mcp_openapi", "both"]:
-        for flow_step in MCP_FLOW:
-            edge_label = f"🔵 {flow_step['step']}\\n{flow_step['label']}"
+        mcp_steps, marker = _mcp_steps(flow_type)
+        for flow_step in mcp_steps:
+            edge_label = f"{marker} {flow_step['step']}\\n{flow_step['label']}"
             
             # Check if this edge already exists (from RAG flow)
             # If so, add MCP flow as a parallel edge
@@ -94,12 +118,16 @@ def create_numbered_flow_diagram(flow_type: str = "both") -> graphviz.Digraph:
         legend.attr(label='Flow Legend', style='filled', color='lightgrey', fontsize='12')
         
         if flow_type in ["rag", "both"]:
-            legend.node('legend_rag', '🟢 Dark Green (1-11): RAG Knowledge Retrieval\\n"What are your business hours?"', 
+            legend.node('legend_rag', f'🟢 Dark Green (1-{_last_step("rag")}): RAG Knowledge Retrieval\\n"What are your business hours?"', 
                        shape='plaintext', fillcolor='white', fontcolor='#006400')
         
         if flow_type in ["mcp", "mcp_openapi", "both"]:
-            legend.node('legend_mcp', '🔵 Blue (1-21): MCP Tool Call to Accounts API\\n"Check my account balance"', 
-                       shape='plaintext', fillcolor='white', fontcolor='#0066CC')
+            if flow_type == "mcp_openapi":
+                legend.node('legend_mcp', f'🟪 Purple (1-{_last_step("mcp_openapi")}): OpenAPI MCP Tool Call to Accounts API\\n"Check my account balance"', 
+                           shape='plaintext', fillcolor='white', fontcolor='#7C3AED')
+            else:
+                legend.node('legend_mcp', f'🔵 Blue (1-{_last_step("mcp")}): MCP Tool Call to Accounts API\\n"Check my account balance"', 
+                           shape='plaintext', fillcolor='white', fontcolor='#0066CC')
         
         legend.node('legend_note', 'Numbers show the sequence of steps\\nColors distinguish different flow types', 
                    shape='plaintext', fillcolor='white', fontcolor='#666666')
@@ -118,37 +146,25 @@ def create_numbered_flow_diagram_vertical(flow_type: str = "both") -> graphviz.D
     Returns:
         Graphviz Digraph object
     """
+    graph = get_architecture_graph()
     dot = graphviz.Digraph(comment='Numbered Flow Diagram (Vertical)')
     dot.attr(rankdir='TB', splines='ortho', nodesep='0.8', ranksep='0.8')
     dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
     dot.attr('edge', fontsize='10', fontname='Arial Bold')
     
     # Collect all unique components
-    all_components = set()
-    
-    if flow_type in ["rag", "both"]:
-        for flow in RAG_FLOW:
-            all_components.add(flow['from'])
-            all_components.add(flow['to'])
-    
-    # Choose MCP flow based on type
-    mcp_flow_data = OPENAPI_MCP_FLOW if flow_type == "mcp_openapi" else MCP_FLOW
-    
-    if flow_type in ["mcp", "mcp_openapi", "both"]:
-        for flow in mcp_flow_data:
-            all_components.add(flow['from'])
-            all_components.add(flow['to'])
+    all_components = _flow_components(flow_type)
     
     # Add all components as nodes
-    for comp_id in all_components:
-        if comp_id in COMPONENTS:
-            comp_data = COMPONENTS[comp_id]
-            label = f"{comp_data['icon']} {comp_data['name']}"
-            dot.node(comp_id, label, fillcolor=comp_data['color'], fontcolor='white', penwidth='1.5')
+    for comp_id in sorted(all_components):
+        if graph.has_component(comp_id):
+            comp = graph.component(comp_id)
+            label = f"{comp.icon} {comp.name}"
+            dot.node(comp_id, label, fillcolor=comp.color, fontcolor='white', penwidth='1.5')
     
     # Add RAG flow edges
     if flow_type in ["rag", "both"]:
-        for flow_step in RAG_FLOW:
+        for flow_step in get_flow_steps("rag"):
             edge_label = f"🟢{flow_step['step']}: {flow_step['label']}"
             dot.edge(
                 flow_step['from'],
@@ -162,8 +178,9 @@ def create_numbered_flow_diagram_vertical(flow_type: str = "both") -> graphviz.D
     
     # Add MCP flow edges
     if flow_type in ["mcp", "mcp_openapi", "both"]:
-        for flow_step in MCP_FLOW:
-            edge_label = f"🔵{flow_step['step']}: {flow_step['label']}"
+        mcp_steps, marker = _mcp_steps(flow_type)
+        for flow_step in mcp_steps:
+            edge_label = f"{marker}{flow_step['step']}: {flow_step['label']}"
             dot.edge(
                 flow_step['from'],
                 flow_step['to'],
@@ -180,32 +197,67 @@ def create_numbered_flow_diagram_vertical(flow_type: str = "both") -> graphviz.D
         legend.attr(label='Flow Legend', style='filled', color='lightgrey', fontsize='11')
         
         if flow_type in ["rag", "both"]:
-            legend.node('legend_rag', '🟢 RAG Flow (11 steps): Knowledge retrieval from vector database', 
+            legend.node('legend_rag', f'🟢 RAG Flow ({_last_step("rag")} steps): Knowledge retrieval from vector database', 
                        shape='plaintext', fillcolor='white', fontcolor='#006400')
         
         if flow_type in ["mcp", "mcp_openapi", "both"]:
-            legend.node('legend_mcp', '🔵 MCP Flow (21 steps): Real-time API call to Accounts API', 
-                       shape='plaintext', fillcolor='white', fontcolor='#0066CC')
+            if flow_type == "mcp_openapi":
+                legend.node('legend_mcp', f'🟪 OpenAPI MCP Flow ({_last_step("mcp_openapi")} steps): Real-time API call to Accounts API', 
+                           shape='plaintext', fillcolor='white', fontcolor='#7C3AED')
+            else:
+                legend.node('legend_mcp', f'🔵 MCP Flow ({_last_step("mcp")} steps): Real-time API call to Accounts API', 
+                           shape='plaintext', fillcolor='white', fontcolor='#0066CC')
     
     return dot
 
 
+def get_flow_steps(flow_type: str) -> list:
+    """
+    Get the numbered steps for a flow type from the loaded model
+    
+    Args:
+        flow_type: "rag", "mcp" or "mcp_openapi"
+    
+    Returns:
+        List of flow steps (empty for unknown types and sequences the model does not define)
+    """
+    return get_architecture_model().sequence_steps(flow_type)
+
+
+def get_model_flow_comparison() -> dict:
+    """Code-based vs OpenAPI-based comparison of the loaded model's MCP sequences (None when either is missing)"""
+    if not available_flow_types(["mcp", "mcp_openapi"]):
+        return None
+    return get_flow_comparison_summary(get_flow_steps("mcp"), get_flow_steps("mcp_openapi"))
+
+
+def _last_step(flow_type: str):
+    """Number of the last step of a sequence (its step count for legends)"""
+    steps = get_flow_steps(flow_type)
+    return steps[-1]['step'] if steps else 0
+
+
 def get_flow_summary(flow_type: str) -> dict:
     """
     Get summary statistics for a flow
     
+    Step count and latency are computed from the flow definition by the
+    latency analysis engine, so they follow the model.
+    
     Args:
-        flow_type: "rag" or "mcp"
+        flow_type: "rag", "mcp" or "mcp_openapi"
     
     Returns:
-        Dictionary with flow statistics
+        Dictionary with flow statistics (empty when the model does not define the sequence)
     """
+    steps = get_flow_steps(flow_type)
+    if not steps:
+        return {}
+    
     if flow_type == "rag":
-        return {
+        summary = {
             "name": "RAG Knowledge Retrieval",
             "color": "🟢 Dark Green",
-            "steps": 11,
-            "latency": "~200ms",
             "data_source": "Vector DB (static knowledge)",
             "agent_involved": "No",
             "llm_call": "No",
@@ -213,12 +265,10 @@ def get_flow_summary(flow_type: str) -> dict:
             "governance": "No",
             "use_cases": ["FAQs", "Policies", "Product information", "Business hours"]
         }
-    elif flow_type == "mcp":
-        return {
+    elif flow_type in ["mcp", "mcp_openapi"]:
+        summary = {
             "name": "MCP Tool Call to Accounts API",
-            "color": "🔵 Blue",
-            "steps": 21,
-            "latency": "~512ms",
+            "color": "🔵 Blue" if flow_type == "mcp" else "🟪 Purple",
             "data_source": "Accounts API (real-time data)",
             "agent_involved": "Yes (Wealth Agent)",
             "llm_call": "Yes (Azure OpenAI)",
@@ -228,3 +278,10 @@ def get_flow_summary(flow_type: str) -> dict:
         }
     else:
         return {}
+    
+    analysis = analyze_flow(steps)
+    summary["steps"] = len(steps)
+    summary["latency_ms"] = analysis["total_ms"]
+    summary["latency"] = format_latency(analysis["total_ms"])
+    summary["analysis"] = analysis
+    return summary
@@ -3,6 +3,9 @@ OpenAPI-Based Flow Definitions
 Alternative architecture using OpenAPI specs for dynamic tool discovery
 """
 
+from architecture_data import MCP_FLOW
+from latency_analysis import analyze_flow
+
 # OpenAPI-based MCP flow (26 steps - adds OpenAPI Registry, Client, Validator)
 OPENAPI_MCP_FLOW = [
     # Forward path - with OpenAPI components
@@ -155,9 +158,6 @@ FLOW_COMPARISON = {
         "name": "Code-Based Flow (Current)",
         "color": "#0066CC",
         "color_name": "Blue",
-        "steps": 21,
-        "latency_ms": 512,
-        "components": 12,
         "external_calls": 2,
         "pros": [
             "Fast - no schema parsing overhead",
@@ -184,9 +184,6 @@ FLOW_COMPARISON = {
         "name": "OpenAPI-Based Flow (Alternative)",
         "color": "#7C3AED",
         "color_name": "Purple",
-        "steps": 27,
-        "latency_ms": 612,
-        "components": 15,
         "external_calls": 3,
         "pros": [
             "Dynamic - add new APIs without code changes",
@@ -213,18 +210,41 @@ FLOW_COMPARISON = {
     }
 }
 
-def get_flow_comparison_summary():
-    """Get summary comparison of code-based vs OpenAPI-based flows"""
+def get_flow_metrics(steps: list) -> dict:
+    """Compute steps, latency and component count for a numbered flow"""
+    analysis = analyze_flow(steps)
+    components = {step['from'] for step in steps} | {step['to'] for step in steps}
+    return {
+        "steps": len(steps),
+        "latency_ms": round(analysis["total_ms"]),
+        "components": len(components),
+        "analysis": analysis,
+    }
+
+
+def get_flow_comparison_summary(code_steps: list = None, openapi_steps: list = None):
+    """
+    Get summary comparison of code-based vs OpenAPI-based flows
+    
+    Args:
+        code_steps: Code-based MCP flow steps (defaults to MCP_FLOW)
+        openapi_steps: OpenAPI-based MCP flow steps (defaults to OPENAPI_MCP_FLOW)
+    """
+    code_based = {**FLOW_COMPARISON["code_based"], **get_flow_metrics(MCP_FLOW if code_steps is None else code_steps)}
+    openapi_based = {
+        **FLOW_COMPARISON["openapi_based"],
+        **get_flow_metrics(OPENAPI_MCP_FLOW if openapi_steps is None else openapi_steps)
+    }
+    latency_diff = openapi_based["latency_ms"] - code_based["latency_ms"]
     return {
-        "code_based": FLOW_COMPARISON["code_based"],
-        "openapi_based": FLOW_COMPARISON["openapi_based"],
+        "code_based": code_based,
+        "openapi_based": openapi_based,
         "difference": {
-            "steps": FLOW_COMPARISON["openapi_based"]["steps"] - FLOW_COMPARISON["code_based"]["steps"],
-            "latency_ms": FLOW_COMPARISON["openapi_based"]["latency_ms"] - FLOW_COMPARISON["code_based"]["latency_ms"],
-            "components": FLOW_COMPARISON["openapi_based"]["components"] - FLOW_COMPARISON["code_based"]["components"],
+            "steps": openapi_based["steps"] - code_based["steps"],
+            "latency_ms": latency_diff,
+            "components": openapi_based["components"] - code_based["components"],
             "overhead_percentage": round(
-                ((FLOW_COMPARISON["openapi_based"]["latency_ms"] - FLOW_COMPARISON["code_based"]["latency_ms"]) 
-                 / FLOW_COMPARISON["code_based"]["latency_ms"]) * 100, 1
-            )
+                (latency_diff / code_based["latency_ms"]) * 100, 1
+            ) if code_based["latency_ms"] else 0.0
         }
     }
@@ -0,0 +1,331 @@
+"""
+Path Engine
+Derives request/response processing paths per intent from FLOWS instead of hand-written lists
+"""
+
+from collections import deque
+from architecture_graph import ArchitectureGraph, get_architecture_graph
+from architecture_model import ForkRecord
+
+# Intent that fans out to every agent reachable through a conditional flow
+MULTI_INTENT = "multi"
+
+# Components in these layers are visited as inline checks when the request
+# passes a component that has a flow into them (e.g. gateway -> WAF); other
+# components are visited inline when their flow is marked "inline"
+CHECK_LAYERS = ("security",)
+
+# Fire-and-forget destinations that never appear on a request path
+ASYNC_LAYERS = ("messaging", "monitoring")
+
+
+class PathEngine:
+    """
+    Synthesizes processing paths from the architecture graph
+
+    A path is: the shortest route from the graph's entry component to the
+    agent(s) selected by the intent's conditional flows (with inline security
+    checks and support calls), each agent's round trips to its direct
+    dependencies, and the shortest route back to the entry component (with
+    its inline support calls). Agents dispatched by the same component (e.g.
+    the executor for a multi-intent query) run as parallel branches between
+    that component and its return. Routes and paths are memoized, so
+    repeated lookups for an intent are constant time.
+    """
+
+    def __init__(self, graph: ArchitectureGraph):
+        self._graph = graph
+        self._model = graph.model
+        self._routes = {}
+        self._paths = {}
+
+    @property
+    def graph(self) -> ArchitectureGraph:
+        """The graph paths are derived from"""
+        return self._graph
+
+    @property
+    def intents(self) -> frozenset:
+        """Intents that route to an agent through a conditional flow"""
+        return self._graph.conditions
+
+    def route(self, source: str, target: str, condition: str = None) -> tuple:
+        """
+        Shortest route between two components
+
+        Conditional flows are only traversable when their condition matches,
+        and check/async components are never used as intermediate hops.
+
+        Args:
+            source: Start component id
+            target: End component id
+            condition: Intent whose conditional flows may be used
+
+        Returns:
+            Tuple of component ids from source to target (empty if unreachable)
+        """
+        key = (source, target, condition)
+        if key in self._routes:
+            return self._routes[key]
+
+        model = self._model
+        graph = self._graph
+        start = model.index_of[source]
+        goal = model.index_of[target]
+        parents = {start: None}
+        queue = deque([start])
+        while queue and goal not in parents:
+            node = queue.popleft()
+            for edge_index in graph.successor_edges(node):
+                flow = model.flows[edge_index]
+                nxt = flow.target.index
+                if nxt in parents:
+                    continue
+                if flow.condition and flow.condition != condition:
+                    continue
+                if nxt != goal and flow.target.layer in CHECK_LAYERS + ASYNC_LAYERS:
+                    continue
+                parents[nxt] = node
+                queue.append(nxt)
+
+        route = ()
+        if goal in parents:
+            steps = []
+            node = goal
+            while node is not None:
+                steps.append(model.components[node].id)
+                node = parents[node]
+            route = tuple(reversed(steps))
+
+        self._routes[key] = route
+        return route
+
+    def agents_for_intent(self, intent: str) -> tuple:
+        """Agents selected by an intent's conditional flows (all agents for multi-intent)"""
+        if intent == MULTI_INTENT:
+            flows = self._graph.conditional_flows
+        else:
+            flows = self._graph.flows_for_condition(intent)
+        agents = []
+        for flow in flows:
+            if flow.target.id not in agents:
+                agents.append(flow.target.id)
+        return tuple(agents)
+
+    def get_paths(self, intent: str) -> dict:
+        """
+        Get the derived request and response paths for an intent
+
+        Args:
+            intent: Intent name (a flow condition such as "card", or "multi")
+
+        Returns:
+            Dictionary with "request", "response" and full "path" lists of
+            component ids plus the "parallel" ForkRecords of the path, or
+            None when no agent handles the intent
+        """
+        if intent in self._paths:
+            return self._paths[intent]
+
+        entry = self._graph.entry_component
+        agents = self.agents_for_intent(intent)
+        paths = None
+        if agents and entry:
+            request = [entry]
+            position = entry
+            parallel = ()
+            dispatch = self._fan_out_route(entry, agents)
+            if dispatch:
+                for comp_id in dispatch[1:]:
+                    request.append(comp_id)
+                    request.extend(self._checks(comp_id, request))
+                fork = len(request) - 1
+                branches = []
+                for agent in agents:
+                    start = len(request)
+                    request.append(agent)
+                    request.extend(self._agent_work(agent))
+                    branches.append((start, len(request)))
+                # The branches join where the last one returns to the dispatcher
+                parallel = (ForkRecord(fork, len(request), tuple(branches)),)
+                position = agents[-1]
+            else:
+                for agent in agents:
+                    condition = self._condition_into(agent)
+                    leg = self.route(position, agent, condition)
+                    if not leg:
+                        continue
+                    for comp_id in leg[1:]:
+                        request.append(comp_id)
+                        if comp_id != agent:
+                            request.extend(self._checks(comp_id, request))
+                    request.extend(self._agent_work(agent))
+                    position = agent
+
+            response = []
+            for comp_id in self.route(position, entry)[1:]:
+                response.append(comp_id)
+                if comp_id != entry:
+                    response.extend(self._checks(comp_id, request + response))
+            if response:
+                paths = {"request": request, "response": response, "path": request + response, "parallel": parallel}
+
+        self._paths[intent] = paths
+        return paths
+
+    def get_path(self, intent: str) -> list:
+        """Get the full derived path (request followed by response) for an intent"""
+        paths = self.get_paths(intent)
+        if paths is None:
+            return []
+        return paths["path"]
+
+    def _fan_out_route(self, entry: str, agents: tuple) -> tuple:
+        """
+        Route to the component that dispatches several agents in parallel
+
+        Args:
+            entry: Entry component id
+            agents: Agent ids selected by the intent
+
+        Returns:
+            Route from the entry component to the dispatcher, or an empty
+            tuple unless every agent is dispatched by, and returns to, the
+            same component
+        """
+        if len(agents) < 2:
+            return ()
+        dispatch = None
+        for agent in agents:
+            leg = self.route(entry, agent, self._condition_into(agent))
+            back = self.route(agent, entry)
+            if len(leg) < 2 or len(back) < 2 or leg[-2] != back[1]:
+                return ()
+            if dispatch is None:
+                dispatch = leg[:-1]
+            elif dispatch[-1] != leg[-2]:
+                return ()
+        return dispatch
+
+    def _condition_into(self, agent: str) -> str:
+        """Condition of the conditional flow that selects an agent"""
+        for flow in self._graph.incoming(agent):
+            if flow.condition:
+                return flow.condition
+        return None
+
+    def _checks(self, comp_id: str, visited: list) -> list:
+        """Inline check and support components a component calls on the way through"""
+        return [
+            flow.target.id for flow in self._graph.outgoing(comp_id)
+            if not flow.condition and flow.target.id not in visited
+            and (flow.target.layer in CHECK_LAYERS or flow.inline)
+        ]
+
+    def _agent_work(self, agent: str) -> list:
+        """
+        Round trips from an agent to its direct dependencies
+
+        A dependency that fronts domain APIs (e.g. MCP Tools) also calls the
+        APIs listed on the agent's flow into it (see _agent_apis).
+        """
+        work = []
+        for flow in self._graph.outgoing(agent):
+            dependency = flow.target
+            if flow.condition or dependency.layer in ASYNC_LAYERS:
+                continue
+            # Flows back into the component that dispatched the agent are responses
+            if any(back.source.id == dependency.id for back in self._graph.incoming(agent)):
+                continue
+            work.append(dependency.id)
+            for api in self._agent_apis(flow):
+                work.extend([api, dependency.id])
+            work.append(agent)
+        return work
+
+    def _agent_apis(self, flow) -> list:
+        """
+        Domain APIs an agent calls through a dependency
+
+        Args:
+            flow: Flow from the agent to the dependency
+
+        Returns:
+            List of the flow's "apis" the dependency has a flow to, in call order
+        """
+        reachable = {api_flow.target.id for api_flow in self._graph.outgoing(flow.target.id)}
+        return [api for api in flow.apis if api in reachable]
+
+
+_ENGINE = None
+
+
+def get_path_engine() -> PathEngine:
+    """Get the path engine for the shared architecture graph"""
+    global _ENGINE
+    graph = get_architecture_graph()
+    if _ENGINE is None or _ENGINE.graph is not graph:
+        _ENGINE = PathEngine(graph)
+    return _ENGINE
+
+
+def get_path_for_intent(intent: str) -> list:
+    """
+    Get the processing path for a given intent
+
+    Agent intents are derived from the graph. Intents without an agent
+    (e.g. "general") use the sample query defined for that intent, or the
+    model's first sample query when none is.
+
+    Args:
+        intent: Intent name
+
+    Returns:
+        List of component ids from the entry component and back (empty when the
+        model has no agent for the intent and no sample queries)
+    """
+    engine = get_path_engine()
+    path = engine.get_path(intent)
+    if path:
+        return path
+    model = engine.graph.model
+    for query in model.sample_queries.values():
+        if query.intent == intent:
+            return model.path_ids(query.path)
+    for query in model.sample_queries.values():
+        return model.path_ids(query.path)
+    return []
+
+
+def get_request_response_paths(intent: str) -> tuple:
+    """
+    Get the request and response halves of an intent's path
+
+    Args:
+        intent: Intent name
+
+    Returns:
+        (request, response) lists of component ids, or None for intents
+        without a derived path
+    """
+    paths = get_path_engine().get_paths(intent)
+    if paths is None:
+        return None
+    return paths["request"], paths["response"]
+
+
+def get_parallel_branches(intent: str) -> tuple:
+    """
+    Get the fork/join branches of an intent's derived path
+
+    Args:
+        intent: Intent name
+
+    Returns:
+        Tuple of ForkRecords (empty for a single agent or intents without a
+        derived path)
+    """
+    paths = get_path_engine().get_paths(intent)
+    if paths is None:
+        return ()
+    return paths["parallel"]
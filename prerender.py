@@ -0,0 +1,185 @@
+"""
+Diagram Pre-renderer
+Warms the render cache for the most used diagram variants in a process pool
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from architecture_diagram import (
+    create_airport_transfer_diagram, create_architecture_diagram, create_flow_diagram, default_expanded_layers
+)
+from architecture_graph import get_architecture_graph
+from numbered_flow_diagram import (
+    available_flow_types, create_numbered_flow_diagram, create_numbered_flow_diagram_vertical
+)
+from diagram_layout import LAYOUT_FORMATS
+from render_cache import RenderCache, dot_available, get_render_cache, render_key
+
+# Default number of worker processes (each runs one Graphviz layout at a time)
+PRERENDER_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+# Numbered flow parameters offered by the Numbered Flows page
+NUMBERED_FLOW_TYPES = ("both", "rag", "mcp", "mcp_openapi")
+
+
+def common_variants() -> list:
+    """
+    DOT sources of the diagram variants people open most
+
+    Each source is built exactly as the pages build it, so the render cache
+    key matches: the full architecture with all layers in both directions,
+    every sample query's flow diagram, every numbered flow whose sequences
+    the model defines in both orientations and the airport transfer journey.
+
+    Returns:
+        List of (variant name, DOT source) tuples
+    """
+    graph = get_architecture_graph()
+    variants = []
+
+    layer_names = graph.layer_names
+    expanded = default_expanded_layers(layer_names)
+    for direction in ("Top to Bottom", "Left to Right"):
+        diagram = create_architecture_diagram(layer_names, "None", direction, None, expanded)
+        variants.append((f"Full architecture ({direction})", diagram.source))
+
+    for name, query in graph.model.sample_queries.items():
+        variants.append((f"Flow: {name}", create_flow_diagram(query.path, parallel=query.parallel).source))
+
+    for flow_type in available_flow_types(NUMBERED_FLOW_TYPES):
+        variants.append((f"Numbered flow: {flow_type} (horizontal)", create_numbered_flow_diagram(flow_type).source))
+        variants.append((f"Numbered flow: {flow_type} (vertical)", create_numbered_flow_diagram_vertical(flow_type).source))
+
+    variants.append(("Airport transfer journey", create_airport_transfer_diagram().source))
+
+    return variants
+
+
+def _render_variant(directory: str, max_bytes: int, source: str) -> float:
+    """Worker: lay out one DOT source into the shared cache (SVG and layout JSON) and return the seconds taken"""
+    started = time.perf_counter()
+    RenderCache(directory, max_bytes).render_formats(source, LAYOUT_FORMATS)
+    return time.perf_counter() - started
+
+
+def prerender(variants: list = None, max_workers: int = PRERENDER_WORKERS, progress=None,
+              cache: RenderCache = None) -> dict:
+    """
+    Render diagram variants into the cache in parallel
+
+    Variants already in the cache are skipped without starting a worker.
+
+    Args:
+        variants: (name, DOT source) tuples (defaults to common_variants())
+        max_workers: Maximum number of worker processes
+        progress: Optional callback(done, total, name, status) after each variant,
+            status being "cached", "rendered" or "failed"
+        cache: Render cache to fill (defaults to the shared cache)
+
+    Returns:
+        Dictionary with total, cached, rendered, failed, errors and seconds
+    """
+    cache = cache or get_render_cache()
+    variants = common_variants() if variants is None else variants
+    started = time.perf_counter()
+    summary = {"total": len(variants), "cached": 0, "rendered": 0, "failed": 0, "errors": {}, "seconds": 0.0}
+    done = 0
+
+    pending = []
+    for name, source in variants:
+        if all(cache.contains(render_key(source, fmt), fmt) for fmt in LAYOUT_FORMATS):
+            summary["cached"] += 1
+            done += 1
+            if progress:
+                progress(done, summary["total"], name, "cached")
+        else:
+            pending.append((name, source))
+
+    if pending:
+        # Spawned workers do not inherit the parent's threads (e.g. the Streamlit server)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, max_workers), mp_context=context) as pool:
+            futures = {
+                pool.submit(_render_variant, cache.directory, cache.max_bytes, source): name
+                for name, source in pending
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    summary["rendered"] += 1
+                    status = "rendered"
+                except Exception as e:
+                    summary["failed"] += 1
+                    summary["errors"][name] = f"{type(e).__name__}: {e}"
+                    status = "failed"
+                done += 1
+                if progress:
+                    progress(done, summary["total"], name, status)
+
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+# Progress of the background warm-up started by the app (one per process)
+PRERENDER_STATUS = {"state": "idle", "done": 0, "total": 0, "current": "", "summary": None}
+_PRERENDER_LOCK = threading.Lock()
+
+
+def start_background_prerender(max_workers: int = PRERENDER_WORKERS) -> bool:
+    """
+    Warm the render cache in a background thread, once per process
+
+    Does nothing when Graphviz is not installed (diagrams then render in the
+    browser and there is nothing to cache).
+
+    Args:
+        max_workers: Maximum number of worker processes
+
+    Returns:
+        True if this call started the warm-up
+    """
+    with _PRERENDER_LOCK:
+        if PRERENDER_STATUS["state"] != "idle" or not dot_available():
+            return False
+        PRERENDER_STATUS["state"] = "running"
+
+    def report(done, total, name, status):
+        PRERENDER_STATUS.update(done=done, total=total, current=name)
+
+    def run():
+        try:
+            PRERENDER_STATUS["summary"] = prerender(max_workers=max_workers, progress=report)
+            PRERENDER_STATUS["state"] = "done"
+        except Exception as e:
+            PRERENDER_STATUS["summary"] = {"errors": {"prerender": f"{type(e).__name__}: {e}"}}
+            PRERENDER_STATUS["state"] = "failed"
+
+    threading.Thread(target=run, name="diagram-prerender", daemon=True).start()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render common architecture diagrams into the render cache")
+    parser.add_argument("--workers", type=int, default=PRERENDER_WORKERS, help="maximum number of worker processes")
+    args = parser.parse_args()
+
+    if not dot_available():
+        parser.error("Graphviz 'dot' executable not found")
+
+    def report(done, total, name, status):
+        print(f"[{done}/{total}] {status:8} {name}")
+
+    summary = prerender(max_workers=args.workers, progress=report)
+    print(f"{summary['rendered']} rendered, {summary['cached']} already cached, "
+          f"{summary['failed']} failed in {summary['seconds']:.1f}s")
+    for name, error in summary["errors"].items():
+        print(f"  {name}: {error}")
+
+
+if __name__ == "__main__":
+    main()
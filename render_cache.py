@@ -0,0 +1,279 @@
+"""
+Render Cache
+Content-addressed, size-bounded on-disk cache of Graphviz renders shared across sessions and processes
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import graphviz
+
+# Environment variable overriding the cache directory
+RENDER_CACHE_DIR_ENV = "ARCHITECTURE_RENDER_CACHE_DIR"
+
+# Default cache location (shared by every process on the host)
+DEFAULT_RENDER_CACHE_DIR = os.path.join(tempfile.gettempdir(), "architecture_visualizer_render_cache")
+
+# Total size of cached renders before least recently used files are evicted
+MAX_RENDER_CACHE_BYTES = 64 * 1024 * 1024
+
+# Eviction trims the cache down to this fraction of the limit
+EVICTION_TARGET = 0.9
+
+_DOT_AVAILABLE = None
+
+
+def dot_available() -> bool:
+    """Whether the Graphviz 'dot' executable is installed (checked once)"""
+    global _DOT_AVAILABLE
+    if _DOT_AVAILABLE is None:
+        _DOT_AVAILABLE = shutil.which("dot") is not None
+    return _DOT_AVAILABLE
+
+
+def render_key(source: str, fmt: str = "svg", engine: str = "dot") -> str:
+    """
+    Cache key of a render
+
+    Args:
+        source: DOT source
+        fmt: Output format (svg, png, ...)
+        engine: Graphviz layout engine
+
+    Returns:
+        SHA-256 hex digest of engine, format and source
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{engine}\0{fmt}\0".encode("utf-8"))
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    On-disk cache of rendered diagrams keyed by the hash of their DOT source
+
+    Files are written atomically (temp file + os.replace) so concurrent
+    processes never read a partial render. A hit refreshes the file's mtime,
+    which makes mtime the LRU order used for eviction.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = MAX_RENDER_CACHE_BYTES):
+        self.directory = directory or os.environ.get(RENDER_CACHE_DIR_ENV) or DEFAULT_RENDER_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._approx_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def _entries(self) -> list:
+        """(mtime, path, size) of every cached file"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def get(self, key: str, fmt: str = "svg") -> bytes:
+        """
+        Read a cached render
+
+        Args:
+            key: Key from render_key()
+            fmt: Output format
+
+        Returns:
+            Rendered bytes, or None on a miss
+        """
+        path = self._path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def contains(self, key: str, fmt: str = "svg") -> bool:
+        """Whether a render is cached (does not count as a hit or miss)"""
+        return os.path.exists(self._path(key, fmt))
+
+    def put(self, key: str, data: bytes, fmt: str = "svg"):
+        """
+        Store a render atomically, evicting old renders if over the size limit
+
+        Args:
+            key: Key from render_key()
+            data: Rendered bytes
+            fmt: Output format
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key, fmt))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._approx_bytes += len(data)
+            over_limit = self._approx_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete least recently used renders until under the eviction target
+
+        Returns:
+            Number of files removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        removed = 0
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._approx_bytes = total
+            self.evictions += removed
+        return removed
+
+    def render(self, source: str, fmt: str = "svg", engine: str = "dot") -> bytes:
+        """
+        Render DOT source, reusing a cached render when one exists
+
+        Args:
+            source: DOT source
+            fmt: Output format
+            engine: Graphviz layout engine
+
+        Returns:
+            Rendered bytes
+
+        Raises:
+            graphviz.ExecutableNotFound: When a render is needed and Graphviz is not installed
+        """
+        key = render_key(source, fmt, engine)
+        data = self.get(key, fmt)
+        if data is None:
+            data = graphviz.Source(source, engine=engine).pipe(format=fmt)
+            self.put(key, data, fmt)
+        return data
+
+    def render_formats(self, source: str, formats: tuple, engine: str = "dot") -> dict:
+        """
+        Render DOT source to several formats from a single layout pass
+
+        Formats already cached are read back; the missing ones are produced
+        together by one Graphviz run, so the layout is computed only once.
+
+        Args:
+            source: DOT source
+            formats: Output formats (e.g. ("svg", "json"))
+            engine: Graphviz layout engine
+
+        Returns:
+            Dictionary of format to rendered bytes
+
+        Raises:
+            graphviz.ExecutableNotFound: When a render is needed and Graphviz is not installed
+            graphviz.CalledProcessError: When Graphviz fails on the source
+        """
+        results = {}
+        missing = []
+        for fmt in formats:
+            data = self.get(render_key(source, fmt, engine), fmt)
+            if data is None:
+                missing.append(fmt)
+            else:
+                results[fmt] = data
+        if len(missing) == 1:
+            results[missing[0]] = self.render(source, missing[0], engine)
+        elif missing:
+            for fmt, data in _pipe_formats(source, missing, engine).items():
+                self.put(render_key(source, fmt, engine), data, fmt)
+                results[fmt] = data
+        return results
+
+    def clear(self):
+        """Delete every cached render"""
+        for _, path, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._approx_bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters of this process and the cache's size on disk"""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "directory": self.directory,
+        }
+
+
+def _pipe_formats(source: str, formats: list, engine: str) -> dict:
+    """Run Graphviz once with an output file per format and return their contents"""
+    with tempfile.TemporaryDirectory(prefix='render-') as directory:
+        cmd = [engine]
+        for fmt in formats:
+            cmd += [f"-T{fmt}", f"-o{os.path.join(directory, 'out.' + fmt)}"]
+        try:
+            proc = subprocess.run(cmd, input=source.encode('utf-8'), capture_output=True)
+        except OSError as e:
+            raise graphviz.ExecutableNotFound(cmd) from e
+        if proc.returncode:
+            raise graphviz.CalledProcessError(proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr)
+        results = {}
+        for fmt in formats:
+            with open(os.path.join(directory, 'out.' + fmt), 'rb') as f:
+                results[fmt] = f.read()
+        return results
+
+
+_CACHE = None
+
+
+def get_render_cache() -> RenderCache:
+    """Get the shared render cache"""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = RenderCache()
+    return _CACHE
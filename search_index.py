@@ -0,0 +1,235 @@
+"""
+Component Search Index
+Tokenized inverted index with prefix and trigram matching over component text and enhanced details
+"""
+
+import re
+from bisect import bisect_left
+from architecture_graph import ArchitectureGraph, get_architecture_graph
+
+# Relative weight of a term hit per field; details fields not listed are not indexed
+FIELD_WEIGHTS = {
+    "name": 10.0,
+    "id": 8.0,
+    "layer": 3.0,
+    "functions": 3.0,
+    "technical": 2.0,
+    "api_calls": 2.0,
+    "databases": 2.0,
+    "deployment_type": 1.5,
+    "redis_ops": 1.5,
+    "cosmos_ops": 1.5,
+    "mongodb_ops": 1.5,
+    "database_operations": 1.5,
+    "layman": 1.0,
+    "prompts": 1.0,
+}
+
+# Details fields read from a component's enhanced details
+DETAIL_FIELDS = tuple(field for field in FIELD_WEIGHTS if field not in ("name", "id", "layer", "technical", "layman"))
+
+# Score multiplier per kind of match between a query token and an indexed term
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+SUBSTRING_MATCH = 0.6
+FUZZY_MATCH = 0.5
+
+# Minimum trigram similarity (Jaccard) for a fuzzy match
+MIN_TRIGRAM_SIMILARITY = 0.4
+
+# Upper bound on indexed terms one query token may expand to
+MAX_EXPANSIONS = 64
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_JSON_ESCAPE = re.compile(r'\\(?:u[0-9a-fA-F]{4}|.)')
+
+
+def tokenize(text: str) -> list:
+    """Lowercase alphanumeric tokens of a text (snake_case and punctuation split words)"""
+    return _TOKEN.findall(text.lower())
+
+
+def trigrams(term: str) -> frozenset:
+    """Character trigrams of a term"""
+    return frozenset(term[i:i + 3] for i in range(len(term) - 2))
+
+
+def _flatten_text(value) -> str:
+    """All string leaves of a decoded JSON value joined into one text"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(_flatten_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten_text(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def _detail_text(details, field: str) -> str:
+    """
+    Text of a details field
+
+    Heavy fields that have not been decoded yet are tokenized from their raw
+    JSON text (escapes blanked out), so indexing never forces a decode.
+    """
+    raw = details.raw(field) if hasattr(details, 'raw') else None
+    if raw is not None:
+        return _JSON_ESCAPE.sub(' ', raw)
+    return _flatten_text(details.get(field))
+
+
+class SearchIndex:
+    """
+    Inverted index over component fields
+
+    Postings map each term to {component index: (score, field names)} where
+    the score is the sum of the weights of the fields containing the term.
+    Terms are also kept sorted for prefix lookups (bisect) and indexed by
+    trigram for substring and typo-tolerant matches.
+    """
+
+    def __init__(self, graph: ArchitectureGraph):
+        self._graph = graph
+        self._components = graph.model.components
+        postings = {}
+        for comp in self._components:
+            fields = {
+                "name": comp.name,
+                "id": comp.id.replace('_', ' '),
+                "layer": graph.layer_name(comp.id),
+                "technical": comp.technical,
+                "layman": comp.layman,
+            }
+            if comp.details is not None:
+                for field in DETAIL_FIELDS:
+                    if field in comp.details:
+                        fields[field] = _detail_text(comp.details, field)
+
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for term in set(tokenize(text)):
+                    entry = postings.setdefault(term, {})
+                    score, matched = entry.get(comp.index, (0.0, ()))
+                    entry[comp.index] = (score + weight, matched + (field,))
+
+        trigram_terms = {}
+        gram_counts = {}
+        for term in postings:
+            grams = trigrams(term)
+            gram_counts[term] = len(grams)
+            for gram in grams:
+                trigram_terms.setdefault(gram, []).append(term)
+
+        self._postings = postings
+        self._terms = sorted(postings)
+        self._trigram_terms = trigram_terms
+        self._gram_counts = gram_counts
+
+    @property
+    def graph(self) -> ArchitectureGraph:
+        """The graph the index was built from"""
+        return self._graph
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct indexed terms"""
+        return len(self._terms)
+
+    def _expand(self, token: str) -> list:
+        """
+        Indexed terms matching a query token
+
+        Args:
+            token: Lowercase query token
+
+        Returns:
+            List of (term, match multiplier): the exact term, terms it
+            prefixes, then (if nothing matched so far) terms containing it or
+            sharing enough trigrams with it
+        """
+        matches = []
+        if token in self._postings:
+            matches.append((token, EXACT_MATCH))
+
+        terms = self._terms
+        position = bisect_left(terms, token)
+        while position < len(terms) and len(matches) < MAX_EXPANSIONS and terms[position].startswith(token):
+            if terms[position] != token:
+                matches.append((terms[position], PREFIX_MATCH))
+            position += 1
+        if matches:
+            return matches
+
+        query_grams = trigrams(token)
+        if not query_grams:
+            return matches
+        shared = {}
+        for gram in query_grams:
+            for term in self._trigram_terms.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        for term, count in shared.items():
+            if count == len(query_grams) and token in term:
+                matches.append((term, SUBSTRING_MATCH))
+                continue
+            similarity = count / (len(query_grams) + self._gram_counts[term] - count)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                matches.append((term, FUZZY_MATCH * similarity))
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches[:MAX_EXPANSIONS]
+
+    def search(self, query: str, limit: int = None) -> list:
+        """
+        Rank components matching every token of a query
+
+        Args:
+            query: Free-text query
+            limit: Optional maximum number of results
+
+        Returns:
+            List of dicts with id, score and matched fields, best match first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        totals = None
+        for token in tokens:
+            token_scores = {}
+            for term, multiplier in self._expand(token):
+                for index, (score, fields) in self._postings[term].items():
+                    best, matched = token_scores.get(index, (0.0, ()))
+                    token_scores[index] = (max(best, score * multiplier), matched + fields)
+            if totals is None:
+                totals = token_scores
+            else:
+                totals = {
+                    index: (totals[index][0] + score, totals[index][1] + fields)
+                    for index, (score, fields) in token_scores.items()
+                    if index in totals
+                }
+            if not totals:
+                return []
+
+        ranked = sorted(totals.items(), key=lambda x: (-x[1][0], x[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            {
+                "id": self._components[index].id,
+                "score": score,
+                "fields": tuple(dict.fromkeys(fields)),
+            }
+            for index, (score, fields) in ranked
+        ]
+
+
+_INDEX = None
+
+
+def get_search_index() -> SearchIndex:
+    """Get the search index for the shared architecture graph, rebuilding it when the model changes"""
+    global _INDEX
+    graph = get_architecture_graph()
+    if _INDEX is None or _INDEX.graph is not graph:
+        _INDEX = SearchIndex(graph)
+    return _INDEX
@@ -0,0 +1,129 @@
+"""
+Simulator Step Cards
+Builds the Request Flow Simulator's step cards for a whole path in one pass from cached component fragments
+"""
+
+import threading
+from architecture_graph import get_architecture_graph
+
+# Seconds between steps of the simulator animation (played client-side)
+SIMULATOR_STEP_SECONDS = 0.3
+
+# Left border colour of request and response cards
+REQUEST_BORDER = '#3B82F6'
+RESPONSE_BORDER = '#10B981'
+
+# Per-component fragments: component id -> (component record, title, details, outbound protocol, inbound protocol)
+_FRAGMENTS = {}
+_FRAGMENTS_LOCK = threading.Lock()
+
+
+def _protocol_html(protocol: str) -> str:
+    if not protocol:
+        return ""
+    return f"<br/><small style='color: #8B5CF6;'>📡 {protocol}</small>"
+
+
+def component_fragments(comp) -> tuple:
+    """
+    Step-independent HTML fragments of a component's card
+
+    Fragments are built once per component record; a model reload creates
+    new records, which rebuilds them.
+
+    Args:
+        comp: ComponentRecord
+
+    Returns:
+        (title, layer and description lines, outbound protocol line, inbound protocol line)
+    """
+    entry = _FRAGMENTS.get(comp.id)
+    if entry is not None and entry[0] is comp:
+        return entry[1:]
+
+    layer_name = get_architecture_graph().layer_info(comp.id)['name']
+    title = f"{comp.icon} {comp.name}{comp.deployment_badge}"
+    details = (
+        f"<br/><small style=\"color: #6B7280;\">{layer_name}</small>"
+        f"<br/><span style=\"color: #059669; font-size: 0.9rem;\">{comp.layman}</span>"
+    )
+    entry = (comp, title, details, _protocol_html(comp.outbound_protocol), _protocol_html(comp.inbound_protocol))
+    with _FRAGMENTS_LOCK:
+        _FRAGMENTS[comp.id] = entry
+    return entry[1:]
+
+
+def render_step_cards(path: list, request_count: int, animate: bool = False, headings: bool = False) -> str:
+    """
+    HTML of every step card of a path as one block
+
+    Request cards show the component's outbound protocol and response cards
+    its inbound protocol, except for the last card of each half.
+
+    Args:
+        path: Component records of the full path
+        request_count: Number of components on the request half
+        animate: Reveal cards one by one with CSS animation delays
+        headings: Put "Request Path" / "Response Path" headings before each half
+
+    Returns:
+        HTML markup
+    """
+    parts = []
+    halves = (
+        (0, request_count, REQUEST_BORDER, 2, "➡️ Request Path"),
+        (request_count, len(path), RESPONSE_BORDER, 3, "⬅️ Response Path"),
+    )
+    for start, end, border, protocol_index, heading in halves:
+        if headings:
+            if start:
+                parts.append("<hr/>")
+            parts.append(f"<h4>{heading}</h4>")
+        card_class = "flow-step animated" if animate else "flow-step"
+        for i in range(start, end):
+            fragments = component_fragments(path[i])
+            delay = f"animation-delay: {i * SIMULATOR_STEP_SECONDS:.2f}s; " if animate else ""
+            protocol = fragments[protocol_index] if i < end - 1 else ""
+            parts.append(
+                f'<div class="{card_class}" style="{delay}border-left: 4px solid {border};">'
+                f'<strong>{i + 1}. {fragments[0]}</strong>{fragments[1]}{protocol}</div>'
+            )
+    return "".join(parts)
+
+
+def animated_flow_status(path: list, request_count: int) -> str:
+    """
+    Progress bar and per-step status line of the simulator animation as one HTML block
+
+    The whole sequence is precomputed: each status line is shown during its
+    step by a CSS animation delay, so nothing runs on the server while the
+    animation plays.
+
+    Args:
+        path: Component records of the full path
+        request_count: Number of components on the request half
+
+    Returns:
+        HTML markup
+    """
+    total = len(path)
+    statuses = []
+    for i, comp in enumerate(path):
+        if i < request_count:
+            text = f"<strong>Step {i+1}/{total}:</strong> ➡️ Processing at {comp.name}..."
+        else:
+            text = f"<strong>Step {i+1}/{total}:</strong> ⬅️ Returning through {comp.name}..."
+        statuses.append(
+            f'<div style="animation-delay: {i * SIMULATOR_STEP_SECONDS:.2f}s; '
+            f'animation-duration: {SIMULATOR_STEP_SECONDS}s;">{text}</div>'
+        )
+    # The last line stays visible once the animation ends
+    statuses.append(
+        f'<div style="animation-delay: {total * SIMULATOR_STEP_SECONDS:.2f}s; animation-duration: {SIMULATOR_STEP_SECONDS}s;">'
+        f'✅ <strong>Request completed successfully! Response delivered to customer.</strong></div>'
+    )
+
+    return (
+        f'<div class="flow-progress"><div style="animation-duration: {total * SIMULATOR_STEP_SECONDS:.2f}s;"></div></div>'
+        f'<div class="flow-status">{"".join(statuses)}</div>'
+    )
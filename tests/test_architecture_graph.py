@@ -0,0 +1,60 @@
+"""
+Architecture Graph Tests
+Response flows and the entry component derived from the model's structure, and bounded layer-selection memos
+"""
+
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from architecture_data import COMPONENTS, FLOWS, LAYERS
+from architecture_graph import MAX_CACHED_SELECTIONS, ArchitectureGraph
+from architecture_model import ArchitectureModel
+
+RESPONSE_FLOWS = [
+    ("api_gateway", "customer"), ("card_agent", "executor"), ("critic", "planner"),
+    ("loan_agent", "executor"), ("planner", "api_gateway"), ("wealth_agent", "executor"),
+]
+
+
+def _graph(flows: list) -> ArchitectureGraph:
+    return ArchitectureGraph(ArchitectureModel.from_data(COMPONENTS, flows, LAYERS))
+
+
+def _response_flows(graph: ArchitectureGraph) -> list:
+    return sorted((flow.source.id, flow.target.id) for flow in graph.model.flows if graph.is_response_flow(flow))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_response_flows_do_not_depend_on_flow_order(seed):
+    flows = list(FLOWS)
+    random.Random(seed).shuffle(flows)
+    graph = _graph(flows)
+    assert graph.entry_component == "customer"
+    assert _response_flows(graph) == RESPONSE_FLOWS
+
+
+def test_support_calls_back_up_the_layers_are_requests():
+    graph = _graph(FLOWS)
+    # The executor reaches memory after the planner does, but memory is not on its way to the executor
+    assert graph.depends_on("executor", "memory_manager")
+    assert not graph.depends_on("memory_manager", "executor")
+    assert not graph.depends_on("critic", "planner")
+
+
+def test_layer_selection_memos_stay_bounded():
+    graph = _graph(FLOWS)
+    names = graph.layer_names
+    first = graph.visible_flows(names[:2])
+    for selection in itertools.islice(itertools.combinations(names, 3), MAX_CACHED_SELECTIONS + 10):
+        graph.visible_flows(selection)
+        graph.rollup_edges(names, selection)
+    assert len(graph._visible_flow_cache) == MAX_CACHED_SELECTIONS
+    assert len(graph._rollup_cache) == MAX_CACHED_SELECTIONS
+    # An evicted selection is recomputed to the same edges
+    assert graph.visible_flows(names[:2]) == first
@@ -0,0 +1,51 @@
+"""
+Capacity Planner Tests
+Erlang C waiting probabilities and SLO-driven replica plans
+"""
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capacity_planner import DEFAULT_MAX_UTILISATION, erlang_c, plan_replicas
+
+
+def _erlang_c_closed_form(servers, offered_load):
+    """Textbook Erlang C formula (fine for the small server counts used here)"""
+    queued = offered_load ** servers / math.factorial(servers) * servers / (servers - offered_load)
+    idle = sum(offered_load ** k / math.factorial(k) for k in range(servers))
+    return queued / (idle + queued)
+
+
+@pytest.mark.parametrize("servers, offered_load, expected", [
+    (1, 0.5, 0.5),          # M/M/1: the waiting probability is the utilisation
+    (2, 1.0, 1 / 3),
+    (10, 8.0, 0.409),
+])
+def test_erlang_c_known_values(servers, offered_load, expected):
+    assert erlang_c(servers, offered_load) == pytest.approx(expected, abs=5e-4)
+
+
+@pytest.mark.parametrize("servers", [1, 3, 12, 40])
+def test_erlang_c_matches_closed_form(servers):
+    for utilisation in (0.1, 0.5, 0.9, 0.99):
+        offered_load = servers * utilisation
+        assert erlang_c(servers, offered_load) == pytest.approx(_erlang_c_closed_form(servers, offered_load))
+
+
+def test_erlang_c_unstable_queue_always_waits():
+    assert erlang_c(4, 4.0) == 1.0
+    assert erlang_c(4, 9.0) == 1.0
+
+
+def test_plan_meets_slo_within_utilisation_cap():
+    plan = plan_replicas(200, 5000)
+    assert plan["components"]
+    for sizing in plan["components"].values():
+        assert sizing["utilisation"] <= DEFAULT_MAX_UTILISATION
+    for name, path in plan["paths"].items():
+        assert path["meets_slo"] or name in plan["infeasible"]
@@ -0,0 +1,55 @@
+"""
+draw.io Export Tests
+Compressed diagram payloads decode to the plain graph model the way draw.io reads them
+"""
+
+import base64
+import io
+import os
+import sys
+import zlib
+import xml.etree.ElementTree as ET
+from urllib.parse import unquote
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from architecture_graph import get_architecture_graph
+from drawio_exporter import DeflateStream, decompress_diagram, write_architecture_model, write_drawio_xml
+from xml_writer import XmlWriter
+
+
+def _inflate(payload: str) -> str:
+    """draw.io's reader: base64 decode, raw inflate, then decodeURIComponent"""
+    return unquote(zlib.decompress(base64.b64decode(payload), -zlib.MAX_WBITS).decode('ascii'))
+
+
+def _plain_model(show_layers: list) -> str:
+    out = io.StringIO()
+    write_architecture_model(XmlWriter(out, None), show_layers)
+    return out.getvalue()
+
+
+def test_compressed_export_decodes_to_the_plain_model():
+    show_layers = get_architecture_graph().layer_names
+    out = io.StringIO()
+    write_drawio_xml(out, show_layers, compressed=True)
+
+    mxfile = ET.fromstring(out.getvalue())
+    assert mxfile.get('compressed') == 'true'
+    (diagram,) = mxfile.findall('diagram')
+    model = _inflate(diagram.text)
+    assert model == _plain_model(show_layers)
+    assert ET.fromstring(model).tag == 'mxGraphModel'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_deflate_stream_round_trips_escapes_at_any_chunk_size(chunk_size):
+    text = '<mxCell value="100% ✓ Réponse &amp; café" style="fontSize=11;"/>' * 50
+    stream = DeflateStream(chunk_size=chunk_size)
+    for start in range(0, len(text), 13):
+        stream.write(text[start:start + 13])
+    payload = stream.finish()
+    assert _inflate(payload) == text
+    assert decompress_diagram(payload) == text
@@ -0,0 +1,55 @@
+"""
+Flow DAG Tests
+Fork/join edges and critical paths of sample query and derived multi-intent paths
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flow_dag import FlowDAG, query_dag
+from path_engine import MULTI_INTENT, get_path_engine
+
+
+def test_multi_intent_edges_bypass_the_sequential_order():
+    dag = query_dag("Multi-Intent Query")
+    # executor (8) forks to the card (9-12) and loan (13-16) branches, which join at executor (17)
+    assert {(8, 9), (8, 13), (12, 17), (16, 17)} <= set(dag.edges)
+    assert (12, 13) not in dag.edges
+    assert dag.segments()[9] == [[9, 10, 11, 12], [13, 14, 15, 16]]
+
+
+def test_multi_intent_critical_path_follows_the_slower_branch():
+    critical = query_dag("Multi-Intent Query").critical_path()
+    assert critical["total_ms"] == 482
+    assert critical["sequential_ms"] == 576
+    assert critical["parallel_savings_ms"] == 94
+    # The loan branch (Loans API) outlasts the card branch, which the critical path skips
+    assert critical["critical_path"] == list(range(9)) + list(range(13, 24))
+
+
+def test_path_without_forks_is_sequential():
+    critical = query_dag("Card Application").critical_path()
+    assert critical["total_ms"] == critical["sequential_ms"]
+    assert critical["critical_path"] == list(range(len(query_dag("Card Application"))))
+
+
+def test_critical_path_uses_the_latency_table():
+    dag = query_dag("Multi-Intent Query")
+    table = {comp_id: 1 for comp_id in dag}
+    table["cards_api"] = 1000
+    critical = dag.critical_path(table)
+    assert 11 in critical["critical_path"]
+    assert 15 not in critical["critical_path"]
+
+
+def test_derived_multi_intent_path_forks_at_the_dispatcher():
+    paths = get_path_engine().get_paths(MULTI_INTENT)
+    (fork,) = paths["parallel"]
+    path = paths["path"]
+    assert path[fork.fork] == path[fork.join] == "executor"
+    assert fork.join == len(paths["request"])
+    assert [path[start] for start, _ in fork.branches] == ["card_agent", "loan_agent", "wealth_agent"]
+    critical = FlowDAG(path, paths["parallel"]).critical_path()
+    assert critical["total_ms"] < critical["sequential_ms"]
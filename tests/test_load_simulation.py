@@ -0,0 +1,81 @@
+"""
+Load Simulation Tests
+Discrete-event request latencies against the path latencies they are built from, and retry amplification
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from architecture_data import COMPONENT_LATENCY_MS
+from flow_dag import query_dag
+from load_simulation import RetryPolicy, simulate_load
+
+
+def _unbounded(dag) -> dict:
+    """Replica overrides large enough that no visit ever queues"""
+    return {comp_id: 1000 for comp_id in dag}
+
+
+def test_deterministic_latency_is_the_summed_path():
+    dag = query_dag("Card Application")
+    result = simulate_load({"card": dag}, rps=5, duration_s=30, distribution="deterministic", replicas=_unbounded(dag))
+    expected = sum(COMPONENT_LATENCY_MS[comp_id] for comp_id in list(dag)[1:])
+    latency = result["latency_ms"]
+    assert latency["count"] > 0
+    assert latency["mean"] == pytest.approx(expected)
+    assert latency["max"] == pytest.approx(expected)
+    assert result["success_rate"] == 1.0
+
+
+def test_deterministic_parallel_latency_is_the_critical_path():
+    dag = query_dag("Multi-Intent Query")
+    result = simulate_load({"multi": dag}, rps=5, duration_s=30, distribution="deterministic", replicas=_unbounded(dag))
+    assert result["latency_ms"]["mean"] == pytest.approx(dag.critical_path()["total_ms"])
+
+
+def test_queueing_adds_latency_under_load():
+    dag = query_dag("Card Application")
+    idle = simulate_load({"card": dag}, rps=5, duration_s=30, distribution="deterministic", replicas=_unbounded(dag))
+    busy = simulate_load({"card": dag}, rps=5, duration_s=30, distribution="deterministic",
+                         replicas={"card_agent": 1}, slots_per_replica=1)
+    assert busy["components"]["card_agent"]["mean_wait_ms"] > 0
+    assert busy["latency_ms"]["mean"] > idle["latency_ms"]["mean"]
+
+
+def test_retries_amplify_load_at_the_failing_component():
+    dag = query_dag("Card Application")
+    failure_rate = 0.3
+    policy = RetryPolicy(max_attempts=4, backoff_ms=10)
+    result = simulate_load({"card": dag}, rps=20, duration_s=120, distribution="deterministic",
+                           replicas=_unbounded(dag), failure_rate={"azure_openai": failure_rate},
+                           retries={("*", "*"): policy})
+    stats = result["components"]["azure_openai"]
+    # Expected attempts per call: 1 + p + p^2 + p^3; a call fails only when all four attempts do
+    assert stats["amplification"] == pytest.approx(sum(failure_rate ** k for k in range(4)), abs=0.05)
+    assert stats["retries"] > 0
+    assert result["success_rate"] == pytest.approx(1 - failure_rate ** 4, abs=0.01)
+    assert result["components"]["cards_api"]["amplification"] == 1.0
+
+
+def test_failures_without_a_retry_policy_fail_the_request():
+    dag = query_dag("Card Application")
+    result = simulate_load({"card": dag}, rps=20, duration_s=120, distribution="deterministic",
+                           replicas=_unbounded(dag), failure_rate={"azure_openai": 0.3})
+    assert result["components"]["azure_openai"]["amplification"] == 1.0
+    assert result["components"]["azure_openai"]["retries"] == 0
+    assert result["success_rate"] == pytest.approx(0.7, abs=0.05)
+
+
+def test_timeouts_are_retried():
+    dag = query_dag("Card Application")
+    result = simulate_load({"card": dag}, rps=20, duration_s=60, distribution="deterministic",
+                           replicas=_unbounded(dag), timeout_ms={"azure_openai": 1.0},
+                           retries={("*", "azure_openai"): RetryPolicy(max_attempts=2, backoff_ms=0)})
+    stats = result["components"]["azure_openai"]
+    assert stats["timeouts"] > 0
+    assert stats["amplification"] == pytest.approx(2.0)
+    assert result["success_rate"] == 0.0
@@ -0,0 +1,48 @@
+"""
+Model Loader Tests
+Streamed JSON parsing at every chunk boundary
+"""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_loader import HEAVY_FIELDS, LazyDetails, _JsonStream, _read_object
+
+# Numbers and literals in both decoded and deferred (raw) fields, nested
+# details included, so every chunk size cuts some value mid-token
+DOCUMENTS = (
+    '{"c":{"prompts":1,"v":-2.5}}',
+    '{"details":{"prompts":[1,-0.5e-3],"redis_ops":-12.75,"v":-2.5e3,"w":true,"x":null},"n":1E+2}',
+    '{"a":-2.5, "b":[1.25e-3, false],\n "c":{"d":"text \\" with , and }"}, "e":0}',
+)
+
+
+def _plain(value):
+    """Decode every deferred field so results compare with json.loads"""
+    if isinstance(value, LazyDetails):
+        return {key: _plain(value[key]) for key in value}
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_read_object_at_every_chunk_size(document):
+    expected = json.loads(document)
+    for chunk_size in range(1, len(document) + 1):
+        stream = _JsonStream(io.StringIO(document), chunk_size=chunk_size)
+        assert _plain(_read_object(stream, HEAVY_FIELDS)) == expected, chunk_size
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_read_raw_at_every_chunk_size(document):
+    for chunk_size in range(1, len(document) + 1):
+        stream = _JsonStream(io.StringIO(document), chunk_size=chunk_size)
+        fields = {key: stream.read_raw() for key in stream.keys()}
+        assert {key: json.loads(raw) for key, raw in fields.items()} == json.loads(document), chunk_size
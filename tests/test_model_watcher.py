@@ -0,0 +1,100 @@
+"""
+Model Watcher Tests
+Targeted invalidation of derived results by the model keys they depend on, including mid-build
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_watcher import DerivedCache, layer_key, sequence_key
+
+
+def test_invalidation_drops_only_dependent_entries():
+    cache = DerivedCache()
+    cache.get_or_compute("planner", {"planner", layer_key("orchestration")}, lambda: "planner diagram")
+    cache.get_or_compute("rag", {"rag_engine", sequence_key("rag")}, lambda: "rag flow")
+
+    assert cache.invalidate(frozenset({layer_key("orchestration")})) == 1
+    assert cache.peek("planner") is None
+    assert cache.peek("rag") == "rag flow"
+
+
+def test_invalidated_entry_is_recomputed():
+    cache = DerivedCache()
+    versions = iter(("old", "new"))
+    assert cache.get_or_compute("view", {"planner"}, lambda: next(versions)) == "old"
+    assert cache.get_or_compute("view", {"planner"}, lambda: next(versions)) == "old"
+    cache.invalidate(frozenset({"planner"}))
+    assert cache.get_or_compute("view", {"planner"}, lambda: next(versions)) == "new"
+    assert (cache.hits, cache.misses, cache.invalidated) == (1, 2, 1)
+
+
+def test_oldest_entries_are_evicted_beyond_the_limit():
+    cache = DerivedCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, {key}, lambda key=key: key.upper())
+    assert cache.peek("a") is None
+    assert cache.peek("c") == "C"
+
+
+def test_result_invalidated_mid_build_is_returned_but_not_stored():
+    cache = DerivedCache()
+
+    def compute():
+        # A live edit lands while the diagram is being built
+        cache.invalidate(frozenset({"planner"}))
+        return "stale diagram"
+
+    assert cache.get_or_compute("view", {"planner"}, compute) == "stale diagram"
+    assert cache.peek("view") is None
+    assert cache.get_or_compute("view", {"planner"}, lambda: "fresh diagram") == "fresh diagram"
+    assert cache.peek("view") == "fresh diagram"
+
+
+def test_unrelated_invalidation_mid_build_keeps_the_result():
+    cache = DerivedCache()
+
+    def compute():
+        cache.invalidate(frozenset({"rag_engine"}))
+        return "diagram"
+
+    cache.get_or_compute("view", {"planner"}, compute)
+    assert cache.peek("view") == "diagram"
+
+
+def test_waiters_on_a_stale_build_recompute():
+    cache = DerivedCache()
+    started = threading.Event()
+    release = threading.Event()
+    results = {}
+
+    def slow_build():
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    def first():
+        results["first"] = cache.get_or_compute("view", {"planner"}, slow_build)
+
+    def second():
+        results["second"] = cache.get_or_compute("view", {"planner"}, lambda: "fresh")
+
+    builder = threading.Thread(target=first)
+    builder.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=second)
+    waiter.start()
+    # The waiter shares the pending build until the model changes under it
+    while not cache.shared:
+        time.sleep(0.001)
+    cache.invalidate(frozenset({"planner"}))
+    release.set()
+    builder.join(5)
+    waiter.join(5)
+
+    assert results == {"first": "stale", "second": "fresh"}
+    assert cache.peek("view") == "fresh"
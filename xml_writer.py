@@ -0,0 +1,84 @@
+"""
+Streaming XML Writer
+Writes XML elements straight to a text stream with optional indentation
+"""
+
+from xml.sax.saxutils import escape
+
+# Characters escaped in attribute values besides &, < and >
+_ATTRIBUTE_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+
+
+class XmlWriter:
+    """
+    Incremental XML writer
+
+    Each tag is written to the output as soon as it is opened, so no document
+    tree is ever held in memory. With an indent every tag goes on its own line
+    (the layout of minidom's toprettyxml without blank lines); without one the
+    document is written on a single line.
+    """
+
+    def __init__(self, out, indent: str = "  ", level: int = 0):
+        """
+        Args:
+            out: Text stream with a write() method
+            indent: Indentation per nesting level, or None for compact output
+            level: Nesting level of the first element (for fragments spliced
+                into another document with raw())
+        """
+        self._out = out
+        self._indent = indent
+        self._level = level
+        self._open = []
+        self._started = False
+
+    def _line(self, text: str):
+        if self._indent is not None:
+            if self._started:
+                self._out.write("\n")
+            self._out.write(self._indent * (self._level + len(self._open)))
+        self._out.write(text)
+        self._started = True
+
+    @staticmethod
+    def _tag(tag: str, attributes: dict) -> str:
+        if not attributes:
+            return tag
+        return tag + "".join(
+            f' {name}="{escape(value, _ATTRIBUTE_ENTITIES)}"' for name, value in attributes.items()
+        )
+
+    def declaration(self):
+        """Write the XML declaration"""
+        self._line('<?xml version="1.0" ?>')
+
+    def start(self, tag: str, attributes: dict = None):
+        """Open an element that will have children"""
+        self._line(f"<{self._tag(tag, attributes)}>")
+        self._open.append(tag)
+
+    def end(self):
+        """Close the innermost open element"""
+        tag = self._open.pop()
+        self._line(f"</{tag}>")
+
+    def element(self, tag: str, attributes: dict = None):
+        """Write an element without children"""
+        self._line(f"<{self._tag(tag, attributes)}/>")
+
+    def text_element(self, tag: str, attributes: dict = None, text: str = ""):
+        """Write an element whose only child is text, on one line"""
+        self._line(f"<{self._tag(tag, attributes)}>{escape(text)}</{tag}>")
+
+    def raw(self, markup: str):
+        """Write markup serialized elsewhere (e.g. a fragment written at this nesting level)"""
+        if self._indent is not None and self._started:
+            self._out.write("\n")
+        self._out.write(markup)
+        self._started = True
+
+    def close(self):
+        """Close every element still open"""
+        while self._open:
+            self.end()